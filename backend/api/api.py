@@ -1,7 +1,8 @@
 from fastapi import APIRouter
-from api.endpoints import auth, events, bookings
+from api.endpoints import auth, events, bookings, waitlist
 
 api_router = APIRouter()
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
 api_router.include_router(events.router, prefix="/events", tags=["events"])
 api_router.include_router(bookings.router, prefix="/bookings", tags=["bookings"])
+api_router.include_router(waitlist.router, prefix="/waitlist", tags=["waitlist"])
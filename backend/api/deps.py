@@ -1,10 +1,12 @@
-from typing import Generator
+from typing import Generator, Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 from pydantic import ValidationError
-from sqlalchemy.orm import Session
-from core.database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.cache import TTLCache
+from core.database import get_async_db
 from models.user import User, UserRole
 from schemas.token import TokenPayload
 from core.config import settings
@@ -13,37 +15,102 @@ reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_STR}/auth/login"
 )
 
-def get_current_user(
-    db: Session = Depends(get_db),
-    token: str = Depends(reusable_oauth2)
-) -> User:
+# Why: Most authenticated endpoints only need the caller's id and role, yet every
+# request used to load the full users row. The principal (id, role, is_active) is
+# cached per token subject for a short TTL, and profile/password changes drop it.
+# Endpoints that need the ORM user (the /auth profile routes) load it by primary key.
+class Principal:
+    __slots__ = ("id", "email", "role", "is_active")
+
+    def __init__(self, id: int, email: str, role: UserRole, is_active: bool):
+        self.id = id
+        self.email = email
+        self.role = role
+        self.is_active = is_active
+
+_principal_cache = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_SIZE,
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS
+)
+
+def invalidate_principal(email: str):
+    _principal_cache.invalidate(email)
+
+def principal_cache_stats() -> dict:
+    return _principal_cache.stats()
+
+def _decode_token(token: str) -> TokenPayload:
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
         )
-        token_data = TokenPayload(**payload)
+        return TokenPayload(**payload)
     except (JWTError, ValidationError):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
-    user = db.query(User).filter(User.email == token_data.sub).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    return user
 
-def get_current_active_user(
-    current_user: User = Depends(get_current_user),
-) -> User:
+def _principal_from_claims(token_data: TokenPayload) -> Optional[Principal]:
+    # Signed claims are only as fresh as the token, so trusting them is opt-in
+    if not settings.AUTH_TRUST_TOKEN_CLAIMS or None in (token_data.uid, token_data.role, token_data.active):
+        return None
+    try:
+        return Principal(token_data.uid, token_data.sub, UserRole(token_data.role), token_data.active)
+    except ValueError:
+        return None
+
+async def get_current_principal(
+    db: AsyncSession = Depends(get_async_db),
+    token: str = Depends(reusable_oauth2)
+) -> Principal:
+    token_data = _decode_token(token)
+    principal = _principal_cache.get(token_data.sub)
+    if principal is not None:
+        return principal
+
+    principal = _principal_from_claims(token_data)
+    if principal is None:
+        result = await db.execute(
+            select(User.id, User.email, User.role, User.is_active).where(User.email == token_data.sub)
+        )
+        row = result.first()
+        if not row:
+            raise HTTPException(status_code=404, detail="User not found")
+        principal = Principal(row.id, row.email, row.role, row.is_active)
+    _principal_cache.set(token_data.sub, principal)
+    return principal
+
+async def get_current_active_principal(
+    current_user: Principal = Depends(get_current_principal),
+) -> Principal:
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
-def get_current_organizer(
-    current_user: User = Depends(get_current_active_user),
-) -> User:
+async def get_current_organizer(
+    current_user: Principal = Depends(get_current_active_principal),
+) -> Principal:
     if current_user.role != UserRole.ORGANIZER:
         raise HTTPException(
             status_code=403, detail="The user doesn't have enough privileges"
         )
     return current_user
+
+async def get_current_user(
+    db: AsyncSession = Depends(get_async_db),
+    principal: Principal = Depends(get_current_principal),
+) -> User:
+    """The full ORM user, for endpoints that read or change more than id and role."""
+    user = await db.get(User, principal.id)
+    if not user:
+        invalidate_principal(principal.email)
+        raise HTTPException(status_code=404, detail="User not found")
+    return user
+
+async def get_current_active_user(
+    current_user: User = Depends(get_current_user),
+) -> User:
+    if not current_user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return current_user
@@ -1,25 +1,26 @@
 from datetime import timedelta
 from typing import Any, Optional
 import json
-import shutil
-import uuid
-import os
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 
 from api import deps
 from core import security
 from core.config import settings
-from core.database import get_db
+from core.database import get_async_db
 from models.user import User
 from schemas.token import Token
 from schemas.user import UserCreate, UserResponse, PasswordChange
+from services.media_service import MediaService
+from services.user_profile_service import UserProfileService
 
 router = APIRouter()
 
 @router.get("/me", response_model=UserResponse)
-def read_users_me(
+async def read_users_me(
     current_user: User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
@@ -28,9 +29,9 @@ def read_users_me(
     return current_user
 
 @router.put("/profile", response_model=UserResponse)
-def update_user_profile(
+async def update_user_profile(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     full_name: str = Form(...),
     image_file: Optional[UploadFile] = File(None),
     delete_image: bool = Form(False),
@@ -40,95 +41,107 @@ def update_user_profile(
     Update user profile.
     """
     current_user.full_name = full_name
+    old_image = current_user.profile_image_id
 
     if delete_image:
-        # Ideally delete old file too, but keeping it simple for now or strictly follow cleanup
         current_user.profile_image_id = None
     elif image_file:
-        # Create media directory if not exists
-        if not os.path.exists("media"):
-            os.makedirs("media")
-            
-        file_ext = image_file.filename.split(".")[-1]
-        file_name = f"{uuid.uuid4()}.{file_ext}"
-        file_path = os.path.join("media", file_name)
-        
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(image_file.file, buffer)
-            
-        current_user.profile_image_id = file_name
+        # Streaming, hashing and the size check block, so keep them off the event loop
+        current_user.profile_image_id = await run_in_threadpool(MediaService.ingest, image_file)
 
     db.add(current_user)
-    db.commit()
-    db.refresh(current_user)
+    await db.commit()
+    await db.refresh(current_user)
+    if current_user.profile_image_id != old_image:
+        await db.run_sync(MediaService.release, old_image)
+        await run_in_threadpool(MediaService.process_variants, current_user.profile_image_id, image_file)
+    UserProfileService.invalidate(current_user.id)
+    deps.invalidate_principal(current_user.email)
     return current_user
 
 @router.post("/signup", response_model=UserResponse)
-def create_user(
+async def create_user(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_in: UserCreate,
 ) -> Any:
     """
     Create new user.
     """
-    user = db.query(User).filter(User.email == user_in.email).first()
+    result = await db.execute(select(User).where(User.email == user_in.email))
+    user = result.scalars().first()
     if user:
         raise HTTPException(
             status_code=400,
             detail="The user with this username already exists in the system.",
         )
+    # Release the connection before hashing, as in login
+    await db.commit()
     
     user = User(
         email=user_in.email,
-        hashed_password=security.get_password_hash(user_in.password),
+        hashed_password=await security.get_password_hash_async(user_in.password),
         full_name=user_in.full_name,
         role=user_in.role,
         is_active=True,
         interests=json.dumps(user_in.interests) if user_in.interests else "[]"
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     return user
 
 @router.post("/login", response_model=Token)
-def login_access_token(
-    db: Session = Depends(get_db),
+async def login_access_token(
+    db: AsyncSession = Depends(get_async_db),
     form_data: OAuth2PasswordRequestForm = Depends()
 ) -> Any:
     """
     OAuth2 compatible token login, get an access token for future requests.
     """
-    user = db.query(User).filter(User.email == form_data.username).first()
-    if not user or not security.verify_password(form_data.password, user.hashed_password):
+    result = await db.execute(select(User).where(User.email == form_data.username))
+    user = result.scalars().first()
+    if not user:
+        raise HTTPException(status_code=400, detail="Incorrect email or password")
+    # Why: Hashing can queue behind a login burst; don't hold a pooled connection meanwhile
+    await db.commit()
+    verified, new_hash = await security.verify_and_rehash_password_async(form_data.password, user.hashed_password)
+    if not verified:
         raise HTTPException(status_code=400, detail="Incorrect email or password")
     
     if not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
+
+    if new_hash:
+        # Stored with an older cost factor; the password is at hand, so upgrade it now
+        user.hashed_password = new_hash
+        await db.commit()
     
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     return {
         "access_token": security.create_access_token(
             subject=user.email,
-            claims={"role": user.role.value},
+            claims={"role": user.role.value, "uid": user.id, "active": user.is_active},
             expires_delta=access_token_expires
         ),
         "token_type": "bearer",
     }
 
 @router.post("/change-password")
-def change_password(
+async def change_password(
     password_in: PasswordChange,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(deps.get_current_active_user)
 ) -> Any:
     """
     Change user password.
     """
-    if not security.verify_password(password_in.old_password, current_user.hashed_password):
+    # Release the connection before hashing, as in login
+    await db.commit()
+    if not await security.verify_password_async(password_in.old_password, current_user.hashed_password):
         raise HTTPException(status_code=400, detail="Incorrect old password")
     
-    current_user.hashed_password = security.get_password_hash(password_in.new_password)
-    db.commit()
+    current_user.hashed_password = await security.get_password_hash_async(password_in.new_password)
+    await db.commit()
+    deps.invalidate_principal(current_user.email)
     return {"message": "Password updated successfully"}
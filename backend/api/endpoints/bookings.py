@@ -1,20 +1,22 @@
-from typing import List, Any
-from fastapi import APIRouter, Depends
+from typing import List, Any, Optional
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from api import deps
-from core.database import get_db
-from models.user import User
+from core.database import get_async_db, get_db, run_sync
+from core.pagination import NEXT_CURSOR_HEADER, next_cursor
 from schemas.booking import BookingCreate, BookingResponse
 from services.booking_service import BookingService
 
 router = APIRouter()
 
+# Stays a sync endpoint: with the seat inventory enabled it waits on a write-behind flush.
 @router.post("/", response_model=BookingResponse)
 def create_booking(
     *,
     db: Session = Depends(get_db),
     booking_in: BookingCreate,
-    current_user: User = Depends(deps.get_current_active_user),
+    current_user: deps.Principal = Depends(deps.get_current_active_principal),
 ) -> Any:
     """
     Book an event (Attendee).
@@ -22,34 +24,43 @@ def create_booking(
     return BookingService.create_booking(db, booking_in, current_user.id)
 
 @router.get("/my-bookings", response_model=List[BookingResponse])
-def read_my_bookings(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(deps.get_current_active_user),
+async def read_my_bookings(
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: deps.Principal = Depends(deps.get_current_active_principal),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(None, description=f"Resume after the page that returned this {NEXT_CURSOR_HEADER} (replaces skip)"),
 ) -> Any:
     """
-    Get all bookings for current user.
+    Get all bookings for current user. The next page's cursor is returned in the X-Next-Cursor header.
     """
-    return BookingService.get_user_bookings(db, current_user.id, skip=skip, limit=limit)
+    # Each booking's event is eager-loaded, so serializing them issues no further queries
+    bookings = await run_sync(db, BookingService.get_user_bookings, current_user.id, skip=skip, limit=limit, cursor=cursor)
+    response.headers[NEXT_CURSOR_HEADER] = next_cursor(bookings, limit, lambda b: [b.id]) or ""
+    return bookings
 
 @router.get("/my-stats", response_model=dict)
-def read_my_stats(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(deps.get_current_active_user),
+async def read_my_stats(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: deps.Principal = Depends(deps.get_current_active_principal),
 ) -> Any:
     """
     Get aggregated stats for current user.
     """
-    return BookingService.get_user_stats(db, current_user.id)
+    return await run_sync(db, BookingService.get_user_stats, current_user.id)
 
 @router.post("/{booking_id}/cancel", response_model=BookingResponse)
-def cancel_booking(
+async def cancel_booking(
     booking_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(deps.get_current_active_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: deps.Principal = Depends(deps.get_current_active_principal),
 ) -> Any:
     """
     Cancel a booking (User).
     """
-    return BookingService.cancel_booking_by_user(db, booking_id, current_user.id)
+    def cancel(session: Session):
+        booking = BookingService.cancel_booking_by_user(session, booking_id, current_user.id)
+        return BookingResponse.model_validate(booking)
+
+    return await db.run_sync(cancel)
@@ -1,31 +1,82 @@
 from typing import List, Any, Optional
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, Query, Form, File, UploadFile
+from fastapi import APIRouter, Depends, HTTPException, Query, Form, File, UploadFile, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from api import deps
-from core.database import get_db
-from models.user import User
+from core.database import get_async_db, get_db, run_sync
+from core.pagination import NEXT_CURSOR_HEADER, decode_cursor, keyset_after, next_cursor
+from core import response_cache as cached
+from core.response_cache import response_cache
 from models.event import Event, EventStatus, EventType
 from schemas.event import EventCreate, EventResponse, EventUpdate
 from services.event_service import EventService
 from services.recommendation_service import RecommendationService
+from services.user_profile_service import UserProfileService
+from services.batch_recommendation_service import BatchRecommendationService
+from services.search_service import search_backend
+from services.sales_rollup_service import SalesRollupService
+from services.cancellation_service import CancellationService
+from services.event_transfer_service import EXPORT_COLUMNS, EventTransferService
 
 router = APIRouter()
 
+_event_json = TypeAdapter(EventResponse)
+_events_json = TypeAdapter(List[EventResponse])
+
 @router.get("/recommendations", response_model=List[EventResponse])
-def get_recommendations(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(deps.get_current_active_user),
+async def get_recommendations(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: deps.Principal = Depends(deps.get_current_active_principal),
     limit: int = 3
 ) -> Any:
     """
     Get personalized event recommendations based on user interests and history.
     """
-    return RecommendationService.get_keyword_recommendations(db, current_user.id, limit)
+    return await run_sync(db, RecommendationService.get_keyword_recommendations, current_user.id, limit)
+
+@router.get("/recommendations/profile", response_model=dict)
+async def get_recommendation_profile(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: deps.Principal = Depends(deps.get_current_active_principal),
+) -> Any:
+    """
+    Debug view of the cached interest profile that drives recommendations.
+    """
+    profile = await run_sync(db, UserProfileService.get_profile, current_user.id)
+    return {**profile.to_dict(), "cache": UserProfileService.cache_stats()}
+
+@router.post("/recommendations/precompute", response_model=dict, status_code=202)
+async def precompute_recommendations(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: deps.Principal = Depends(deps.get_current_organizer),
+) -> Any:
+    """
+    Queue a run that precomputes recommendations for every user (Organizer only).
+    Returns at once; follow it with GET /recommendations/precompute/{run_id}.
+    While a run is queued or running, returns that run instead of queueing another.
+    """
+    return await run_sync(db, BatchRecommendationService.enqueue, current_user.id)
+
+@router.get("/recommendations/precompute/{run_id}", response_model=dict)
+async def get_precompute_status(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    run_id: int,
+    current_user: deps.Principal = Depends(deps.get_current_organizer),
+) -> Any:
+    """
+    Status of a recommendation precompute run (Organizer only). Reports users/sec once done.
+    """
+    return await run_sync(db, BatchRecommendationService.get_run_status, run_id)
 
 @router.get("/", response_model=List[EventResponse])
-def read_events(
-    db: Session = Depends(get_db),
+async def read_events(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
     location: Optional[str] = Query(None, description="Filter by location"),
     status: Optional[EventStatus] = Query(EventStatus.PUBLISHED, description="Filter by status (default: PUBLISHED)"),
     type: Optional[EventType] = Query(None, description="Filter by event type"),
@@ -34,32 +85,68 @@ def read_events(
     limit: int = 100,
     start_date: Optional[datetime] = Query(None, description="Filter events after this date"),
     end_date: Optional[datetime] = Query(None, description="Filter events before this date"),
+    cursor: Optional[str] = Query(None, description=f"Resume after the page that returned this {NEXT_CURSOR_HEADER} (replaces skip)"),
 ) -> Any:
     """
-    Retrieve events.
+    Retrieve events. The next page's cursor is returned in the X-Next-Cursor header.
+    With a search term, results are ranked by relevance when the search backend supports it.
+    Responses carry an ETag; send it back in If-None-Match to get a 304 when nothing changed.
     """
+    # Taken before the query runs, so a page read just before a write is stored
+    # under the old generation and never served after it
+    key = response_cache.list_key((
+        status.value if status else None, type.value if type else None,
+        location.lower() if location else None, search.lower() if search else None,
+        skip if not cursor else 0, limit, start_date, end_date, cursor,
+    ))
+    entry = response_cache.get(key)
+    if entry is not None:
+        return cached.respond(request, entry)
 
-    EventService.update_ended_events(db)
-    
-    query = db.query(Event).filter(Event.status == status)
-    
-
-    from sqlalchemy import or_
+    query = select(Event).where(EventService.status_condition(status))
 
+    relevance = None
     if search:
-        search_filter = f"%{search}%"
-        query = query.filter(or_(Event.title.ilike(search_filter), Event.location.ilike(search_filter)))
+        query, relevance = search_backend.apply(query, search)
     
     if location:
-        query = query.filter(Event.location.ilike(f"%{location}%"))
+        query = query.where(Event.location.ilike(f"%{location}%"))
     if type:
-        query = query.filter(Event.event_type == type)
+        query = query.where(Event.event_type == type)
     if start_date:
-        query = query.filter(Event.date >= start_date)
+        query = query.where(Event.date >= start_date)
     if end_date:
-        query = query.filter(Event.date <= end_date)
-    return query.offset(skip).limit(limit).all()
+        query = query.where(Event.date <= end_date)
+
+    if relevance is not None:
+        # Most relevant first; the cursor carries (relevance, id)
+        query = query.add_columns(relevance.label("relevance")).order_by(relevance.desc(), Event.id.desc())
+        if cursor:
+            query = query.where(keyset_after([relevance, Event.id], decode_cursor(cursor, 2), desc=True))
+    else:
+        query = query.order_by(Event.id.asc())
+        if cursor:
+            (last_id,) = decode_cursor(cursor, 1)
+            query = query.where(Event.id > last_id)
+    if not cursor:
+        query = query.offset(skip)
+
+    result = await db.execute(query.limit(limit))
+    if relevance is not None:
+        rows = result.all()
+        events = [event for event, _ in rows]
+        cursor_out = next_cursor(rows, limit, lambda r: [r.relevance, r[0].id])
+    else:
+        events = result.scalars().all()
+        cursor_out = next_cursor(events, limit, lambda e: [e.id])
+    EventService.apply_effective_status(events)
 
+    body = _events_json.dump_json(_events_json.validate_python(events, from_attributes=True))
+    entry = cached.entry_for(body, events, {NEXT_CURSOR_HEADER: cursor_out or ""})
+    response_cache.set(key, entry, [event.id for event in events])
+    return cached.respond(request, entry)
+
+# Stays a sync endpoint: the image upload is written with blocking file I/O.
 @router.post("/", response_model=EventResponse)
 def create_event(
     *,
@@ -75,7 +162,8 @@ def create_event(
     image_url: Optional[str] = Form(None),
     image_file: UploadFile = File(None),
     status: EventStatus = Form(EventStatus.DRAFT),
-    current_user: User = Depends(deps.get_current_organizer),
+    is_high_demand: bool = Form(False),
+    current_user: deps.Principal = Depends(deps.get_current_organizer),
 ) -> Any:
     """
     Create new event (Organizer only).
@@ -90,86 +178,189 @@ def create_event(
         "price": price,
         "event_type": event_type,
         "status": status,
+        "is_high_demand": is_high_demand,
     }
     return EventService.create_event(db, event_dict, current_user.id, image_file, image_url)
 
 @router.get("/my-events", response_model=List[EventResponse])
-def read_my_events(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(deps.get_current_organizer),
+async def read_my_events(
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: deps.Principal = Depends(deps.get_current_organizer),
     skip: int = 0,
     limit: int = 100,
     sort_by: str = "date",
     sort_desc: bool = False,
+    cursor: Optional[str] = Query(None, description=f"Resume after the page that returned this {NEXT_CURSOR_HEADER} (replaces skip)"),
 ) -> Any:
     """
     Get all events created by current organizer.
     """
-    return EventService.get_organizer_events(db, current_user.id, skip=skip, limit=limit, sort_by=sort_by, sort_desc=sort_desc)
+    events, cursor_out = await run_sync(
+        db, EventService.get_organizer_events_page, current_user.id,
+        skip=skip, limit=limit, sort_by=sort_by, sort_desc=sort_desc, cursor=cursor
+    )
+    response.headers[NEXT_CURSOR_HEADER] = cursor_out or ""
+    return events
 
 @router.get("/stats/overview", response_model=dict)
-def get_organizer_stats(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(deps.get_current_organizer),
+async def get_organizer_stats(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: deps.Principal = Depends(deps.get_current_organizer),
 ) -> Any:
     """
     Get aggregated statistics for the organizer.
     """
-    return EventService.get_organizer_stats(db, current_user.id)
+    return await run_sync(db, EventService.get_organizer_stats, current_user.id)
+
+@router.get("/stats/timeseries", response_model=dict)
+async def get_sales_timeseries(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: deps.Principal = Depends(deps.get_current_organizer),
+    granularity: str = Query("day", description="Bucket size: hour or day"),
+    start: Optional[datetime] = Query(None, description="Range start, UTC (default: 30 days before end)"),
+    end: Optional[datetime] = Query(None, description="Range end, UTC (default: now)"),
+    event_id: Optional[int] = Query(None, description="Only this event (default: all of the organizer's events)"),
+) -> Any:
+    """
+    Seats sold, seats cancelled and net revenue over time for the organizer, from the sales rollups.
+    """
+    return await run_sync(
+        db, SalesRollupService.get_timeseries, current_user.id,
+        granularity=granularity, start=start, end=end, event_id=event_id
+    )
+
+# Stays a sync endpoint: it reads the spooled upload and inserts in batches with blocking I/O.
+@router.post("/import", response_model=dict)
+def import_events(
+    db: Session = Depends(get_db),
+    file: UploadFile = File(..., description="NDJSON (one event object per line) or CSV with a header row"),
+    format: Optional[str] = Query(None, description="ndjson or csv (default: from the file extension)"),
+    current_user: deps.Principal = Depends(deps.get_current_organizer),
+) -> Any:
+    """
+    Bulk-create events from an NDJSON or CSV file (Organizer only). Rows use the
+    event creation fields plus optional status and image_url. Invalid rows are
+    reported by line number and skipped.
+    """
+    format = EventTransferService.resolve_format(format, file.filename)
+    return EventTransferService.import_events(db, file.file, format, current_user.id)
+
+@router.get("/export")
+async def export_events(
+    resource: str = Query("events", description="events, or bookings for your events"),
+    format: str = Query("ndjson", description="ndjson or csv"),
+    current_user: deps.Principal = Depends(deps.get_current_organizer),
+) -> Any:
+    """
+    Stream all of the organizer's events or their bookings as NDJSON or CSV (Organizer only).
+    """
+    if resource not in EXPORT_COLUMNS:
+        raise HTTPException(status_code=400, detail=f"resource must be one of: {', '.join(EXPORT_COLUMNS)}")
+    format = EventTransferService.resolve_format(format)
+    return StreamingResponse(
+        EventTransferService.export(resource, format, current_user.id),
+        media_type="text/csv" if format == "csv" else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{resource}.{format}"'},
+    )
 
 @router.get("/{id}", response_model=EventResponse)
-def get_event_by_id(
+async def get_event_by_id(
     *,
-    db: Session = Depends(get_db),
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
     id: int,
 ) -> Any:
     """
-    Get a single event by ID. Updates status if event has ended.
+    Get a single event by ID. Reports the event as ENDED once it is over.
+    Supports If-None-Match like the listing.
     """
+    key = response_cache.event_key(id)
+    entry = response_cache.get(key)
+    if entry is not None:
+        return cached.respond(request, entry)
 
-    EventService.update_ended_events(db)
-    
-    event = db.query(Event).filter(Event.id == id).first()
+    result = await db.execute(select(Event).where(Event.id == id))
+    event = result.scalars().first()
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
-    return event
+    EventService.apply_effective_status([event])
+
+    entry = cached.entry_for(_event_json.dump_json(_event_json.validate_python(event, from_attributes=True)), [event])
+    response_cache.set(key, entry, [id])
+    return cached.respond(request, entry)
+
+@router.get("/{id}/attendees")
+async def export_attendees(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    id: int,
+    format: str = Query("csv", description="csv or ndjson"),
+    include_cancelled: bool = Query(False, description="Also list cancelled bookings"),
+    current_user: deps.Principal = Depends(deps.get_current_organizer),
+) -> Any:
+    """
+    Stream the attendee list of one of your events for check-in (Organizer only).
+    """
+    format = EventTransferService.resolve_format(format)
+    result = await db.execute(select(Event.id).where(Event.id == id, Event.organizer_id == current_user.id))
+    if result.first() is None:
+        raise HTTPException(status_code=404, detail="Event not found")
+    return StreamingResponse(
+        EventTransferService.attendees(id, format, include_cancelled=include_cancelled),
+        media_type="text/csv" if format == "csv" else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="event-{id}-attendees.{format}"'},
+    )
 
 @router.put("/{id}", response_model=EventResponse)
-def update_event(
+async def update_event(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     id: int,
     event_in: EventUpdate,
-    current_user: User = Depends(deps.get_current_organizer),
+    current_user: deps.Principal = Depends(deps.get_current_organizer),
 ) -> Any:
     """
     Update an event (Organizer only).
     """
-    return EventService.update_event(db, id, event_in, current_user.id)
+    return await run_sync(db, EventService.update_event, id, event_in, current_user.id)
 
 @router.delete("/{id}", response_model=EventResponse)
-def cancel_event(
+async def cancel_event(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     id: int,
-    current_user: User = Depends(deps.get_current_organizer),
+    current_user: deps.Principal = Depends(deps.get_current_organizer),
 ) -> Any:
     """
-    Cancel an event (Organizer only).
+    Cancel an event (Organizer only). Its bookings are cancelled by a background
+    job; follow it with GET /{id}/cancellation.
     """
-    return EventService.cancel_event(db, id, current_user.id)
+    return await run_sync(db, EventService.cancel_event, id, current_user.id)
+
+@router.get("/{id}/cancellation", response_model=dict)
+async def get_cancellation_status(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    id: int,
+    current_user: deps.Principal = Depends(deps.get_current_organizer),
+) -> Any:
+    """
+    Progress of cancelling a cancelled event's bookings (Organizer only).
+    """
+    return await run_sync(db, CancellationService.get_status, id, current_user.id)
 
 @router.delete("/{id}/permanent", response_model=dict)
-def delete_draft_event(
+async def delete_draft_event(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     id: int,
-    current_user: User = Depends(deps.get_current_organizer),
+    current_user: deps.Principal = Depends(deps.get_current_organizer),
 ) -> Any:
     """
     Permanently delete a DRAFT event (Organizer only).
     Only DRAFT events can be permanently deleted.
     """
-    return EventService.delete_draft_event(db, id, current_user.id)
+    return await run_sync(db, EventService.delete_draft_event, id, current_user.id)
 
 
@@ -0,0 +1,85 @@
+import mimetypes
+import os
+from email.utils import format_datetime, parsedate_to_datetime
+from datetime import datetime, timezone
+from fastapi import APIRouter, HTTPException, Request, Response
+from core.config import settings
+from core.file_response import RangedFileResponse, parse_range
+from services.media_service import MEDIA_DIR, MediaService
+
+router = APIRouter()
+
+# Precompressed siblings (<name>.br, <name>.gz), most preferred first
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+def _not_modified(request: Request, etag: str, modified: datetime) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        known = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return etag in known or "*" in known
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return modified <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+@router.api_route("/{filename}", methods=["GET", "HEAD"])
+async def serve_media(filename: str, request: Request) -> Response:
+    """
+    Serve an uploaded image. Content-addressed files are immutable and cached
+    for a year; ranges, conditional requests and precompressed variants are supported.
+    """
+    if "/" in filename or "\\" in filename or filename.startswith("."):
+        raise HTTPException(status_code=404, detail="Not found")
+    path = MEDIA_DIR / filename
+    try:
+        stat = os.stat(path)
+    except (FileNotFoundError, NotADirectoryError):
+        raise HTTPException(status_code=404, detail="Not found")
+
+    digest = MediaService.digest_of(filename)
+    media_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    headers = {
+        "cache-control": IMMUTABLE if digest else f"public, max-age={settings.MEDIA_CACHE_MAX_AGE_SECONDS}",
+        "vary": "Accept-Encoding",
+    }
+
+    accepted = request.headers.get("accept-encoding", "")
+    for encoding, suffix in ENCODINGS:
+        if encoding in accepted:
+            try:
+                encoded = os.stat(f"{path}{suffix}")
+            except FileNotFoundError:
+                continue
+            path, stat = f"{path}{suffix}", encoded
+            headers["content-encoding"] = encoding
+            break
+
+    # Strong validators: an original's name is its content hash; variants and
+    # older uploads use size and mtime
+    is_original = digest is not None and filename.count(".") == 1
+    version = digest if is_original else f"{stat.st_size:x}-{stat.st_mtime_ns:x}"
+    etag = f'"{version}{"-" + headers["content-encoding"] if "content-encoding" in headers else ""}"'
+    modified = datetime.fromtimestamp(int(stat.st_mtime), tz=timezone.utc)
+    headers["etag"] = etag
+    headers["last-modified"] = format_datetime(modified, usegmt=True)
+
+    if _not_modified(request, etag, modified):
+        return Response(status_code=304, headers=headers)
+
+    if settings.MEDIA_ACCEL_REDIRECT_PREFIX:
+        # The front proxy (nginx internal location) sends the bytes, ranges included
+        headers["x-accel-redirect"] = settings.MEDIA_ACCEL_REDIRECT_PREFIX.rstrip("/") + "/" + os.path.basename(path)
+        return Response(headers=headers, media_type=media_type)
+
+    byte_range = None
+    if_range = request.headers.get("if-range")
+    if if_range is None or if_range == etag:
+        byte_range = parse_range(request.headers.get("range"), stat.st_size)
+    return RangedFileResponse(
+        path, stat.st_size, byte_range, headers=headers, media_type=media_type,
+        send_body=request.method != "HEAD"
+    )
@@ -0,0 +1,60 @@
+from typing import List, Any
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from api import deps
+from core.database import get_async_db, run_sync
+from schemas.booking import BookingResponse
+from schemas.waitlist import WaitlistJoin, WaitlistEntryResponse
+from services.waitlist_service import WaitlistService
+
+router = APIRouter()
+
+@router.post("/", response_model=WaitlistEntryResponse)
+async def join_waitlist(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    waitlist_in: WaitlistJoin,
+    current_user: deps.Principal = Depends(deps.get_current_active_principal),
+) -> Any:
+    """
+    Join a sold-out event's waitlist (Attendee). Freed seats are offered in order and held for a while.
+    """
+    return await run_sync(db, WaitlistService.join, waitlist_in, current_user.id)
+
+@router.get("/my-entries", response_model=List[WaitlistEntryResponse])
+async def read_my_entries(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: deps.Principal = Depends(deps.get_current_active_principal),
+    include_inactive: bool = False,
+) -> Any:
+    """
+    Get the current user's waitlist entries, with their queue positions.
+    """
+    return await run_sync(db, WaitlistService.get_user_entries, current_user.id, include_inactive)
+
+@router.post("/{entry_id}/claim", response_model=BookingResponse)
+async def claim_offer(
+    entry_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: deps.Principal = Depends(deps.get_current_active_principal),
+) -> Any:
+    """
+    Book the seats held for a waitlist entry (Attendee).
+    """
+    def claim(session: Session):
+        booking = WaitlistService.claim(session, entry_id, current_user.id)
+        return BookingResponse.model_validate(booking)
+
+    return await db.run_sync(claim)
+
+@router.delete("/{entry_id}", response_model=WaitlistEntryResponse)
+async def leave_waitlist(
+    entry_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: deps.Principal = Depends(deps.get_current_active_principal),
+) -> Any:
+    """
+    Leave the waitlist, or decline held seats so they go to the next in line.
+    """
+    return await run_sync(db, WaitlistService.leave, entry_id, current_user.id)
@@ -0,0 +1,30 @@
+from core.database import SessionLocal
+from models import user, event, booking, event_keyword, recommendation, organizer_stats, sales_rollup, cancellation, outbox, waitlist
+from services.organizer_stats_service import OrganizerStatsService
+import argparse
+import sys
+
+def check_organizer_stats(fix: bool = False) -> int:
+    print("Connecting to database...")
+    db = SessionLocal()
+    try:
+        print("Recomputing organizer counters from the events table...")
+        drift = OrganizerStatsService.check(db, fix=fix)
+        for row in drift:
+            print(f"Organizer {row['organizer_id']}: stored {row['stored']}, expected {row['expected']}")
+        if not drift:
+            print("organizer_stats is consistent.")
+        elif fix:
+            print(f"Rewrote counters for {len(drift)} organizer(s).")
+        else:
+            print(f"{len(drift)} organizer(s) out of step. Run with --fix to rewrite them.")
+        return len(drift)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check the organizer_stats counters against the raw events table.")
+    parser.add_argument("--fix", action="store_true", help="Rewrite counters that are out of step")
+    args = parser.parse_args()
+    drift = check_organizer_stats(args.fix)
+    sys.exit(1 if drift and not args.fix else 0)
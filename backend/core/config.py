@@ -6,11 +6,146 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_SATURATION_WARNING: float = 0.9
+    # Report each request's SELECT count in an X-Query-Count header (to spot N+1 queries).
+    # A debugging aid: off in production, where it would add a hook to every statement
+    QUERY_COUNT_HEADER_ENABLED: bool = False
     
     # Security
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # bcrypt runs in a dedicated "process" (default) or "thread" pool; beyond
+    # PASSWORD_HASH_MAX_PENDING queued/running checks, requests get a 429
+    PASSWORD_HASH_EXECUTOR: str = "process"
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 64
+    # bcrypt cost factor; existing hashes are upgraded on the user's next login
+    BCRYPT_ROUNDS: int = 12
+    # Authenticated principal (id, role, is_active) cache, keyed by token subject
+    PRINCIPAL_CACHE_SIZE: int = 10000
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    # Build the principal from the token's signed uid/role/active claims on a cache miss.
+    # Saves the lookup, but role or deactivation changes then apply only to new tokens.
+    AUTH_TRUST_TOKEN_CLAIMS: bool = False
+
+    # Event search backend: "like" (ILIKE scan), "fulltext" (MySQL FULLTEXT / SQLite FTS5) or "trigram" (in-process)
+    SEARCH_BACKEND: str = "like"
+    SEARCH_TRIGRAM_THRESHOLD: float = 0.6
+    SEARCH_MAX_CANDIDATES: int = 1000
+    # How often each worker folds other workers' event writes into its trigram index
+    SEARCH_TRIGRAM_REFRESH_SECONDS: int = 30
+
+    # HTTP response cache for the public event endpoints (core/response_cache.py):
+    # "memory" (per process) or "shared" (Redis at RESPONSE_CACHE_REDIS_URL; in-process stand-in when unset)
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_BACKEND: str = "memory"
+    RESPONSE_CACHE_REDIS_URL: str = ""
+    RESPONSE_CACHE_SIZE: int = 1000
+    RESPONSE_CACHE_TTL_SECONDS: int = 30
+
+    # Image uploads (services/media_service.py); WebP variants need Pillow
+    MEDIA_MAX_UPLOAD_BYTES: int = 10 * 1024 * 1024
+    MEDIA_VARIANT_WORKERS: int = 2
+    MEDIA_DISPLAY_MAX_SIZE: int = 1600
+    MEDIA_THUMBNAIL_SIZE: int = 400
+    MEDIA_WEBP_QUALITY: int = 80
+    # Browser cache lifetime for media not named by content hash (those are immutable)
+    MEDIA_CACHE_MAX_AGE_SECONDS: int = 3600
+    # When set (e.g. "/protected-media/"), /media answers with X-Accel-Redirect and the proxy sends the file
+    MEDIA_ACCEL_REDIRECT_PREFIX: str = ""
+
+    # Bulk event import/export (services/event_transfer_service.py)
+    EVENT_IMPORT_CHUNK_SIZE: int = 1000
+    EVENT_IMPORT_MAX_REPORTED_ERRORS: int = 1000
+    EXPORT_BATCH_SIZE: int = 1000
+
+    # Background jobs
+    EVENT_STATUS_SWEEP_ENABLED: bool = True
+    EVENT_STATUS_SWEEP_INTERVAL_SECONDS: int = 60
+
+    # Sales analytics rollups (services/sales_rollup_service.py)
+    SALES_ROLLUP_ENABLED: bool = True
+    SALES_ROLLUP_INTERVAL_SECONDS: int = 60
+    # Leave bookings this recent for the next run, so in-flight transactions are not skipped
+    SALES_ROLLUP_SETTLE_SECONDS: int = 30
+    SALES_ROLLUP_BATCH_SIZE: int = 5000
+
+    # Background event cancellation (services/cancellation_service.py)
+    CANCELLATION_JOBS_ENABLED: bool = True
+    CANCELLATION_JOB_INTERVAL_SECONDS: float = 2
+    CANCELLATION_CHUNK_SIZE: int = 500
+    # A worker that stops renewing its lease for this long is presumed dead
+    CANCELLATION_LEASE_SECONDS: int = 60
+    CANCELLATION_JOB_MAX_ATTEMPTS: int = 5
+    # Shutdown waits this long for the running chunk to commit and hand its lease back
+    CANCELLATION_STOP_TIMEOUT_SECONDS: float = 30
+
+    # Transactional outbox and its dispatcher (services/outbox_dispatcher.py)
+    OUTBOX_DISPATCHER_ENABLED: bool = True
+    # Comma-separated delivery sinks: log, smtp, webhook
+    OUTBOX_SINKS: str = "log"
+    OUTBOX_POLL_INTERVAL_SECONDS: float = 0.5
+    OUTBOX_BATCH_SIZE: int = 100
+    OUTBOX_MAX_ATTEMPTS: int = 8
+    # Retry n waits about OUTBOX_RETRY_BASE_SECONDS * 2^(n-1), capped, with jitter
+    OUTBOX_RETRY_BASE_SECONDS: float = 2
+    OUTBOX_RETRY_MAX_SECONDS: float = 600
+    # How long a dispatcher may hold a batch before another may deliver it
+    OUTBOX_LOCK_SECONDS: int = 60
+    OUTBOX_RETENTION_HOURS: int = 72
+    OUTBOX_SMTP_HOST: str = "localhost"
+    OUTBOX_SMTP_PORT: int = 1025
+    OUTBOX_SMTP_SENDER: str = "no-reply@event-booking.local"
+    OUTBOX_WEBHOOK_URL: str = "http://localhost:8025/outbox"
+    OUTBOX_WEBHOOK_TIMEOUT_SECONDS: float = 5
+
+    # Seats one user may hold for an event, booked and waitlisted
+    MAX_SEATS_PER_USER: int = 10
+
+    # Waitlist (services/waitlist_service.py)
+    # How long seats offered to the next person in line are held for them
+    WAITLIST_HOLD_SECONDS: int = 900
+    WAITLIST_SWEEP_ENABLED: bool = True
+    WAITLIST_SWEEP_INTERVAL_SECONDS: int = 15
+    # Queue entries considered per allocation (later ones wait for the next free seats)
+    WAITLIST_ALLOCATION_SCAN: int = 100
+
+    # In-memory seat inventory for high-demand events (see services/seat_inventory.py)
+    SEAT_INVENTORY_ENABLED: bool = False
+    SEAT_INVENTORY_STRIPES: int = 64
+    SEAT_INVENTORY_FLUSH_INTERVAL_MS: int = 20
+    SEAT_INVENTORY_FLUSH_BATCH_SIZE: int = 500
+    # How long a booking request waits for its flush before giving up with a 503
+    SEAT_INVENTORY_BOOK_TIMEOUT_SECONDS: float = 10
+
+    # Maintain the organizer_stats summary table and serve the dashboard from it
+    ORGANIZER_STATS_TABLE_ENABLED: bool = False
+
+    # Recommendation profile cache
+    USER_PROFILE_CACHE_SIZE: int = 10000
+    USER_PROFILE_CACHE_TTL_SECONDS: int = 300
+
+    # Recommendation scoring engine: "index" (SQL over event_keywords) or "matrix" (NumPy/SciPy)
+    RECOMMENDATION_ENGINE: str = "index"
+    RECOMMENDATION_MATRIX_MAX_AGE_SECONDS: int = 60
+
+    # Batch recommendations (precompute_recommendations.py)
+    BATCH_RECOMMENDATION_SIZE: int = 20
+    BATCH_RECOMMENDATION_CHUNK_SIZE: int = 500
+    BATCH_RECOMMENDATION_WORKERS: int = 0  # 0 = one per CPU
+    # Runs queued through POST /events/recommendations/precompute (services/recommendation_run_scheduler.py)
+    BATCH_RECOMMENDATION_RUNS_ENABLED: bool = True
+    BATCH_RECOMMENDATION_POLL_INTERVAL_SECONDS: float = 5
+    # A run still RUNNING after this long is presumed dead and no longer blocks new ones
+    BATCH_RECOMMENDATION_RUN_TIMEOUT_SECONDS: int = 3600
+    SERVE_PRECOMPUTED_RECOMMENDATIONS: bool = False
+    PRECOMPUTED_RECOMMENDATIONS_MAX_AGE_SECONDS: int = 86400
 
     class Config:
         env_file = ".env"
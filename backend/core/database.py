@@ -1,7 +1,13 @@
+import ssl
+from typing import Any, AsyncGenerator, Callable
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from .config import settings
+from .pool_metrics import PoolMetrics
+from . import query_counter
 
 # Why: We need a connection to the MySQL database.
 # The URL is pulled from settings to support Docker/Local environments.
@@ -16,14 +22,62 @@ if "aivencloud.com" in settings.DATABASE_URL:
     # PyMySQL expects ssl to be a dict (empty dict = use default SSL)
     connect_args["ssl"] = {}
 
+# Why: Bounded pools with pre-ping and recycling. Pre-ping replaces connections the
+# server closed while idle (managed MySQL drops them), recycle retires them first.
+pool_kwargs = dict(
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+)
+
+pool_metrics = PoolMetrics("sync", settings.DB_MAX_OVERFLOW)
 engine = create_engine(
     db_url,
-    connect_args=connect_args
+    connect_args=connect_args,
+    poolclass=pool_metrics.pool_class(QueuePool),
+    **pool_kwargs
 )
+pool_metrics.attach(engine)
+if settings.QUERY_COUNT_HEADER_ENABLED:
+    query_counter.attach(engine)
 
 # Why: Each request should have its own database session.
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Why: Async endpoints talk to the database without holding a threadpool thread.
+# Same database, async driver: PyMySQL -> aiomysql, pysqlite -> aiosqlite.
+def _async_url(url: str) -> str:
+    for sync_prefix, async_prefix in (
+        ("mysql+pymysql://", "mysql+aiomysql://"),
+        ("mysql://", "mysql+aiomysql://"),
+        ("sqlite://", "sqlite+aiosqlite://"),
+    ):
+        if url.startswith(sync_prefix):
+            return async_prefix + url[len(sync_prefix):]
+    return url
+
+async_connect_args = {}
+if "aivencloud.com" in settings.DATABASE_URL:
+    # aiomysql expects an SSLContext rather than a dict
+    async_connect_args["ssl"] = ssl.create_default_context()
+
+async_pool_metrics = PoolMetrics("async", settings.DB_MAX_OVERFLOW)
+async_engine = create_async_engine(
+    _async_url(db_url),
+    connect_args=async_connect_args,
+    poolclass=async_pool_metrics.pool_class(AsyncAdaptedQueuePool),
+    **pool_kwargs
+)
+async_pool_metrics.attach(async_engine.sync_engine)
+if settings.QUERY_COUNT_HEADER_ENABLED:
+    query_counter.attach(async_engine.sync_engine)
+
+# expire_on_commit=False: objects stay readable after commit, since lazy
+# refreshes are not possible outside the async session's greenlet.
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 # Why: All models will inherit from this Base class for ORM mapping.
 Base = declarative_base()
 
@@ -35,3 +89,13 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# Why: The services are written against a sync Session. run_sync executes them on
+# the async connection (inside SQLAlchemy's greenlet), so async endpoints reuse the
+# same business logic without blocking the event loop on database I/O.
+async def run_sync(db: AsyncSession, fn: Callable[..., Any], *args, **kwargs) -> Any:
+    return await db.run_sync(lambda session: fn(session, *args, **kwargs))
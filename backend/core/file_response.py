@@ -0,0 +1,95 @@
+import os
+from typing import Optional, Tuple
+import anyio
+from fastapi import HTTPException
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+# Why: Starlette's FileResponse (0.35) always streams the whole file through
+# Python in 64 KB reads. This one serves a single byte range, and hands the
+# transfer to the server when it supports the ASGI zero-copy extensions:
+# "http.response.zerocopysend" (sendfile from an open fd, any range) or
+# "http.response.pathsend" (whole file by path).
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    (start, end) inclusive for a single "bytes=" range, None to send the whole
+    file (no header, several ranges, or a header we don't understand).
+    Raises 416 when the range lies outside the file.
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    first, _, last = header[len("bytes="):].strip().partition("-")
+    try:
+        if not first:
+            # Suffix range: the last N bytes
+            length = int(last)
+            if length <= 0:
+                raise ValueError
+            start, end = max(size - length, 0), size - 1
+        else:
+            start = int(first)
+            end = min(int(last), size - 1) if last else size - 1
+            if last and int(last) < start:
+                return None
+    except ValueError:
+        return None
+    if start >= size:
+        raise HTTPException(status_code=416, detail="Range not satisfiable", headers={"Content-Range": f"bytes */{size}"})
+    return start, end
+
+class RangedFileResponse(Response):
+    chunk_size = 256 * 1024
+
+    def __init__(
+        self,
+        path: str,
+        size: int,
+        byte_range: Optional[Tuple[int, int]] = None,
+        headers: Optional[dict] = None,
+        media_type: Optional[str] = None,
+        send_body: bool = True,
+    ):
+        self.path = path
+        self.size = size
+        self.start, self.end = byte_range or (0, size - 1)
+        self.send_body = send_body
+        self.body = b""
+        self.status_code = 206 if byte_range else 200
+        self.media_type = media_type
+        headers = dict(headers or {})
+        headers["accept-ranges"] = "bytes"
+        headers["content-length"] = str(self.end - self.start + 1)
+        if byte_range:
+            headers["content-range"] = f"bytes {self.start}-{self.end}/{size}"
+        self.init_headers(headers)
+        self.background = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        count = self.end - self.start + 1
+        if not self.send_body or count <= 0:
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        extensions = scope.get("extensions") or {}
+        if "http.response.zerocopysend" in extensions:
+            with open(self.path, "rb") as file:
+                await send({"type": "http.response.zerocopysend", "file": file, "offset": self.start, "count": count})
+            return
+        if "http.response.pathsend" in extensions and count == self.size:
+            await send({"type": "http.response.pathsend", "path": os.fspath(self.path)})
+            return
+
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            await file.seek(self.start)
+            remaining = count
+            while remaining > 0:
+                chunk = await file.read(min(self.chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining > 0:
+                # File shrank while we were sending; close the body anyway
+                await send({"type": "http.response.body", "body": b""})
@@ -0,0 +1,40 @@
+import logging
+from pathlib import Path
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
+from .database import Base, engine
+from .search_indexes import create_search_indexes
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent.parent / "migrations"
+
+# Why: `Base.metadata.create_all` only creates missing tables, so existing
+# databases never picked up new columns or indexes. Alembic revisions in
+# backend/migrations/versions bring any database up to the current schema.
+
+def alembic_config() -> Config:
+    config = Config()
+    config.set_main_option("script_location", str(MIGRATIONS_DIR))
+    return config
+
+def upgrade_database():
+    """
+    Bring the database to the latest revision.
+    An empty database is created straight from the models and stamped as
+    current; a database created before migrations existed is upgraded from
+    the baseline revision.
+    """
+    from models import user, event, booking, event_keyword, recommendation, organizer_stats, sales_rollup, cancellation, outbox, waitlist  # register every table
+    tables = set(inspect(engine).get_table_names())
+    config = alembic_config()
+    if "events" not in tables and "alembic_version" not in tables:
+        Base.metadata.create_all(bind=engine)
+        # The models cannot describe full-text indexes; migration 0009 creates them
+        with engine.begin() as conn:
+            create_search_indexes(conn)
+        command.stamp(config, "head")
+        logger.info("Created a new database at the latest schema revision")
+    else:
+        command.upgrade(config, "head")
@@ -0,0 +1,44 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, Optional, Sequence
+from fastapi import HTTPException
+from sqlalchemy import and_, or_
+
+# Why: OFFSET makes the database scan and discard every skipped row, so deep pages
+# get slower and slower. Keyset pagination resumes after the last row seen, using
+# an opaque cursor that encodes that row's sort value(s) and id.
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    payload = [{"$dt": v.isoformat()} if isinstance(v, datetime) else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, size: int) -> list:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        values = [datetime.fromisoformat(v["$dt"]) if isinstance(v, dict) else v for v in payload]
+    except (ValueError, TypeError, KeyError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if len(values) != size:
+        raise HTTPException(status_code=400, detail="Cursor does not match this listing")
+    return values
+
+def keyset_after(columns: Sequence[Any], values: Sequence[Any], desc: bool = False):
+    """
+    Rows strictly after `values` in the ordering by `columns` (all in the same
+    direction), e.g. (a > v1) OR (a = v1 AND b > v2) for two ascending columns.
+    """
+    conditions = []
+    for i, (column, value) in enumerate(zip(columns, values)):
+        past = column < value if desc else column > value
+        equal_prefix = [c == v for c, v in zip(columns[:i], values[:i])]
+        conditions.append(and_(*equal_prefix, past) if equal_prefix else past)
+    return or_(*conditions)
+
+def next_cursor(items: Sequence[Any], limit: int, key: Callable[[Any], Sequence[Any]]) -> Optional[str]:
+    """Cursor for the page after `items`, or None if this was the last page."""
+    if not items or len(items) < limit:
+        return None
+    return encode_cursor(key(items[-1]))
@@ -0,0 +1,82 @@
+import asyncio
+import logging
+import threading
+from typing import Any, Callable, Optional
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STOP_TIMEOUT_SECONDS = 30
+
+# Why: Every background job (ENDED sweep, sales rollups, cancellation jobs, outbox
+# dispatch, waitlist expiry, search index refresh) is the same loop: run a
+# blocking function in the threadpool, sleep, repeat for the life of the app.
+class PeriodicTask:
+    """
+    Calls fn() in the threadpool every interval_seconds until stopped. With
+    returns_delay, fn returns the number of seconds to wait before its next run.
+    A failed run is logged and retried after the interval.
+
+    stop() does not cancel a run in progress (that would leave it running in the
+    threadpool): it sets `stopping`, which fn may poll to finish early, and waits
+    up to stop_timeout seconds for the run to return before giving up on it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fn: Callable[[], Any],
+        interval_seconds: float,
+        returns_delay: bool = False,
+        delay_first: bool = False,
+        stop_timeout: float = DEFAULT_STOP_TIMEOUT_SECONDS,
+    ):
+        self.name = name
+        self.fn = fn
+        self.interval_seconds = interval_seconds
+        self.returns_delay = returns_delay
+        self.delay_first = delay_first
+        self.stop_timeout = stop_timeout
+        self.stopping = threading.Event()
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    async def _sleep(self, seconds: float):
+        try:
+            await asyncio.wait_for(self._wake.wait(), seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _run(self):
+        if self.delay_first:
+            await self._sleep(self.interval_seconds)
+        while not self.stopping.is_set():
+            delay = self.interval_seconds
+            try:
+                result = await run_in_threadpool(self.fn)
+                if self.returns_delay:
+                    delay = result
+            except Exception as e:
+                logger.error(f"{self.name} failed: {e}")
+            await self._sleep(delay)
+
+    def start(self):
+        if self._task is None:
+            self.stopping.clear()
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self.stopping.set()
+        self._wake.set()
+        done, _ = await asyncio.wait({self._task}, timeout=self.stop_timeout)
+        if not done:
+            logger.warning(f"{self.name} still running after {self.stop_timeout}s; abandoning it")
+            self._task.cancel()
+        self._task = None
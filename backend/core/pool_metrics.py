@@ -0,0 +1,97 @@
+import threading
+import time
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Why: Under bursty load we need to see whether requests are queuing for a
+# connection (checkout wait), how close the pool is to its limit (in use and
+# overflow), and how long connections live before being recycled or invalidated.
+class PoolMetrics:
+    def __init__(self, name: str, max_overflow: int):
+        self.name = name
+        self.max_overflow = max_overflow
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.connections_opened = 0
+        self.connections_closed = 0
+        self.invalidated = 0
+        self.total_lifetime = 0.0
+        self.max_lifetime = 0.0
+        self._pool = None
+
+    def pool_class(self, base):
+        """A subclass of `base` that times how long each checkout waits."""
+        metrics = self
+
+        class TimedPool(base):
+            def _do_get(self):
+                started = time.perf_counter()
+                try:
+                    return super()._do_get()
+                finally:
+                    metrics._record_wait(time.perf_counter() - started)
+
+        return TimedPool
+
+    def _record_wait(self, seconds: float):
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += seconds
+            self.max_wait = max(self.max_wait, seconds)
+
+    def _record_lifetime(self, connection_record):
+        opened_at = connection_record.info.pop("opened_at", None)
+        if opened_at is None:
+            return
+        lifetime = time.monotonic() - opened_at
+        with self._lock:
+            self.connections_closed += 1
+            self.total_lifetime += lifetime
+            self.max_lifetime = max(self.max_lifetime, lifetime)
+
+    def attach(self, engine: Engine):
+        self._pool = engine.pool
+
+        @event.listens_for(engine, "connect")
+        def on_connect(dbapi_connection, connection_record):
+            connection_record.info["opened_at"] = time.monotonic()
+            with self._lock:
+                self.connections_opened += 1
+
+        @event.listens_for(engine, "close")
+        def on_close(dbapi_connection, connection_record):
+            self._record_lifetime(connection_record)
+
+        @event.listens_for(engine, "invalidate")
+        def on_invalidate(dbapi_connection, connection_record, exception):
+            with self._lock:
+                self.invalidated += 1
+
+        # The engine may swap in a fresh pool (e.g. dispose()); follow it.
+        @event.listens_for(engine, "engine_disposed")
+        def on_disposed(disposed_engine):
+            self._pool = disposed_engine.pool
+
+    def snapshot(self) -> dict:
+        pool = self._pool
+        pool_size = pool.size()
+        checked_out = pool.checkedout()
+        capacity = pool_size + self.max_overflow
+        with self._lock:
+            return {
+                "pool_size": pool_size,
+                "max_overflow": self.max_overflow,
+                "checked_out": checked_out,
+                "overflow": max(pool.overflow(), 0),
+                "saturation": round(checked_out / capacity, 3) if capacity else 0.0,
+                "checkouts": self.checkouts,
+                "avg_checkout_wait_ms": round(self.total_wait / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "max_checkout_wait_ms": round(self.max_wait * 1000, 3),
+                "connections_opened": self.connections_opened,
+                "connections_closed": self.connections_closed,
+                "invalidated": self.invalidated,
+                "avg_connection_lifetime_s": round(self.total_lifetime / self.connections_closed, 3) if self.connections_closed else 0.0,
+                "max_connection_lifetime_s": round(self.max_lifetime, 3),
+            }
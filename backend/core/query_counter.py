@@ -0,0 +1,38 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+QUERY_COUNT_HEADER = "X-Query-Count"
+
+# Why: N+1 lazy loads stay invisible until a page gets big. Counting the SELECTs
+# each request issues shows whether an endpoint's query count grows with the
+# number of rows it returns. The count follows the request across threadpool
+# hops and AsyncSession.run_sync, since both run in a copy of its context.
+
+class QueryCount:
+    def __init__(self):
+        self.selects = 0
+        self.statements = 0
+
+_current: ContextVar[Optional[QueryCount]] = ContextVar("query_count", default=None)
+
+def attach(engine: Engine):
+    @event.listens_for(engine, "before_cursor_execute")
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        count = _current.get()
+        if count is not None:
+            count.statements += 1
+            if statement.lstrip().upper().startswith("SELECT"):
+                count.selects += 1
+
+@contextmanager
+def count_queries() -> Iterator[QueryCount]:
+    """Count the statements issued inside the block (and the tasks/threads it starts)."""
+    count = QueryCount()
+    token = _current.set(count)
+    try:
+        yield count
+    finally:
+        _current.reset(token)
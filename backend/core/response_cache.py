@@ -0,0 +1,222 @@
+import hashlib
+import json
+import threading
+import time
+from email.utils import format_datetime
+from datetime import timezone
+from typing import Any, Iterable, Optional
+from fastapi import Request, Response
+from .cache import TTLCache
+from .config import settings
+
+try:
+    import redis
+except ImportError:  # Only needed when RESPONSE_CACHE_REDIS_URL is set
+    redis = None
+
+# Why: The public catalogue (GET /events/, GET /events/{id}) is read far more
+# often than it changes. Cached entries hold the serialized JSON body plus its
+# validators, so a hit skips both the database and Pydantic, and a client that
+# already has the body gets a 304.
+#
+# Invalidation:
+#   - event detail entries are keyed by event id and dropped on any write to it
+#   - list entries carry a generation number; any change that can move events
+#     in or out of a listing (create, update, cancel, delete, ENDED sweep) bumps it
+#   - seat changes (bookings) only drop the detail entry and the list pages
+#     that contain that event, found through a per-event tag set
+
+def entry_for(body: bytes, events: Iterable[Any], headers: Optional[dict] = None) -> dict:
+    """A cacheable response: JSON body, an ETag hashed from it and Last-Modified from the events' updated_at."""
+    headers = headers or {}
+    # Why: The ETag hashes what is actually sent. updated_at has one-second
+    # precision on MySQL, so two bookings within a second would keep the same
+    # timestamp while available_seats changed, and revalidation would 304 a
+    # stale seat count.
+    version = hashlib.sha1(body)
+    version.update(json.dumps(headers, sort_keys=True).encode())
+    modified = [e.updated_at for e in events if e.updated_at]
+    return {
+        "body": body.decode(),
+        "etag": f'W/"{version.hexdigest()}"',
+        "last_modified": format_datetime(max(modified).replace(tzinfo=timezone.utc), usegmt=True) if modified else None,
+        "headers": headers,
+    }
+
+def respond(request: Request, entry: dict) -> Response:
+    """The cached body, or a 304 when the client's If-None-Match already names it."""
+    # no-cache: clients may store the body but must revalidate it with the ETag
+    headers = {"ETag": entry["etag"], "Cache-Control": "no-cache", **entry["headers"]}
+    if entry["last_modified"]:
+        headers["Last-Modified"] = entry["last_modified"]
+    known = {tag.strip() for tag in request.headers.get("if-none-match", "").split(",")}
+    if entry["etag"] in known or "*" in known:
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry["body"], media_type="application/json", headers=headers)
+
+class LocalResponseCache:
+    """Per-process cache. Other workers only see a write once their entries expire."""
+    name = "memory"
+
+    def __init__(self, maxsize: int, ttl_seconds: float):
+        self._entries = TTLCache(maxsize=maxsize, ttl_seconds=ttl_seconds)
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._tags: dict[int, set] = {}
+
+    def list_key(self, params: tuple) -> tuple:
+        return ("list", self._generation, params)
+
+    def event_key(self, event_id: int) -> tuple:
+        return ("event", event_id)
+
+    def get(self, key) -> Optional[dict]:
+        return self._entries.get(key)
+
+    def set(self, key, entry: dict, event_ids: Iterable[int]):
+        self._entries.set(key, entry)
+        with self._lock:
+            for event_id in event_ids:
+                self._tags.setdefault(event_id, set()).add(key)
+            if len(self._tags) > 4 * self._entries.maxsize:
+                # Drop tags whose entries were evicted or expired
+                self._tags = {
+                    event_id: live for event_id, keys in self._tags.items()
+                    if (live := {k for k in keys if k in self._entries})
+                }
+
+    def invalidate_event(self, event_id: int):
+        self._entries.invalidate(self.event_key(event_id))
+        with self._lock:
+            keys = self._tags.pop(event_id, ())
+        for key in keys:
+            self._entries.invalidate(key)
+
+    def invalidate_lists(self):
+        with self._lock:
+            self._generation += 1
+
+    def stats(self) -> dict:
+        return {"backend": self.name, **self._entries.stats()}
+
+class InMemoryStore:
+    """Local stand-in for the Redis commands the shared cache uses (development, single process)."""
+
+    def __init__(self):
+        self._values: dict = {}
+        self._sets: dict = {}
+        self._expiry: dict = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        expires_at = self._expiry.get(key)
+        if expires_at is not None and expires_at < time.monotonic():
+            self.delete(key)
+        return self._values.get(key)
+
+    def set(self, key, value, ex=None):
+        with self._lock:
+            self._values[key] = value
+            if ex:
+                self._expiry[key] = time.monotonic() + ex
+
+    def incr(self, key):
+        with self._lock:
+            self._values[key] = int(self._values.get(key, 0)) + 1
+            return self._values[key]
+
+    def sadd(self, key, *members):
+        with self._lock:
+            self._sets.setdefault(key, set()).update(members)
+
+    def smembers(self, key):
+        expires_at = self._expiry.get(key)
+        if expires_at is not None and expires_at < time.monotonic():
+            self.delete(key)
+        return set(self._sets.get(key, ()))
+
+    def expire(self, key, seconds):
+        with self._lock:
+            self._expiry[key] = time.monotonic() + seconds
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._values.pop(key, None)
+                self._sets.pop(key, None)
+                self._expiry.pop(key, None)
+
+class SharedResponseCache:
+    """Cache shared by every worker through Redis, so invalidations apply everywhere at once."""
+    name = "shared"
+    PREFIX = "response-cache:"
+
+    def __init__(self, store, ttl_seconds: int):
+        self.store = store
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+
+    def list_key(self, params: tuple) -> str:
+        generation = int(self.store.get(self.PREFIX + "generation") or 0)
+        return f"{self.PREFIX}list:{generation}:{json.dumps(params, default=str)}"
+
+    def event_key(self, event_id: int) -> str:
+        return f"{self.PREFIX}event:{event_id}"
+
+    def get(self, key) -> Optional[dict]:
+        raw = self.store.get(key)
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(raw)
+
+    def set(self, key, entry: dict, event_ids: Iterable[int]):
+        self.store.set(key, json.dumps(entry), ex=self.ttl_seconds)
+        for event_id in event_ids:
+            tag = f"{self.PREFIX}tag:{event_id}"
+            self.store.sadd(tag, key)
+            self.store.expire(tag, self.ttl_seconds)
+
+    def invalidate_event(self, event_id: int):
+        tag = f"{self.PREFIX}tag:{event_id}"
+        keys = [k.decode() if isinstance(k, bytes) else k for k in self.store.smembers(tag)]
+        self.store.delete(self.event_key(event_id), tag, *keys)
+
+    def invalidate_lists(self):
+        self.store.incr(self.PREFIX + "generation")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+class DisabledResponseCache(LocalResponseCache):
+    """RESPONSE_CACHE_ENABLED=false: nothing is stored, responses still carry validators."""
+    name = "disabled"
+
+    def __init__(self):
+        super().__init__(maxsize=1, ttl_seconds=0)
+
+    def set(self, key, entry: dict, event_ids: Iterable[int]):
+        pass
+
+def _create_cache():
+    if not settings.RESPONSE_CACHE_ENABLED:
+        return DisabledResponseCache()
+    if settings.RESPONSE_CACHE_BACKEND == "memory":
+        return LocalResponseCache(settings.RESPONSE_CACHE_SIZE, settings.RESPONSE_CACHE_TTL_SECONDS)
+    if settings.RESPONSE_CACHE_BACKEND == "shared":
+        if not settings.RESPONSE_CACHE_REDIS_URL:
+            return SharedResponseCache(InMemoryStore(), settings.RESPONSE_CACHE_TTL_SECONDS)
+        if redis is None:
+            raise RuntimeError("RESPONSE_CACHE_REDIS_URL requires the redis package (pip install redis)")
+        return SharedResponseCache(redis.Redis.from_url(settings.RESPONSE_CACHE_REDIS_URL), settings.RESPONSE_CACHE_TTL_SECONDS)
+    raise RuntimeError(f"Unknown RESPONSE_CACHE_BACKEND '{settings.RESPONSE_CACHE_BACKEND}' (expected memory or shared)")
+
+response_cache = _create_cache()
@@ -0,0 +1,71 @@
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+
+# Why: The full-text search backend needs indexes the models cannot describe
+# (a MySQL FULLTEXT index, an SQLite FTS5 table plus its sync triggers). They
+# are created by migration 0009, and by upgrade_database for a brand-new
+# database, never by a serving process at startup.
+
+FTS_TABLE = "events_fts"
+FULLTEXT_INDEX = "ft_events_title_location"
+FULLTEXT_COLUMNS = ("title", "location")
+# Location-only index created by earlier releases; location filters no longer use it
+LEGACY_INDEXES = ("ft_events_location",)
+
+def _sqlite_table_exists(conn: Connection, name: str) -> bool:
+    return conn.execute(text(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"
+    ), {"name": name}).first() is not None
+
+def search_indexes_exist(conn: Connection) -> bool:
+    if conn.dialect.name == "mysql":
+        return FULLTEXT_INDEX in {ix["name"] for ix in inspect(conn).get_indexes("events")}
+    if conn.dialect.name == "sqlite":
+        return _sqlite_table_exists(conn, FTS_TABLE)
+    return False
+
+def create_search_indexes(conn: Connection):
+    """Create the full-text indexes over events. Safe to run twice; a no-op on other dialects."""
+    if conn.dialect.name == "mysql":
+        existing = {ix["name"] for ix in inspect(conn).get_indexes("events")}
+        if FULLTEXT_INDEX not in existing:
+            conn.execute(text(
+                f"ALTER TABLE events ADD FULLTEXT INDEX {FULLTEXT_INDEX} ({', '.join(FULLTEXT_COLUMNS)})"
+            ))
+        for name in LEGACY_INDEXES:
+            if name in existing:
+                conn.execute(text(f"ALTER TABLE events DROP INDEX {name}"))
+    elif conn.dialect.name == "sqlite":
+        if _sqlite_table_exists(conn, FTS_TABLE):
+            return
+        # External-content FTS5 table over events, kept in sync by triggers
+        conn.execute(text(
+            f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+            f"title, location, content='events', content_rowid='id')"
+        ))
+        conn.execute(text(f"""
+            CREATE TRIGGER events_fts_ai AFTER INSERT ON events BEGIN
+                INSERT INTO {FTS_TABLE}(rowid, title, location) VALUES (new.id, new.title, new.location);
+            END"""))
+        conn.execute(text(f"""
+            CREATE TRIGGER events_fts_ad AFTER DELETE ON events BEGIN
+                INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, location)
+                VALUES ('delete', old.id, old.title, old.location);
+            END"""))
+        conn.execute(text(f"""
+            CREATE TRIGGER events_fts_au AFTER UPDATE OF title, location ON events BEGIN
+                INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, location)
+                VALUES ('delete', old.id, old.title, old.location);
+                INSERT INTO {FTS_TABLE}(rowid, title, location) VALUES (new.id, new.title, new.location);
+            END"""))
+        conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+
+def drop_search_indexes(conn: Connection):
+    if conn.dialect.name == "mysql":
+        inspector = inspect(conn)
+        if inspector.has_table("events") and FULLTEXT_INDEX in {ix["name"] for ix in inspector.get_indexes("events")}:
+            conn.execute(text(f"ALTER TABLE events DROP INDEX {FULLTEXT_INDEX}"))
+    elif conn.dialect.name == "sqlite":
+        for trigger in ("events_fts_ai", "events_fts_ad", "events_fts_au"):
+            conn.execute(text(f"DROP TRIGGER IF EXISTS {trigger}"))
+        conn.execute(text(f"DROP TABLE IF EXISTS {FTS_TABLE}"))
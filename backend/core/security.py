@@ -1,10 +1,13 @@
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any, Union
+from typing import Any, Optional, Tuple, Union
+from fastapi import HTTPException
 from jose import jwt
 from passlib.context import CryptContext
 from core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
@@ -12,6 +15,74 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
+def verify_and_rehash_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify, and return a fresh hash when the stored one used another cost (BCRYPT_ROUNDS changed)."""
+    if not pwd_context.verify(plain_password, hashed_password):
+        return False, None
+    return True, pwd_context.hash(plain_password) if pwd_context.needs_update(hashed_password) else None
+
+# Why: bcrypt is deliberately slow CPU work. It must not run on the event loop or in
+# Starlette's shared threadpool, where a login burst would stall unrelated requests.
+# It gets a dedicated, bounded executor: a process pool by default, so hashing never
+# competes with request handling for the GIL. Once PASSWORD_HASH_MAX_PENDING checks
+# are queued or running, further ones are rejected with a 429 instead of queueing
+# behind seconds of work.
+_hash_executor: Optional[Executor] = None
+_hash_pending = 0
+
+def _executor() -> Executor:
+    global _hash_executor
+    if _hash_executor is None:
+        if settings.PASSWORD_HASH_EXECUTOR == "process":
+            _hash_executor = ProcessPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS)
+        elif settings.PASSWORD_HASH_EXECUTOR == "thread":
+            _hash_executor = ThreadPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_WORKERS,
+                thread_name_prefix="password-hash"
+            )
+        else:
+            raise RuntimeError(f"Unknown PASSWORD_HASH_EXECUTOR '{settings.PASSWORD_HASH_EXECUTOR}' (expected process or thread)")
+    return _hash_executor
+
+def shutdown_hash_executor():
+    global _hash_executor
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=False, cancel_futures=True)
+        _hash_executor = None
+
+async def _run_hash(fn, *args):
+    # Only touched from the event loop, so the counter needs no lock
+    global _hash_pending
+    if _hash_pending >= settings.PASSWORD_HASH_MAX_PENDING:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many password checks in progress, try again shortly",
+            headers={"Retry-After": "1"},
+        )
+    _hash_pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_executor(), fn, *args)
+    finally:
+        _hash_pending -= 1
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_hash(verify_password, plain_password, hashed_password)
+
+async def verify_and_rehash_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return await _run_hash(verify_and_rehash_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    return await _run_hash(get_password_hash, password)
+
+def hash_executor_stats() -> dict:
+    return {
+        "executor": settings.PASSWORD_HASH_EXECUTOR,
+        "workers": settings.PASSWORD_HASH_WORKERS,
+        "pending": _hash_pending,
+        "max_pending": settings.PASSWORD_HASH_MAX_PENDING,
+    }
+
 def create_access_token(subject: Union[str, Any], claims: dict = None, expires_delta: timedelta = None) -> str:
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
@@ -0,0 +1,37 @@
+from core.database import SessionLocal
+from models import user, event, booking, event_keyword, recommendation, organizer_stats, sales_rollup, cancellation, outbox, waitlist
+from models.user import User, UserRole
+from services.event_transfer_service import EventTransferService
+import argparse
+
+def import_events(path: str, organizer_email: str, format: str = None, chunk_size: int = None):
+    print("Connecting to database...")
+    db = SessionLocal()
+    try:
+        organizer = db.query(User).filter(User.email == organizer_email, User.role == UserRole.ORGANIZER).first()
+        if not organizer:
+            print(f"No organizer with email {organizer_email}")
+            return
+        format = EventTransferService.resolve_format(format, path)
+        print(f"Importing {path} ({format}) for {organizer_email}...")
+        with open(path, "rb") as file:
+            stats = EventTransferService.import_events(db, file, format, organizer.id, chunk_size=chunk_size)
+        print(
+            f"Imported {stats['imported']} event(s), {stats['failed']} row(s) failed, "
+            f"in {stats['seconds']}s: {stats['rows_per_sec']} rows/sec"
+        )
+        for error in stats["errors"]:
+            print(f"  line {error['line']}: {error['error']}")
+    except Exception as e:
+        print(f"Error importing events: {e}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk-create events for an organizer from an NDJSON or CSV file.")
+    parser.add_argument("path", help="File to import")
+    parser.add_argument("--organizer", required=True, help="Email of the organizer who will own the events")
+    parser.add_argument("--format", choices=["ndjson", "csv"], help="File format (default: from the extension)")
+    parser.add_argument("--chunk-size", type=int, help="Rows inserted per transaction")
+    args = parser.parse_args()
+    import_events(args.path, args.organizer, args.format, args.chunk_size)
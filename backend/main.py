@@ -18,19 +18,19 @@ except Exception as e:
     raise e
 
 from api.api import api_router
-from core.database import Base, engine
+from core.migrations import upgrade_database
 
 import time
 from sqlalchemy.exc import OperationalError
 
-# Create tables with retry logic
+# Create or migrate tables with retry logic
 max_retries = 10
 retry_interval = 2
 
 for i in range(max_retries):
     try:
-        Base.metadata.create_all(bind=engine)
-        print("Database tables created successfully.")
+        upgrade_database()
+        print("Database schema is up to date.")
         break
     except OperationalError as e:
         if i == max_retries - 1:
@@ -39,9 +39,92 @@ for i in range(max_retries):
         print(f"Database connection failed. Retrying in {retry_interval} seconds... ({i+1}/{max_retries})")
         time.sleep(retry_interval)
 
-app = FastAPI(title=settings.PROJECT_NAME, openapi_url=f"{settings.API_STR}/openapi.json")
+import asyncio
+from contextlib import asynccontextmanager
+from services.event_status_scheduler import EventStatusScheduler
+from services.sales_rollup_scheduler import SalesRollupScheduler
+from services.cancellation_scheduler import CancellationScheduler
+from services.outbox_dispatcher import outbox_dispatcher
+from services.waitlist_scheduler import WaitlistScheduler
+from services.recommendation_run_scheduler import RecommendationRunScheduler
+from services.seat_inventory import seat_inventory
+from starlette.concurrency import run_in_threadpool
+from core.database import SessionLocal, async_engine
+from core.security import hash_executor_stats, shutdown_hash_executor
+
+from services.keyword_index import KeywordIndex
+from services.search_service import search_backend
+from services.recommendation_matrix import recommendation_matrix
+from services.search_refresh_scheduler import SearchRefreshScheduler
+from services.media_service import MediaService
+from services.organizer_stats_service import OrganizerStatsService
+
+def backfill_keyword_index():
+    db = SessionLocal()
+    try:
+        indexed = KeywordIndex.backfill(db)
+        if indexed:
+            logger.info(f"Indexed keywords for {indexed} existing event(s)")
+    finally:
+        db.close()
+
+def sync_organizer_stats():
+    db = SessionLocal()
+    try:
+        drift = OrganizerStatsService.check(db, fix=True)
+        if drift:
+            logger.info(f"Rebuilt organizer_stats counters for {len(drift)} organizer(s)")
+    finally:
+        db.close()
+
+def reconcile_seat_inventory():
+    db = SessionLocal()
+    try:
+        updated = seat_inventory.reconcile(db)
+        logger.info(f"Reconciled seat counters for {updated} high-demand event(s)")
+    finally:
+        db.close()
+
+# Why: Background jobs live for the lifetime of the app, not of a request.
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await run_in_threadpool(backfill_keyword_index)
+    await run_in_threadpool(search_backend.prepare)
+    if settings.RECOMMENDATION_ENGINE == "matrix":
+        await run_in_threadpool(recommendation_matrix.refresh)
+    tasks = [
+        task for enabled, task in (
+            (settings.SEARCH_BACKEND == "trigram", SearchRefreshScheduler().task),
+            (settings.EVENT_STATUS_SWEEP_ENABLED, EventStatusScheduler().task),
+            (settings.SALES_ROLLUP_ENABLED, SalesRollupScheduler().task),
+            (settings.CANCELLATION_JOBS_ENABLED, CancellationScheduler().task),
+            (settings.OUTBOX_DISPATCHER_ENABLED, outbox_dispatcher.task),
+            (settings.WAITLIST_SWEEP_ENABLED, WaitlistScheduler().task),
+            (settings.BATCH_RECOMMENDATION_RUNS_ENABLED, RecommendationRunScheduler().task),
+        ) if enabled
+    ]
+    for task in tasks:
+        task.start()
+    if settings.SEAT_INVENTORY_ENABLED:
+        await run_in_threadpool(reconcile_seat_inventory)
+        seat_inventory.start()
+    if settings.ORGANIZER_STATS_TABLE_ENABLED:
+        # Counters are only maintained while enabled, so catch up on startup
+        await run_in_threadpool(sync_organizer_stats)
+    yield
+    await asyncio.gather(*(task.stop() for task in tasks))
+    outbox_dispatcher.close()
+    # Drain pending write-behind bookings before the process exits.
+    await run_in_threadpool(seat_inventory.stop)
+    shutdown_hash_executor()
+    await run_in_threadpool(MediaService.shutdown)
+    await async_engine.dispose()
+
+app = FastAPI(title=settings.PROJECT_NAME, openapi_url=f"{settings.API_STR}/openapi.json", lifespan=lifespan)
 
 from fastapi.middleware.cors import CORSMiddleware
+from core.pagination import NEXT_CURSOR_HEADER
+from core.query_counter import QUERY_COUNT_HEADER, count_queries
 
 app.add_middleware(
     CORSMiddleware,
@@ -49,19 +132,51 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, QUERY_COUNT_HEADER, "ETag"],
 )
 
+if settings.QUERY_COUNT_HEADER_ENABLED:
+    @app.middleware("http")
+    async def report_query_count(request, call_next):
+        with count_queries() as count:
+            response = await call_next(request)
+        response.headers[QUERY_COUNT_HEADER] = str(count.selects)
+        return response
+
 app.include_router(api_router, prefix=settings.API_STR)
 
-from fastapi.staticfiles import StaticFiles
+from api.endpoints import media
 import os
 os.makedirs("media", exist_ok=True)
-app.mount("/media", StaticFiles(directory="media"), name="media")
+app.include_router(media.router, prefix="/media", tags=["media"])
+
+from core.database import async_pool_metrics, pool_metrics
+from core.response_cache import response_cache
+from api.deps import principal_cache_stats
 
 # Why: Simple health check to verify the service and db connection are reachable.
+# Also reports connection pool saturation so load balancers and dashboards can see
+# the pool running out before requests start timing out, the response cache hit rate
+# and how far notification delivery is behind.
 @app.get("/health")
 def health_check():
-    return {"status": "ok", "app_name": settings.PROJECT_NAME}
+    pools = {"sync": pool_metrics.snapshot(), "async": async_pool_metrics.snapshot()}
+    saturated = any(p["saturation"] >= settings.DB_POOL_SATURATION_WARNING for p in pools.values())
+    # The outbox lag comes from the database; a health check must still answer when it is down
+    try:
+        outbox = outbox_dispatcher.stats()
+    except Exception as e:
+        logger.warning(f"Health check could not read outbox stats: {e}")
+        outbox = {"status": "unavailable", "error": str(e)}
+    return {
+        "status": "degraded" if saturated or "error" in outbox else "ok",
+        "app_name": settings.PROJECT_NAME,
+        "db_pools": pools,
+        "response_cache": response_cache.stats(),
+        "principal_cache": principal_cache_stats(),
+        "password_hashing": hash_executor_stats(),
+        "outbox": outbox,
+    }
 
 @app.get("/")
 def root():
@@ -0,0 +1,27 @@
+from logging.config import fileConfig
+from alembic import context
+from core.database import Base, engine
+from models import user, event, booking, event_keyword, recommendation, organizer_stats, sales_rollup, cancellation, outbox, waitlist  # register every table
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+target_metadata = Base.metadata
+
+def run_migrations_offline():
+    context.configure(url=engine.url, target_metadata=target_metadata, literal_binds=True)
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online():
+    # Reuse the app's engine so SSL and pool settings match the running service
+    with engine.connect() as connection:
+        context.configure(connection=connection, target_metadata=target_metadata, render_as_batch=True)
+        with context.begin_transaction():
+            context.run_migrations()
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
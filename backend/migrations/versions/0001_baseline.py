@@ -0,0 +1,57 @@
+"""baseline: bring databases created by create_all up to date
+
+Databases created before migrations existed may lack the columns and tables
+added since, so every step checks what is already there.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 09:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+    event_columns = {c["name"] for c in inspector.get_columns("events")}
+
+    with op.batch_alter_table("events") as batch_op:
+        if "is_high_demand" not in event_columns:
+            batch_op.add_column(sa.Column("is_high_demand", sa.Boolean(), nullable=False, server_default=sa.false()))
+        if "keyword_count" not in event_columns:
+            batch_op.add_column(sa.Column("keyword_count", sa.Integer(), nullable=True))
+
+    if "event_keywords" not in tables:
+        op.create_table(
+            "event_keywords",
+            sa.Column("token", sa.String(255), primary_key=True),
+            sa.Column("event_id", sa.Integer(), sa.ForeignKey("events.id"), primary_key=True),
+        )
+        op.create_index("ix_event_keywords_event_id", "event_keywords", ["event_id"])
+
+    if "recommendations" not in tables:
+        op.create_table(
+            "recommendations",
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), primary_key=True),
+            sa.Column("rank", sa.Integer(), primary_key=True),
+            sa.Column("event_id", sa.Integer(), sa.ForeignKey("events.id"), nullable=False),
+            sa.Column("score", sa.Float(), nullable=False),
+            sa.Column("created_at", sa.DateTime()),
+        )
+        op.create_index("ix_recommendations_event_id", "recommendations", ["event_id"])
+
+
+def downgrade() -> None:
+    # The baseline describes the schema migrations started from; there is nothing to undo.
+    pass
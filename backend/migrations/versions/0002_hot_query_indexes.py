@@ -0,0 +1,43 @@
+"""composite indexes for hot query shapes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 09:30:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    # EventService: effective status filters, the ENDED sweep, next end boundary
+    ("ix_events_status_end_date_date", "events", ["status", "end_date", "date"]),
+    # BookingService / RecommendationService: PUBLISHED events starting after now
+    ("ix_events_status_date", "events", ["status", "date"]),
+    # EventService: organizer dashboards
+    ("ix_events_organizer_id_date", "events", ["organizer_id", "date"]),
+    # BookingService: my bookings, newest first
+    ("ix_bookings_user_id_id", "bookings", ["user_id", "id"]),
+    # BookingService: per-user seat cap
+    ("ix_bookings_user_id_event_id_status", "bookings", ["user_id", "event_id", "status"]),
+    # EventService / SeatInventory: confirmed seats per event
+    ("ix_bookings_event_id_status", "bookings", ["event_id", "status"]),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
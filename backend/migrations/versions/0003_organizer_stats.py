@@ -0,0 +1,34 @@
+"""organizer_stats summary table
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 11:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "organizer_stats",
+        sa.Column("organizer_id", sa.Integer(), sa.ForeignKey("users.id"), primary_key=True),
+        sa.Column("total_events", sa.Integer(), nullable=False),
+        sa.Column("active_events", sa.Integer(), nullable=False),
+        sa.Column("tickets_sold", sa.Integer(), nullable=False),
+        sa.Column("total_revenue", sa.Float(), nullable=False),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("organizer_stats")
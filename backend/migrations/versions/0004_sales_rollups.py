@@ -0,0 +1,68 @@
+"""sales rollup tables, watermarks and booking cancellation time
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 13:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ROLLUP_TABLES = ("sales_rollup_hourly", "sales_rollup_daily")
+FEEDS = ("sales", "cancellations")
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("bookings") as batch_op:
+        batch_op.add_column(sa.Column("cancelled_at", sa.DateTime(), nullable=True))
+    # Bookings cancelled before the column existed: their creation time is the
+    # best estimate, and without one they would count as sold forever
+    op.execute(
+        "UPDATE bookings SET cancelled_at = created_at "
+        "WHERE status IN ('CANCELLED_BY_ORGANIZER', 'CANCELLED_BY_USER') AND cancelled_at IS NULL"
+    )
+    op.create_index("ix_bookings_created_at_id", "bookings", ["created_at", "id"])
+    op.create_index("ix_bookings_cancelled_at_id", "bookings", ["cancelled_at", "id"])
+
+    for table in ROLLUP_TABLES:
+        op.create_table(
+            table,
+            sa.Column("bucket", sa.DateTime(), primary_key=True),
+            sa.Column("event_id", sa.Integer(), sa.ForeignKey("events.id"), primary_key=True),
+            sa.Column("organizer_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("seats_sold", sa.Integer(), nullable=False),
+            sa.Column("seats_cancelled", sa.Integer(), nullable=False),
+            sa.Column("revenue", sa.Float(), nullable=False),
+        )
+        op.create_index(f"ix_{table}_organizer_id_bucket", table, ["organizer_id", "bucket"])
+
+    watermarks = op.create_table(
+        "rollup_watermarks",
+        sa.Column("name", sa.String(50), primary_key=True),
+        sa.Column("position_at", sa.DateTime(), nullable=True),
+        sa.Column("position_id", sa.Integer(), nullable=False),
+        sa.Column("covered_until", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+    # Seeded here so concurrent first runs lock an existing row instead of racing to insert it
+    op.bulk_insert(watermarks, [{"name": feed, "position_at": None, "position_id": 0} for feed in FEEDS])
+
+
+def downgrade() -> None:
+    op.drop_table("rollup_watermarks")
+    for table in reversed(ROLLUP_TABLES):
+        op.drop_index(f"ix_{table}_organizer_id_bucket", table_name=table)
+        op.drop_table(table)
+    op.drop_index("ix_bookings_cancelled_at_id", table_name="bookings")
+    op.drop_index("ix_bookings_created_at_id", table_name="bookings")
+    with op.batch_alter_table("bookings") as batch_op:
+        batch_op.drop_column("cancelled_at")
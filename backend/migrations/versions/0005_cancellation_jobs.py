@@ -0,0 +1,63 @@
+"""cancellation jobs and their refund/notification work items
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 15:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "cancellation_jobs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("event_id", sa.Integer(), sa.ForeignKey("events.id"), nullable=False, unique=True),
+        sa.Column("status", sa.Enum("PENDING", "RUNNING", "COMPLETED", "FAILED", name="cancellationjobstatus"), nullable=False),
+        sa.Column("total_bookings", sa.Integer(), nullable=False),
+        sa.Column("processed_bookings", sa.Integer(), nullable=False),
+        sa.Column("last_booking_id", sa.Integer(), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("error", sa.String(500), nullable=True),
+        sa.Column("lease_owner", sa.String(100), nullable=True),
+        sa.Column("lease_expires_at", sa.DateTime(), nullable=True),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_cancellation_jobs_status_lease_expires_at", "cancellation_jobs", ["status", "lease_expires_at"])
+
+    op.create_table(
+        "cancellation_work_items",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("job_id", sa.Integer(), sa.ForeignKey("cancellation_jobs.id"), nullable=False),
+        sa.Column("kind", sa.Enum("REFUND", "NOTIFY", name="workitemkind"), nullable=False),
+        sa.Column("dedupe_key", sa.String(100), nullable=False, unique=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("booking_id", sa.Integer(), sa.ForeignKey("bookings.id"), nullable=True),
+        sa.Column("seats", sa.Integer(), nullable=False),
+        sa.Column("amount", sa.Float(), nullable=False),
+        sa.Column("status", sa.Enum("PENDING", "DONE", name="workitemstatus"), nullable=False),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("processed_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_cancellation_work_items_job_id_kind", "cancellation_work_items", ["job_id", "kind"])
+    op.create_index("ix_cancellation_work_items_status_id", "cancellation_work_items", ["status", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_cancellation_work_items_status_id", table_name="cancellation_work_items")
+    op.drop_index("ix_cancellation_work_items_job_id_kind", table_name="cancellation_work_items")
+    op.drop_table("cancellation_work_items")
+    op.drop_index("ix_cancellation_jobs_status_lease_expires_at", table_name="cancellation_jobs")
+    op.drop_table("cancellation_jobs")
@@ -0,0 +1,47 @@
+"""waitlist queue per event
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 19:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "waitlist_entries",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("event_id", sa.Integer(), sa.ForeignKey("events.id"), nullable=False),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("number_of_seats", sa.Integer(), nullable=False),
+        sa.Column(
+            "status",
+            sa.Enum("WAITING", "OFFERED", "CLAIMED", "EXPIRED", "LEFT", "CANCELLED", name="waitliststatus"),
+            nullable=False,
+        ),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("offered_at", sa.DateTime(), nullable=True),
+        sa.Column("hold_expires_at", sa.DateTime(), nullable=True),
+        sa.Column("booking_id", sa.Integer(), sa.ForeignKey("bookings.id"), nullable=True),
+    )
+    op.create_index("ix_waitlist_entries_event_id_status_id", "waitlist_entries", ["event_id", "status", "id"])
+    op.create_index("ix_waitlist_entries_status_hold_expires_at", "waitlist_entries", ["status", "hold_expires_at"])
+    op.create_index("ix_waitlist_entries_user_id_id", "waitlist_entries", ["user_id", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_waitlist_entries_user_id_id", table_name="waitlist_entries")
+    op.drop_index("ix_waitlist_entries_status_hold_expires_at", table_name="waitlist_entries")
+    op.drop_index("ix_waitlist_entries_event_id_status_id", table_name="waitlist_entries")
+    op.drop_table("waitlist_entries")
@@ -0,0 +1,43 @@
+"""backfill cancelled_at and seed rollup watermarks on databases already past 0004
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 10:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+FEEDS = ("sales", "cancellations")
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    backfilled = bind.execute(sa.text(
+        "UPDATE bookings SET cancelled_at = created_at "
+        "WHERE status IN ('CANCELLED_BY_ORGANIZER', 'CANCELLED_BY_USER') AND cancelled_at IS NULL"
+    )).rowcount
+    if backfilled:
+        # Those cancellations lie behind the watermarks, so fold everything again
+        op.execute("DELETE FROM sales_rollup_hourly")
+        op.execute("DELETE FROM sales_rollup_daily")
+        op.execute("UPDATE rollup_watermarks SET position_at = NULL, position_id = 0, covered_until = NULL")
+
+    existing = {name for (name,) in bind.execute(sa.text("SELECT name FROM rollup_watermarks"))}
+    for feed in FEEDS:
+        if feed not in existing:
+            bind.execute(sa.text("INSERT INTO rollup_watermarks (name, position_id) VALUES (:name, 0)"), {"name": feed})
+
+
+def downgrade() -> None:
+    # Data only; nothing to undo
+    pass
@@ -0,0 +1,31 @@
+"""full-text search indexes over event title and location
+
+Creates the MySQL FULLTEXT index or the SQLite FTS5 table (and triggers) used
+by SEARCH_BACKEND=fulltext, and drops the location-only FULLTEXT index earlier
+releases created at startup.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 11:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from core.search_indexes import create_search_indexes, drop_search_indexes
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0009'
+down_revision: Union[str, None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    create_search_indexes(op.get_bind())
+
+
+def downgrade() -> None:
+    drop_search_indexes(op.get_bind())
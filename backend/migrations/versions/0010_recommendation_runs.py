@@ -0,0 +1,40 @@
+"""queued batch recommendation runs
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19 09:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0010'
+down_revision: Union[str, None] = '0009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "recommendation_runs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("status", sa.Enum("PENDING", "RUNNING", "COMPLETED", "FAILED", name="recommendationrunstatus"), nullable=False),
+        sa.Column("requested_by", sa.Integer(), sa.ForeignKey("users.id"), nullable=True),
+        sa.Column("users", sa.Integer(), nullable=True),
+        sa.Column("events", sa.Integer(), nullable=True),
+        sa.Column("seconds", sa.Float(), nullable=True),
+        sa.Column("error", sa.String(500), nullable=True),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_recommendation_runs_status", "recommendation_runs", ["status"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_recommendation_runs_status", table_name="recommendation_runs")
+    op.drop_table("recommendation_runs")
@@ -0,0 +1,31 @@
+"""binary collation for event_keywords.token on MySQL
+
+The default utf8mb4 collations compare accent- and case-insensitively, so two
+tokens KeywordIndex treats as different ("resume", "résumé") collided on the
+(token, event_id) primary key. Other dialects already compare exactly.
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-19 10:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0011'
+down_revision: Union[str, None] = '0010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "mysql":
+        op.execute("ALTER TABLE event_keywords MODIFY token VARCHAR(255) CHARACTER SET utf8mb4 COLLATE utf8mb4_bin NOT NULL")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "mysql":
+        op.execute("ALTER TABLE event_keywords MODIFY token VARCHAR(255) NOT NULL")
@@ -1,5 +1,5 @@
 import enum
-from sqlalchemy import Column, Integer, String, DateTime, Enum, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Enum, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from core.database import Base
 from datetime import datetime
@@ -11,6 +11,18 @@ class BookingStatus(str, enum.Enum):
 
 class Booking(Base):
     __tablename__ = "bookings"
+    # Why: One composite index per hot query shape (added by migration 0002).
+    __table_args__ = (
+        # "My bookings", newest first, paged by id
+        Index("ix_bookings_user_id_id", "user_id", "id"),
+        # Per-user seat cap check on booking
+        Index("ix_bookings_user_id_event_id_status", "user_id", "event_id", "status"),
+        # Seats sold per event: cancellations, reconcile and organizer stats
+        Index("ix_bookings_event_id_status", "event_id", "status"),
+        # Sales rollup feeds (added by migration 0004)
+        Index("ix_bookings_created_at_id", "created_at", "id"),
+        Index("ix_bookings_cancelled_at_id", "cancelled_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -18,6 +30,8 @@ class Booking(Base):
     status = Column(Enum(BookingStatus), default=BookingStatus.CONFIRMED, nullable=False)
     number_of_seats = Column(Integer, default=1, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
+    # Set when the booking leaves CONFIRMED; feeds the sales rollups
+    cancelled_at = Column(DateTime, nullable=True)
 
     user = relationship("User", back_populates="bookings")
     event = relationship("Event", back_populates="bookings")
@@ -0,0 +1,72 @@
+import enum
+from sqlalchemy import Column, Integer, Float, String, DateTime, Enum, ForeignKey, Index
+from core.database import Base
+from datetime import datetime
+
+class CancellationJobStatus(str, enum.Enum):
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    COMPLETED = "COMPLETED"
+    FAILED = "FAILED"
+
+class WorkItemKind(str, enum.Enum):
+    REFUND = "REFUND"
+    NOTIFY = "NOTIFY"
+
+class WorkItemStatus(str, enum.Enum):
+    PENDING = "PENDING"
+    DONE = "DONE"
+
+# Why: Cancelling an event used to update all of its bookings in the request's
+# transaction. The request now only flips the event to CANCELLED and queues a
+# job; CancellationService works through the bookings in id order, one short
+# transaction per chunk, and records where it got to so any worker can resume.
+class CancellationJob(Base):
+    __tablename__ = "cancellation_jobs"
+    __table_args__ = (
+        # Workers look for unfinished jobs whose lease is free
+        Index("ix_cancellation_jobs_status_lease_expires_at", "status", "lease_expires_at"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    event_id = Column(Integer, ForeignKey("events.id"), nullable=False, unique=True)
+    status = Column(Enum(CancellationJobStatus), default=CancellationJobStatus.PENDING, nullable=False)
+    # Confirmed bookings when the event was cancelled, for progress reporting
+    total_bookings = Column(Integer, nullable=False, default=0)
+    processed_bookings = Column(Integer, nullable=False, default=0)
+    # Resume point: every booking up to this id has been handled
+    last_booking_id = Column(Integer, nullable=False, default=0)
+    # Failed runs; the job gives up after CANCELLATION_JOB_MAX_ATTEMPTS
+    attempts = Column(Integer, nullable=False, default=0)
+    error = Column(String(500), nullable=True)
+    # The worker running the job renews this every chunk; once it lapses
+    # (the worker died) another worker takes over
+    lease_owner = Column(String(100), nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+# Refunds (one per booking) and notifications (one per user) owed because an
+# event was cancelled, for downstream processing. dedupe_key makes recording
+# them idempotent.
+class CancellationWorkItem(Base):
+    __tablename__ = "cancellation_work_items"
+    __table_args__ = (
+        Index("ix_cancellation_work_items_job_id_kind", "job_id", "kind"),
+        # Consumers poll for pending items in id order
+        Index("ix_cancellation_work_items_status_id", "status", "id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    job_id = Column(Integer, ForeignKey("cancellation_jobs.id"), nullable=False)
+    kind = Column(Enum(WorkItemKind), nullable=False)
+    dedupe_key = Column(String(100), nullable=False, unique=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    booking_id = Column(Integer, ForeignKey("bookings.id"), nullable=True)  # refunds only
+    # Refunds: the booking's seats and their price; 0 for notifications
+    seats = Column(Integer, nullable=False, default=0)
+    amount = Column(Float, nullable=False, default=0.0)
+    status = Column(Enum(WorkItemStatus), default=WorkItemStatus.PENDING, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    processed_at = Column(DateTime, nullable=True)
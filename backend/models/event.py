@@ -1,6 +1,6 @@
 import enum
 
-from sqlalchemy import Column, Integer, String, Float, DateTime, Enum, ForeignKey
+from sqlalchemy import Boolean, Column, Integer, String, Float, DateTime, Enum, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from core.database import Base
 from datetime import datetime
@@ -20,6 +20,15 @@ class EventType(str, enum.Enum):
 
 class Event(Base):
     __tablename__ = "events"
+    # Why: One composite index per hot query shape (added by migration 0002).
+    __table_args__ = (
+        # Effective-status filters, the ENDED sweep and the next end boundary
+        Index("ix_events_status_end_date_date", "status", "end_date", "date"),
+        # Bookable / recommendable candidates: PUBLISHED and starting after now
+        Index("ix_events_status_date", "status", "date"),
+        # Organizer dashboards, sorted by date by default
+        Index("ix_events_organizer_id_date", "organizer_id", "date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     organizer_id = Column(Integer, ForeignKey("users.id"))
@@ -38,6 +47,12 @@ class Event(Base):
     event_type = Column(Enum(EventType), default=EventType.OTHER, nullable=False)
     
     status = Column(Enum(EventStatus), default=EventStatus.DRAFT)
+
+    # Why: Flash-sale events are booked through the in-memory seat inventory.
+    is_high_demand = Column(Boolean(), default=False, nullable=False)
+
+    # Size of the event's keyword set in event_keywords (NULL = not indexed yet).
+    keyword_count = Column(Integer, nullable=True)
     
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, ForeignKey
+from core.database import Base
+
+TOKEN_LENGTH = 255
+
+# Why: Inverted index from keyword to event, so recommendations only score
+# events that share at least one keyword with the user's profile.
+class EventKeyword(Base):
+    __tablename__ = "event_keywords"
+
+    # Binary collation on MySQL: the default ones treat "resume" and "résumé" as
+    # one key, while KeywordIndex keeps them apart, so indexing an event whose
+    # text had both failed on the primary key
+    token = Column(
+        String(TOKEN_LENGTH).with_variant(String(TOKEN_LENGTH, collation="utf8mb4_bin"), "mysql"),
+        primary_key=True
+    )
+    event_id = Column(Integer, ForeignKey("events.id"), primary_key=True, index=True)
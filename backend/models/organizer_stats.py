@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey
+from core.database import Base
+from datetime import datetime
+
+# Why: Dashboard totals kept up to date by the writes that change them, so the
+# organizer dashboard is a primary-key lookup instead of an aggregate over every
+# event. Maintained only when ORGANIZER_STATS_TABLE_ENABLED is set.
+class OrganizerStats(Base):
+    __tablename__ = "organizer_stats"
+
+    organizer_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    total_events = Column(Integer, nullable=False, default=0)
+    # Events whose stored status is PUBLISHED; the ENDED sweep moves them out
+    active_events = Column(Integer, nullable=False, default=0)
+    tickets_sold = Column(Integer, nullable=False, default=0)
+    total_revenue = Column(Float, nullable=False, default=0.0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,33 @@
+import enum
+from sqlalchemy import Column, Integer, String, Text, DateTime, Enum, Index
+from core.database import Base
+from datetime import datetime
+
+class OutboxStatus(str, enum.Enum):
+    PENDING = "PENDING"
+    SENT = "SENT"
+    FAILED = "FAILED"  # Gave up after OUTBOX_MAX_ATTEMPTS
+
+# Why: Side effects of a booking or event change (emails, webhooks) must happen
+# exactly when the change commits, but not on the request's latency path. The
+# change writes a message here in its own transaction; OutboxDispatcher delivers
+# it afterwards, in batches, retrying with backoff. Delivery is at-least-once:
+# receivers dedupe on the message id.
+class OutboxMessage(Base):
+    __tablename__ = "outbox_messages"
+    __table_args__ = (
+        # The dispatcher reads pending messages in id order
+        Index("ix_outbox_messages_status_id", "status", "id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    topic = Column(String(50), nullable=False)
+    payload = Column(Text, nullable=False)  # JSON
+    status = Column(Enum(OutboxStatus), default=OutboxStatus.PENDING, nullable=False)
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    # Set while a dispatcher is delivering the message, so others skip it
+    locked_until = Column(DateTime, nullable=True)
+    last_error = Column(String(500), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    sent_at = Column(DateTime, nullable=True)
@@ -0,0 +1,38 @@
+import enum
+from sqlalchemy import Column, Integer, Float, String, DateTime, Enum, ForeignKey
+from core.database import Base
+from datetime import datetime
+
+# Why: Precomputed "recommended for you" lists, written by the batch job
+# (precompute_recommendations.py) and optionally served by the live endpoint.
+class Recommendation(Base):
+    __tablename__ = "recommendations"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    rank = Column(Integer, primary_key=True)
+    event_id = Column(Integer, ForeignKey("events.id"), nullable=False, index=True)
+    score = Column(Float, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class RecommendationRunStatus(str, enum.Enum):
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    COMPLETED = "COMPLETED"
+    FAILED = "FAILED"
+
+# Why: A batch run scores every user against every event, far too long for a
+# request. POST /events/recommendations/precompute only queues one of these;
+# a background worker runs it and records the outcome for the status endpoint.
+class RecommendationRun(Base):
+    __tablename__ = "recommendation_runs"
+
+    id = Column(Integer, primary_key=True)
+    status = Column(Enum(RecommendationRunStatus), default=RecommendationRunStatus.PENDING, nullable=False, index=True)
+    requested_by = Column(Integer, ForeignKey("users.id"), nullable=True)
+    users = Column(Integer, nullable=True)
+    events = Column(Integer, nullable=True)
+    seconds = Column(Float, nullable=True)
+    error = Column(String(500), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
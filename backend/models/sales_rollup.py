@@ -0,0 +1,34 @@
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, Index, String
+from core.database import Base
+from datetime import datetime
+
+# Why: Sales-over-time charts read pre-aggregated buckets instead of grouping
+# every booking on each request. SalesRollupService fills both tables
+# incrementally from bookings (sales) and cancellations since its watermarks.
+class SalesRollupColumns:
+    bucket = Column(DateTime, primary_key=True)  # start of the UTC hour/day
+    event_id = Column(Integer, ForeignKey("events.id"), primary_key=True)
+    organizer_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    seats_sold = Column(Integer, nullable=False, default=0)
+    seats_cancelled = Column(Integer, nullable=False, default=0)
+    # Net of cancellations, at the event's price when the rollup ran
+    revenue = Column(Float, nullable=False, default=0.0)
+
+class HourlySalesRollup(SalesRollupColumns, Base):
+    __tablename__ = "sales_rollup_hourly"
+    __table_args__ = (Index("ix_sales_rollup_hourly_organizer_id_bucket", "organizer_id", "bucket"),)
+
+class DailySalesRollup(SalesRollupColumns, Base):
+    __tablename__ = "sales_rollup_daily"
+    __table_args__ = (Index("ix_sales_rollup_daily_organizer_id_bucket", "organizer_id", "bucket"),)
+
+# How far each rollup feed has been processed, as a (timestamp, booking id) keyset position.
+class RollupWatermark(Base):
+    __tablename__ = "rollup_watermarks"
+
+    name = Column(String(50), primary_key=True)
+    position_at = Column(DateTime, nullable=True)
+    position_id = Column(Integer, nullable=False, default=0)
+    # Every row of the feed up to this time has been processed
+    covered_until = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,39 @@
+import enum
+from sqlalchemy import Column, Integer, DateTime, Enum, ForeignKey, Index
+from core.database import Base
+from datetime import datetime
+
+class WaitlistStatus(str, enum.Enum):
+    WAITING = "WAITING"
+    OFFERED = "OFFERED"      # Seats held for the user until hold_expires_at
+    CLAIMED = "CLAIMED"      # Turned into a booking
+    EXPIRED = "EXPIRED"      # Hold lapsed; the seats went to the next in line
+    LEFT = "LEFT"            # The user left the queue or declined the offer
+    CANCELLED = "CANCELLED"  # The event was cancelled
+
+# Why: When an event is sold out, attendees queue here instead of polling the
+# booking endpoint. Seats freed by a cancellation are offered to the queue, in
+# order, in the same transaction that frees them: they are taken out of
+# available_seats and held for WAITLIST_HOLD_SECONDS, so nobody else can book
+# them. An unclaimed hold is passed on by the expiry sweep.
+class WaitlistEntry(Base):
+    __tablename__ = "waitlist_entries"
+    __table_args__ = (
+        # Each event's queue, in arrival order
+        Index("ix_waitlist_entries_event_id_status_id", "event_id", "status", "id"),
+        # Expiry sweep
+        Index("ix_waitlist_entries_status_hold_expires_at", "status", "hold_expires_at"),
+        # "My waitlist"
+        Index("ix_waitlist_entries_user_id_id", "user_id", "id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    event_id = Column(Integer, ForeignKey("events.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    number_of_seats = Column(Integer, nullable=False, default=1)
+    status = Column(Enum(WaitlistStatus), default=WaitlistStatus.WAITING, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    offered_at = Column(DateTime, nullable=True)
+    hold_expires_at = Column(DateTime, nullable=True)
+    # The booking a claimed offer became
+    booking_id = Column(Integer, ForeignKey("bookings.id"), nullable=True)
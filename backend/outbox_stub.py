@@ -0,0 +1,86 @@
+import argparse
+import json
+import socketserver
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Local stand-ins for the outbox sinks in development: a minimal SMTP server
+# and a webhook endpoint that print what they receive. Point OUTBOX_SMTP_HOST /
+# OUTBOX_SMTP_PORT and OUTBOX_WEBHOOK_URL at them and set OUTBOX_SINKS=smtp,webhook.
+
+received = {"emails": 0, "webhook_messages": 0}
+lock = threading.Lock()
+
+class SmtpHandler(socketserver.StreamRequestHandler):
+    def reply(self, line: str):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        self.reply("220 outbox-stub ESMTP")
+        recipients = []
+        while line := self.rfile.readline():
+            command = line.decode(errors="replace").strip()
+            verb = command.split(" ", 1)[0].upper()
+            if verb in ("HELO", "EHLO"):
+                self.reply("250 outbox-stub")
+            elif verb == "MAIL":
+                recipients = []
+                self.reply("250 OK")
+            elif verb == "RCPT":
+                recipients.append(command.split(":", 1)[-1].strip(" <>"))
+                self.reply("250 OK")
+            elif verb == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                subject = ""
+                while (data := self.rfile.readline()) not in (b".\r\n", b".\n", b""):
+                    if data.lower().startswith(b"subject:"):
+                        subject = data.decode(errors="replace")[8:].strip()
+                with lock:
+                    received["emails"] += 1
+                print(f"[smtp] to {', '.join(recipients)}: {subject}")
+                self.reply("250 OK: queued")
+            elif verb == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("250 OK")
+
+class WebhookHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        messages = body.get("messages", [])
+        with lock:
+            received["webhook_messages"] += len(messages)
+        for message in messages:
+            print(f"[webhook] {message.get('id')} {message.get('topic')} {json.dumps(message.get('payload'))}")
+        self.send_response(204)
+        self.end_headers()
+
+    def do_GET(self):
+        # Totals so far, for load tests
+        body = json.dumps(received).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+class ThreadingSmtpServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run local SMTP and webhook stubs for the outbox dispatcher.")
+    parser.add_argument("--smtp-port", type=int, default=1025)
+    parser.add_argument("--http-port", type=int, default=8025)
+    args = parser.parse_args()
+    smtp = ThreadingSmtpServer(("127.0.0.1", args.smtp_port), SmtpHandler)
+    threading.Thread(target=smtp.serve_forever, daemon=True).start()
+    print(f"SMTP stub on 127.0.0.1:{args.smtp_port}, webhook stub on http://127.0.0.1:{args.http_port}/outbox")
+    try:
+        ThreadingHTTPServer(("127.0.0.1", args.http_port), WebhookHandler).serve_forever()
+    except KeyboardInterrupt:
+        pass
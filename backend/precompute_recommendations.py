@@ -0,0 +1,27 @@
+from core.database import SessionLocal
+from models import user, event, booking, event_keyword, recommendation, organizer_stats, sales_rollup, cancellation, outbox, waitlist
+from services.batch_recommendation_service import BatchRecommendationService
+import argparse
+
+def precompute_recommendations(limit: int = None, chunk_size: int = None, workers: int = None):
+    print("Connecting to database...")
+    db = SessionLocal()
+    try:
+        print("Precomputing recommendations for all users...")
+        stats = BatchRecommendationService.precompute_all(db, limit=limit, chunk_size=chunk_size, workers=workers)
+        print(
+            f"Scored {stats['users']} users against {stats['events']} open events "
+            f"in {stats['seconds']}s with {stats['workers']} worker(s): {stats['users_per_sec']} users/sec"
+        )
+    except Exception as e:
+        print(f"Error precomputing recommendations: {e}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write recommended events for every user to the recommendations table.")
+    parser.add_argument("--limit", type=int, help="Recommendations stored per user")
+    parser.add_argument("--chunk-size", type=int, help="Users scored per worker task")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: one per CPU)")
+    args = parser.parse_args()
+    precompute_recommendations(args.limit, args.chunk_size, args.workers)
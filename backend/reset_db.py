@@ -1,6 +1,9 @@
 from sqlalchemy import create_engine
 from core.database import Base, engine
-from models import user, event, booking
+from core.migrations import upgrade_database
+from core.search_indexes import drop_search_indexes
+from sqlalchemy import text
+from models import user, event, booking, event_keyword, recommendation, organizer_stats, sales_rollup, cancellation, outbox, waitlist
 import sys
 import os
 
@@ -13,11 +16,15 @@ def reset_db():
     print("Connecting to database...")
     try:
         print("Dropping all tables...")
+        with engine.begin() as conn:
+            drop_search_indexes(conn)
         Base.metadata.drop_all(bind=engine)
+        with engine.begin() as conn:
+            conn.execute(text("DROP TABLE IF EXISTS alembic_version"))
         print("Tables dropped successfully.")
         
         print("Recreating tables...")
-        Base.metadata.create_all(bind=engine)
+        upgrade_database()
         print("Tables created successfully.")
 
         # Cleanup Media
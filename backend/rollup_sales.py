@@ -0,0 +1,30 @@
+from core.database import SessionLocal
+from models import user, event, booking, event_keyword, recommendation, organizer_stats, sales_rollup, cancellation, outbox, waitlist
+from services.sales_rollup_service import SalesRollupService
+import argparse
+
+def rollup_sales(rebuild: bool = False, batch_size: int = None):
+    print("Connecting to database...")
+    db = SessionLocal()
+    try:
+        if rebuild:
+            print("Rebuilding sales rollups from every booking...")
+            stats = SalesRollupService.rebuild(db)
+        else:
+            print("Rolling up bookings since the last run...")
+            stats = SalesRollupService.run(db, batch_size=batch_size)
+        print(
+            f"Rolled up {stats['sales']} booking(s) and {stats['cancellations']} cancellation(s) "
+            f"in {stats['seconds']}s: {stats['rows_per_sec']} rows/sec"
+        )
+    except Exception as e:
+        print(f"Error rolling up sales: {e}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fold new bookings and cancellations into the hourly/daily sales rollups.")
+    parser.add_argument("--rebuild", action="store_true", help="Drop the rollups and recompute them from all bookings")
+    parser.add_argument("--batch-size", type=int, help="Bookings read per transaction")
+    args = parser.parse_args()
+    rollup_sales(args.rebuild, args.batch_size)
@@ -0,0 +1,23 @@
+from core.database import SessionLocal
+from models import user, event, booking, event_keyword, recommendation, organizer_stats, sales_rollup, cancellation, outbox, waitlist
+from services.cancellation_scheduler import CancellationScheduler
+from services.cancellation_service import CancellationService
+import argparse
+
+def run_cancellations():
+    print("Connecting to database...")
+    db = SessionLocal()
+    try:
+        worker = CancellationScheduler().worker
+        print("Running queued event cancellations (jobs held by a live worker are skipped)...")
+        cancelled = CancellationService.run_pending(db, worker)
+        print(f"Cancelled {cancelled} booking(s)")
+    except Exception as e:
+        print(f"Error running cancellations: {e}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Finish queued or interrupted event cancellations now, without the app running.")
+    parser.parse_args()
+    run_cancellations()
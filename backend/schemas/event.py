@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, computed_field
 from typing import Optional
 from datetime import datetime
 from models.event import EventStatus, EventType
@@ -12,10 +12,16 @@ class EventBase(BaseModel):
     total_seats: int = Field(gt=0, description="Total seats must be greater than 0")
     price: float = Field(ge=0, description="Price must be non-negative")
     event_type: EventType = EventType.OTHER
+    is_high_demand: bool = False
 
 class EventCreate(EventBase):
     pass
 
+class EventImport(EventCreate):
+    """One row of a bulk import (NDJSON object or CSV row)."""
+    status: EventStatus = EventStatus.DRAFT
+    image_url: Optional[str] = None
+
 class EventUpdate(BaseModel):
     title: Optional[str] = None
     description: Optional[str] = None
@@ -27,6 +33,7 @@ class EventUpdate(BaseModel):
     status: Optional[EventStatus] = None
     image_id: Optional[str] = None
     event_type: Optional[EventType] = None
+    is_high_demand: Optional[bool] = None
 
 class EventResponse(EventBase):
     id: int
@@ -37,5 +44,11 @@ class EventResponse(EventBase):
     created_at: datetime
     updated_at: datetime
 
+    @computed_field
+    @property
+    def image_thumbnail_id(self) -> Optional[str]:
+        from services.media_service import MediaService
+        return MediaService.thumbnail_for(self.image_id)
+
     class Config:
         from_attributes = True
@@ -8,3 +8,5 @@ class Token(BaseModel):
 class TokenPayload(BaseModel):
     sub: Optional[str] = None
     role: Optional[str] = None
+    uid: Optional[int] = None
+    active: Optional[bool] = None
@@ -0,0 +1,22 @@
+from typing import Optional
+from pydantic import BaseModel, Field
+from datetime import datetime
+from models.waitlist import WaitlistStatus
+
+class WaitlistJoin(BaseModel):
+    event_id: int
+    number_of_seats: int = Field(1, gt=0)
+
+class WaitlistEntryResponse(BaseModel):
+    id: int
+    event_id: int
+    number_of_seats: int
+    status: WaitlistStatus
+    # 1-based place in the queue while WAITING
+    position: Optional[int] = None
+    hold_expires_at: Optional[datetime] = None
+    booking_id: Optional[int] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,251 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Optional
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+from core.config import settings
+from models.booking import Booking
+from models.event import Event, EventStatus
+from models.event_keyword import EventKeyword
+from models.recommendation import Recommendation, RecommendationRun, RecommendationRunStatus
+from models.user import User
+from services.user_profile_service import UserProfileService
+
+# Candidate events for the current run, installed once per worker process
+# so they are not pickled again for every chunk of users.
+_candidates: Optional[dict] = None
+
+def _init_worker(candidates: dict):
+    global _candidates
+    _candidates = candidates
+
+def _score_users(profiles: list[tuple], limit: int) -> list[tuple]:
+    """
+    Rank candidate events for each (user_id, keywords, excluded_ids) profile.
+    Same ordering as the live endpoint: Jaccard score desc, then event id asc.
+    """
+    event_ids = _candidates["event_ids"]
+    sizes = _candidates["sizes"]
+    postings = _candidates["postings"]
+
+    results = []
+    for user_id, keywords, excluded_ids in profiles:
+        shared: dict[int, int] = {}
+        for keyword in keywords:
+            for event_id in postings.get(keyword, ()):
+                shared[event_id] = shared.get(event_id, 0) + 1
+
+        scored = [
+            (count / (len(keywords) + sizes[event_id] - count), event_id)
+            for event_id, count in shared.items() if event_id not in excluded_ids
+        ]
+        scored.sort(key=lambda x: (-x[0], x[1]))
+        ranked = scored[:limit]
+
+        # Fill remaining slots with zero-score candidates in id order.
+        if len(ranked) < limit:
+            for event_id in event_ids:
+                if event_id not in shared and event_id not in excluded_ids:
+                    ranked.append((0.0, event_id))
+                    if len(ranked) == limit:
+                        break
+
+        results.append((user_id, ranked))
+    return results
+
+class BatchRecommendationService:
+    @staticmethod
+    def load_candidates(db: Session, now: datetime) -> dict:
+        """Load every open event and its keywords once for the whole run."""
+        event_ids = [
+            event_id for (event_id,) in db.query(Event.id).filter(
+                Event.status == EventStatus.PUBLISHED,
+                Event.date > now
+            ).order_by(Event.id.asc())
+        ]
+        open_ids = set(event_ids)
+
+        sizes: dict[int, int] = {}
+        postings: dict[str, list[int]] = {}
+        rows = db.query(EventKeyword.token, EventKeyword.event_id).join(Event, Event.id == EventKeyword.event_id)\
+                 .filter(Event.status == EventStatus.PUBLISHED, Event.date > now)
+        for token, event_id in rows:
+            if event_id in open_ids:
+                postings.setdefault(token, []).append(event_id)
+                sizes[event_id] = sizes.get(event_id, 0) + 1
+
+        return {"event_ids": event_ids, "sizes": sizes, "postings": postings}
+
+    @staticmethod
+    def _store(db: Session, results: list[tuple]):
+        user_ids = [user_id for user_id, _ in results]
+        db.query(Recommendation).filter(Recommendation.user_id.in_(user_ids)).delete(synchronize_session=False)
+        created_at = datetime.utcnow()
+        db.bulk_insert_mappings(Recommendation, [
+            {"user_id": user_id, "rank": rank, "event_id": event_id, "score": score, "created_at": created_at}
+            for user_id, ranked in results
+            for rank, (score, event_id) in enumerate(ranked)
+        ])
+        db.commit()
+
+    @staticmethod
+    def precompute_all(
+        db: Session,
+        limit: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+        workers: Optional[int] = None,
+        mp_context=None,
+    ) -> dict:
+        """
+        Score every active user against every open event and store the results.
+        mp_context picks how worker processes start (see multiprocessing.get_context).
+        """
+        limit = limit or settings.BATCH_RECOMMENDATION_SIZE
+        chunk_size = chunk_size or settings.BATCH_RECOMMENDATION_CHUNK_SIZE
+        workers = workers or settings.BATCH_RECOMMENDATION_WORKERS or os.cpu_count() or 1
+
+        started = time.perf_counter()
+        candidates = BatchRecommendationService.load_candidates(db, datetime.now())
+        user_ids = [user_id for (user_id,) in db.query(User.id).filter(User.is_active == True).order_by(User.id)]
+
+        def chunks():
+            for i in range(0, len(user_ids), chunk_size):
+                profiles = UserProfileService.build_profiles(db, user_ids[i:i + chunk_size])
+                yield [(p.user_id, p.keywords, p.booked_event_ids) for p in profiles]
+
+        users = 0
+        if workers == 1:
+            _init_worker(candidates)
+            for chunk in chunks():
+                results = _score_users(chunk, limit)
+                BatchRecommendationService._store(db, results)
+                users += len(results)
+        else:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=mp_context,
+                                     initializer=_init_worker, initargs=(candidates,)) as pool:
+                pending = [pool.submit(_score_users, chunk, limit) for chunk in chunks()]
+                for future in pending:
+                    results = future.result()
+                    BatchRecommendationService._store(db, results)
+                    users += len(results)
+
+        elapsed = time.perf_counter() - started
+        return {
+            "users": users,
+            "events": len(candidates["event_ids"]),
+            "workers": workers,
+            "seconds": round(elapsed, 3),
+            "users_per_sec": round(users / elapsed, 1) if elapsed else 0.0,
+        }
+
+    @staticmethod
+    def get_precomputed(db: Session, user_id: int, limit: int, now: datetime) -> Optional[list[Event]]:
+        """
+        Serve a fresh precomputed list, skipping events that closed or were booked
+        since the batch ran. Returns None when the live path should be used instead.
+        """
+        fresh_after = datetime.utcnow() - timedelta(seconds=settings.PRECOMPUTED_RECOMMENDATIONS_MAX_AGE_SECONDS)
+        booked = db.query(Booking.event_id).filter(Booking.user_id == user_id)
+        events = db.query(Event).join(Recommendation, Recommendation.event_id == Event.id).filter(
+            Recommendation.user_id == user_id,
+            Recommendation.created_at >= fresh_after,
+            Event.status == EventStatus.PUBLISHED,
+            Event.date > now,
+            Event.id.notin_(booked)
+        ).order_by(Recommendation.rank.asc()).limit(limit).all()
+        if len(events) < limit:
+            return None
+        return events
+
+    @staticmethod
+    def _expire_abandoned_runs(db: Session):
+        # A run whose process died stays RUNNING; after the timeout it no longer blocks new ones
+        cutoff = datetime.utcnow() - timedelta(seconds=settings.BATCH_RECOMMENDATION_RUN_TIMEOUT_SECONDS)
+        db.query(RecommendationRun).filter(
+            RecommendationRun.status == RecommendationRunStatus.RUNNING,
+            RecommendationRun.started_at < cutoff
+        ).update({
+            RecommendationRun.status: RecommendationRunStatus.FAILED,
+            RecommendationRun.error: "Run did not finish",
+            RecommendationRun.finished_at: datetime.utcnow(),
+        }, synchronize_session=False)
+
+    @staticmethod
+    def enqueue(db: Session, user_id: int) -> dict:
+        """Queue a batch run, or report the one already queued or running: only one runs at a time."""
+        BatchRecommendationService._expire_abandoned_runs(db)
+        run = db.query(RecommendationRun).filter(
+            RecommendationRun.status.in_((RecommendationRunStatus.PENDING, RecommendationRunStatus.RUNNING))
+        ).order_by(RecommendationRun.id).first()
+        if run is None:
+            run = RecommendationRun(requested_by=user_id)
+            db.add(run)
+        db.commit()
+        db.refresh(run)
+        return BatchRecommendationService._run_status(run)
+
+    @staticmethod
+    def get_run_status(db: Session, run_id: int) -> dict:
+        run = db.get(RecommendationRun, run_id)
+        if not run:
+            raise HTTPException(status_code=404, detail="Recommendation run not found")
+        return BatchRecommendationService._run_status(run)
+
+    @staticmethod
+    def _run_status(run: RecommendationRun) -> dict:
+        return {
+            "run_id": run.id,
+            "status": run.status.value,
+            "users": run.users,
+            "events": run.events,
+            "seconds": run.seconds,
+            "users_per_sec": round(run.users / run.seconds, 1) if run.users and run.seconds else None,
+            "error": run.error,
+            "created_at": run.created_at,
+            "started_at": run.started_at,
+            "finished_at": run.finished_at,
+        }
+
+    @staticmethod
+    def claim_run(db: Session) -> Optional[int]:
+        """Start the oldest queued run. Returns its id, or None when there is none (or another worker won it)."""
+        run_id = db.query(RecommendationRun.id).filter(
+            RecommendationRun.status == RecommendationRunStatus.PENDING
+        ).order_by(RecommendationRun.id).limit(1).scalar()
+        if run_id is None:
+            db.rollback()
+            return None
+        # Conditional, so two workers polling at once can't both start it
+        claimed = db.query(RecommendationRun).filter(
+            RecommendationRun.id == run_id,
+            RecommendationRun.status == RecommendationRunStatus.PENDING
+        ).update({
+            RecommendationRun.status: RecommendationRunStatus.RUNNING,
+            RecommendationRun.started_at: datetime.utcnow(),
+        }, synchronize_session=False)
+        db.commit()
+        return run_id if claimed else None
+
+    @staticmethod
+    def run_pending(db: Session, mp_context=None) -> Optional[int]:
+        """Run the oldest queued batch to completion and record how it went. Returns its id, or None."""
+        run_id = BatchRecommendationService.claim_run(db)
+        if run_id is None:
+            return None
+        try:
+            stats = BatchRecommendationService.precompute_all(db, mp_context=mp_context)
+            values = {
+                RecommendationRun.status: RecommendationRunStatus.COMPLETED,
+                RecommendationRun.users: stats["users"],
+                RecommendationRun.events: stats["events"],
+                RecommendationRun.seconds: stats["seconds"],
+            }
+        except Exception as e:
+            db.rollback()
+            values = {RecommendationRun.status: RecommendationRunStatus.FAILED, RecommendationRun.error: str(e)[:500]}
+        values[RecommendationRun.finished_at] = datetime.utcnow()
+        db.query(RecommendationRun).filter(RecommendationRun.id == run_id).update(values, synchronize_session=False)
+        db.commit()
+        return run_id
@@ -1,48 +1,81 @@
-from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import and_, case, func
+from sqlalchemy.orm import Session, joinedload
 from fastapi import HTTPException
 from models.booking import Booking, BookingStatus
 from models.event import Event, EventStatus
 from schemas.booking import BookingCreate
+from core.config import settings
+from core.pagination import decode_cursor
+from services.seat_inventory import seat_inventory
+from services.user_profile_service import UserProfileService
+from services.organizer_stats_service import OrganizerStatsService
+from services.outbox_service import BOOKING_CANCELLED, BOOKING_CONFIRMED, OutboxService
+from core.response_cache import response_cache
+from services.waitlist_service import WaitlistService
 
 class BookingService:
+    MAX_SEATS_PER_USER = settings.MAX_SEATS_PER_USER
+
+    @staticmethod
+    def get_user_booked_seats(db: Session, user_id: int, event_id: int) -> int:
+        return db.query(func.coalesce(func.sum(Booking.number_of_seats), 0)).filter(
+            Booking.user_id == user_id,
+            Booking.event_id == event_id,
+            Booking.status == BookingStatus.CONFIRMED
+        ).scalar()
+
     @staticmethod
     def create_booking(db: Session, booking_in: BookingCreate, user_id: int) -> Booking:
+        if settings.SEAT_INVENTORY_ENABLED:
+            slot = seat_inventory.get_slot(db, booking_in.event_id)
+            if slot is not None:
+                booking = seat_inventory.book(
+                    db, slot, user_id, booking_in.number_of_seats, BookingService.MAX_SEATS_PER_USER
+                )
+                UserProfileService.record_booking(user_id, booking.event)
+                return booking
+
         try:
-            # Lock the event row for high concurrency safety
-            event = db.query(Event).with_for_update().filter(Event.id == booking_in.event_id).first()
-            
-            if not event:
-                raise HTTPException(status_code=404, detail="Event not found")
-            
-            if event.status != EventStatus.PUBLISHED:
-                raise HTTPException(status_code=400, detail="Event is not published or has already ended")
-            
-            from datetime import datetime
-            if event.date < datetime.utcnow():
-                event.status = EventStatus.ENDED
-                db.commit()
-                raise HTTPException(status_code=400, detail="This event has already ended and cannot be booked")
+            # Why: A single guarded UPDATE claims the seats atomically, with no
+            # SELECT ... FOR UPDATE round trip first, and the count can never go negative.
+            now = datetime.utcnow()
+            claimed = db.query(Event).filter(
+                Event.id == booking_in.event_id,
+                Event.status == EventStatus.PUBLISHED,
+                Event.date >= now,
+                Event.available_seats >= booking_in.number_of_seats
+            ).update(
+                {Event.available_seats: Event.available_seats - booking_in.number_of_seats},
+                synchronize_session=False
+            )
 
-            # Check existing bookings for this user and event to prevent hoarding
-            existing_bookings = db.query(Booking).filter(
-                Booking.user_id == user_id,
-                Booking.event_id == booking_in.event_id,
-                Booking.status == BookingStatus.CONFIRMED
-            ).all()
+            if not claimed:
+                # Nothing was written; work out which guard rejected the booking.
+                event = db.query(Event).filter(Event.id == booking_in.event_id).first()
+                if not event:
+                    raise HTTPException(status_code=404, detail="Event not found")
+                if event.status != EventStatus.PUBLISHED:
+                    raise HTTPException(status_code=400, detail="Event is not published or has already ended")
+                if event.date < now:
+                    raise HTTPException(status_code=400, detail="This event has already ended and cannot be booked")
+                raise HTTPException(status_code=400, detail="Not enough seats available")
 
-            total_booked_already = sum(b.number_of_seats for b in existing_bookings)
-            if total_booked_already + booking_in.number_of_seats > 10:
+            # Check existing bookings for this user and event to prevent hoarding. This
+            # runs after the UPDATE on purpose: it holds the event row's lock until
+            # commit, so a concurrent booking by the same user waits for this one and
+            # the sum (the transaction's first plain read) includes it. Going over the
+            # cap rolls the claim back.
+            total_booked_already = BookingService.get_user_booked_seats(db, user_id, booking_in.event_id)
+            # Seats on the waitlist (waiting or held) count too
+            total_booked_already += WaitlistService.waitlisted_seats(db, user_id, booking_in.event_id)
+            if total_booked_already + booking_in.number_of_seats > BookingService.MAX_SEATS_PER_USER:
                 raise HTTPException(
                     status_code=400, 
-                    detail=f"You can only book a maximum of 10 seats for this event. You already have {total_booked_already}."
+                    detail=f"You can only book a maximum of {BookingService.MAX_SEATS_PER_USER} seats for this event. You already have {total_booked_already}."
                 )
-            
-            if event.available_seats < booking_in.number_of_seats:
-                raise HTTPException(status_code=400, detail="Not enough seats available")
-            
-
-            
-            event.available_seats -= booking_in.number_of_seats
+            OrganizerStatsService.record_seats(db, booking_in.event_id, booking_in.number_of_seats)
             
             booking = Booking(
                 user_id=user_id,
@@ -51,8 +84,15 @@ class BookingService:
                 number_of_seats=booking_in.number_of_seats
             )
             db.add(booking)
+            db.flush()
+            OutboxService.add(db, BOOKING_CONFIRMED, {
+                "booking_id": booking.id, "event_id": booking.event_id, "user_id": user_id, "seats": booking.number_of_seats,
+            })
             db.commit()
+            # available_seats changed: drop the cached responses that show it
+            response_cache.invalidate_event(booking_in.event_id)
             db.refresh(booking)
+            UserProfileService.record_booking(user_id, booking.event)
             return booking
             
         except HTTPException as e:
@@ -63,26 +103,30 @@ class BookingService:
             raise HTTPException(status_code=500, detail=str(e))
 
     @staticmethod
-    def get_user_bookings(db: Session, user_id: int, skip: int = 0, limit: int = 100):
-        return db.query(Booking).filter(Booking.user_id == user_id).order_by(Booking.id.desc()).offset(skip).limit(limit).all()
+    def get_user_bookings(db: Session, user_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+        # Load each booking's event in the same query; responses embed the full event
+        query = db.query(Booking).options(joinedload(Booking.event))\
+                  .filter(Booking.user_id == user_id).order_by(Booking.id.desc())
+        if cursor:
+            (last_id,) = decode_cursor(cursor, 1)
+            query = query.filter(Booking.id < last_id)
+        else:
+            query = query.offset(skip)
+        return query.limit(limit).all()
 
     @staticmethod
     def get_user_stats(db: Session, user_id: int) -> dict:
-        from datetime import datetime
-        bookings = db.query(Booking).filter(Booking.user_id == user_id).all()
-        
-        total_bookings = len(bookings)
-        
-
+        # One aggregate query instead of loading every booking and its event
         now = datetime.utcnow()
-        upcoming_count = 0
-        for b in bookings:
-            if b.status == BookingStatus.CONFIRMED and b.event.date > now:
-                upcoming_count += 1
-                
+        upcoming = case((and_(Booking.status == BookingStatus.CONFIRMED, Event.date > now), 1), else_=0)
+        total_bookings, upcoming_count = db.query(
+            func.count(Booking.id),
+            func.coalesce(func.sum(upcoming), 0)
+        ).join(Event, Event.id == Booking.event_id).filter(Booking.user_id == user_id).one()
+
         return {
             "total_bookings": total_bookings,
-            "upcoming_events": upcoming_count
+            "upcoming_events": int(upcoming_count)
         }
 
     @staticmethod
@@ -94,13 +138,42 @@ class BookingService:
             raise HTTPException(status_code=403, detail="Not authorized")
         if booking.status != BookingStatus.CONFIRMED:
             raise HTTPException(status_code=400, detail="Booking is not confirmed or already cancelled")
-            
 
-        event = db.query(Event).with_for_update().filter(Event.id == booking.event_id).first()
-        if event:
-            event.available_seats += booking.number_of_seats
-            
-        booking.status = BookingStatus.CANCELLED_BY_USER
+        # Lock the event row first (as cancel_event and the waitlist do): once the
+        # event is cancelled its bookings belong to the cancellation job, which
+        # refunds them, and its seats must not be released or offered again.
+        event_status = db.query(Event.status).filter(Event.id == booking.event_id).with_for_update().scalar()
+        if event_status == EventStatus.CANCELLED:
+            db.rollback()
+            raise HTTPException(status_code=400, detail="This event was cancelled; your booking is being cancelled and refunded")
+
+        # Guard on the current status so two concurrent cancels can't both restore seats.
+        cancelled = db.query(Booking).filter(
+            Booking.id == booking_id,
+            Booking.status == BookingStatus.CONFIRMED
+        ).update(
+            {Booking.status: BookingStatus.CANCELLED_BY_USER, Booking.cancelled_at: datetime.utcnow()},
+            synchronize_session=False
+        )
+        if not cancelled:
+            db.rollback()
+            raise HTTPException(status_code=400, detail="Booking is not confirmed or already cancelled")
+
+        db.query(Event).filter(Event.id == booking.event_id).update(
+            {Event.available_seats: Event.available_seats + booking.number_of_seats},
+            synchronize_session=False
+        )
+        OrganizerStatsService.record_seats(db, booking.event_id, -booking.number_of_seats)
+        OutboxService.add(db, BOOKING_CANCELLED, {
+            "booking_id": booking.id, "event_id": booking.event_id, "user_id": user_id, "seats": booking.number_of_seats,
+        })
+        # The freed seats go to the waitlist first, in this same transaction
+        offered = WaitlistService.allocate(db, booking.event_id)
         db.commit()
+        if offered:
+            seat_inventory.evict(booking.event_id)
+        else:
+            seat_inventory.release(booking.event_id, user_id, booking.number_of_seats)
+        response_cache.invalidate_event(booking.event_id)
         db.refresh(booking)
         return booking
@@ -0,0 +1,35 @@
+import logging
+import os
+import socket
+import uuid
+from typing import Optional
+from core.config import settings
+from core.database import SessionLocal
+from core.periodic_task import PeriodicTask
+from services.cancellation_service import CancellationService
+
+logger = logging.getLogger(__name__)
+
+# Why: Runs queued event cancellations off the request path. Every app process
+# runs one; leases keep two of them off the same job, and a job left behind by
+# a process that died is picked up once its lease lapses.
+class CancellationScheduler:
+    def __init__(self, interval_seconds: Optional[float] = None):
+        self.interval_seconds = interval_seconds or settings.CANCELLATION_JOB_INTERVAL_SECONDS
+        self.worker = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        # stop() lets the running chunk commit; run_pending then hands the job's lease back
+        self.task = PeriodicTask(
+            "Cancellation jobs", self.run_once, self.interval_seconds,
+            stop_timeout=settings.CANCELLATION_STOP_TIMEOUT_SECONDS
+        )
+
+    def run_once(self) -> int:
+        db = SessionLocal()
+        try:
+            cancelled = CancellationService.run_pending(db, self.worker, self.task.stopping.is_set)
+            if cancelled:
+                logger.info(f"Cancelled {cancelled} booking(s) of cancelled events")
+            return cancelled
+        finally:
+            db.close()
+
@@ -0,0 +1,206 @@
+import logging
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+from fastapi import HTTPException
+from sqlalchemy import func, insert, or_
+from sqlalchemy.orm import Session
+from core.config import settings
+from models.booking import Booking, BookingStatus
+from models.cancellation import (
+    CancellationJob, CancellationJobStatus, CancellationWorkItem, WorkItemKind, WorkItemStatus
+)
+from models.event import Event
+from services.outbox_service import EVENT_CANCELLED_ATTENDEE, OutboxService
+
+logger = logging.getLogger(__name__)
+
+UNFINISHED = (CancellationJobStatus.PENDING, CancellationJobStatus.RUNNING)
+
+# Why: A stadium event has tens of thousands of bookings, and cancelling them in
+# one UPDATE held their row locks for the whole request. Each chunk is its own
+# short transaction: lock the next CANCELLATION_CHUNK_SIZE confirmed bookings,
+# cancel them, record their refund and notification work items, and move the
+# job's cursor, all committed together. A worker that dies mid-way loses at most
+# the chunk in flight; once its lease lapses another worker resumes from the
+# cursor. Re-running a chunk is harmless: only CONFIRMED bookings are touched
+# and work items are unique by dedupe_key.
+
+class CancellationService:
+    @staticmethod
+    def enqueue(db: Session, event_id: int) -> CancellationJob:
+        """Queue cancellation of an event's bookings, in the caller's transaction. The caller commits."""
+        job = db.query(CancellationJob).filter(CancellationJob.event_id == event_id).first()
+        if job is not None:
+            return job
+        total = db.query(func.count(Booking.id)).filter(
+            Booking.event_id == event_id,
+            Booking.status == BookingStatus.CONFIRMED
+        ).scalar()
+        job = CancellationJob(event_id=event_id, total_bookings=total)
+        if not total:
+            job.status = CancellationJobStatus.COMPLETED
+            job.finished_at = datetime.utcnow()
+        db.add(job)
+        return job
+
+    @staticmethod
+    def get_status(db: Session, event_id: int, organizer_id: int) -> dict:
+        job = db.query(CancellationJob).join(Event, Event.id == CancellationJob.event_id).filter(
+            CancellationJob.event_id == event_id,
+            Event.organizer_id == organizer_id
+        ).first()
+        if not job:
+            raise HTTPException(status_code=404, detail="No cancellation found for this event")
+        items = dict(db.query(CancellationWorkItem.kind, func.count(CancellationWorkItem.id))
+                       .filter(CancellationWorkItem.job_id == job.id)
+                       .group_by(CancellationWorkItem.kind).all())
+        done = job.status == CancellationJobStatus.COMPLETED
+        return {
+            "job_id": job.id,
+            "event_id": job.event_id,
+            "status": job.status.value,
+            "total_bookings": job.total_bookings,
+            "processed_bookings": job.processed_bookings,
+            "progress": 1.0 if done or not job.total_bookings else min(job.processed_bookings / job.total_bookings, 1.0),
+            "refunds": items.get(WorkItemKind.REFUND, 0),
+            "notifications": items.get(WorkItemKind.NOTIFY, 0),
+            "attempts": job.attempts,
+            "error": job.error,
+            "created_at": job.created_at,
+            "started_at": job.started_at,
+            "finished_at": job.finished_at,
+        }
+
+    @staticmethod
+    def claim(db: Session, worker: str) -> Optional[int]:
+        """Take the lease on the oldest unfinished job nobody holds. Returns its id, or None."""
+        now = datetime.utcnow()
+        free = or_(CancellationJob.lease_expires_at.is_(None), CancellationJob.lease_expires_at < now)
+        job_id = db.query(CancellationJob.id).filter(CancellationJob.status.in_(UNFINISHED), free)\
+                   .order_by(CancellationJob.id).limit(1).scalar()
+        if job_id is None:
+            db.rollback()
+            return None
+        # Conditional, so two workers racing for the same job can't both win
+        claimed = db.query(CancellationJob).filter(
+            CancellationJob.id == job_id, CancellationJob.status.in_(UNFINISHED), free
+        ).update({
+            CancellationJob.status: CancellationJobStatus.RUNNING,
+            CancellationJob.lease_owner: worker,
+            CancellationJob.lease_expires_at: now + timedelta(seconds=settings.CANCELLATION_LEASE_SECONDS),
+            CancellationJob.started_at: func.coalesce(CancellationJob.started_at, now),
+        }, synchronize_session=False)
+        db.commit()
+        return job_id if claimed else None
+
+    @staticmethod
+    def run_chunk(db: Session, job_id: int, worker: str, chunk_size: Optional[int] = None) -> int:
+        """Cancel the next chunk of bookings. Returns how many; 0 once the job is finished or no longer ours."""
+        chunk_size = chunk_size or settings.CANCELLATION_CHUNK_SIZE
+        now = datetime.utcnow()
+        renewed = db.query(CancellationJob).filter(
+            CancellationJob.id == job_id,
+            CancellationJob.lease_owner == worker,
+            CancellationJob.status == CancellationJobStatus.RUNNING
+        ).update({CancellationJob.lease_expires_at: now + timedelta(seconds=settings.CANCELLATION_LEASE_SECONDS)},
+                 synchronize_session=False)
+        if not renewed:
+            db.rollback()
+            return 0
+        job = db.get(CancellationJob, job_id)
+        price = db.query(Event.price).filter(Event.id == job.event_id).scalar() or 0.0
+
+        bookings = db.query(Booking.id, Booking.user_id, Booking.number_of_seats).filter(
+            Booking.event_id == job.event_id,
+            Booking.id > job.last_booking_id,
+            Booking.status == BookingStatus.CONFIRMED
+        ).order_by(Booking.id).limit(chunk_size).with_for_update().all()
+        if not bookings:
+            job.status = CancellationJobStatus.COMPLETED
+            job.finished_at = now
+            job.lease_owner = job.lease_expires_at = None
+            db.commit()
+            return 0
+
+        booking_ids = [booking_id for booking_id, _, _ in bookings]
+        db.query(Booking).filter(Booking.id.in_(booking_ids), Booking.status == BookingStatus.CONFIRMED).update(
+            {Booking.status: BookingStatus.CANCELLED_BY_ORGANIZER, Booking.cancelled_at: now},
+            synchronize_session=False
+        )
+
+        items, users = [], set()
+        for booking_id, user_id, seats in bookings:
+            users.add(user_id)
+            items.append({
+                "job_id": job_id, "kind": WorkItemKind.REFUND, "dedupe_key": f"refund:booking:{booking_id}",
+                "user_id": user_id, "booking_id": booking_id, "seats": seats, "amount": seats * price,
+                "status": WorkItemStatus.PENDING, "created_at": now,
+            })
+        # One notification per user, however many of their bookings (and chunks) there are
+        notified = {user_id for (user_id,) in db.query(CancellationWorkItem.user_id).filter(
+            CancellationWorkItem.job_id == job_id,
+            CancellationWorkItem.kind == WorkItemKind.NOTIFY,
+            CancellationWorkItem.user_id.in_(users)
+        )}
+        for user_id in sorted(users - notified):
+            items.append({
+                "job_id": job_id, "kind": WorkItemKind.NOTIFY, "dedupe_key": f"notify:event:{job.event_id}:user:{user_id}",
+                "user_id": user_id, "booking_id": None, "seats": 0, "amount": 0.0,
+                "status": WorkItemStatus.PENDING, "created_at": now,
+            })
+        db.execute(insert(CancellationWorkItem.__table__), items)
+        # Attendees hear about it through the outbox, committed with their bookings' cancellation
+        OutboxService.add_many(db, EVENT_CANCELLED_ATTENDEE, (
+            {"event_id": job.event_id, "user_id": item["user_id"]} for item in items if item["kind"] == WorkItemKind.NOTIFY
+        ))
+
+        job.last_booking_id = booking_ids[-1]
+        job.processed_bookings += len(booking_ids)
+        db.commit()
+        return len(booking_ids)
+
+    @staticmethod
+    def run(db: Session, job_id: int, worker: str, should_stop: Callable[[], bool] = lambda: False) -> int:
+        """Process a claimed job chunk by chunk until it finishes, fails or should_stop(). Returns bookings cancelled."""
+        cancelled = 0
+        try:
+            while not should_stop():
+                chunk = CancellationService.run_chunk(db, job_id, worker)
+                if not chunk:
+                    return cancelled
+                cancelled += chunk
+        except Exception as e:
+            db.rollback()
+            CancellationService._record_failure(db, job_id, worker, e)
+            return cancelled
+        # Stopping: hand the job back so the next worker resumes straight away
+        db.query(CancellationJob).filter(CancellationJob.id == job_id, CancellationJob.lease_owner == worker).update(
+            {CancellationJob.lease_owner: None, CancellationJob.lease_expires_at: None}, synchronize_session=False
+        )
+        db.commit()
+        return cancelled
+
+    @staticmethod
+    def _record_failure(db: Session, job_id: int, worker: str, error: Exception):
+        job = db.get(CancellationJob, job_id)
+        if job is None or job.lease_owner != worker:
+            return
+        job.attempts += 1
+        job.error = str(error)[:500]
+        job.lease_owner = job.lease_expires_at = None
+        if job.attempts >= settings.CANCELLATION_JOB_MAX_ATTEMPTS:
+            job.status = CancellationJobStatus.FAILED
+            job.finished_at = datetime.utcnow()
+        db.commit()
+        logger.error(f"Cancellation job {job_id} (event {job.event_id}) failed, attempt {job.attempts}: {error}")
+
+    @staticmethod
+    def run_pending(db: Session, worker: str, should_stop: Callable[[], bool] = lambda: False) -> int:
+        """Claim and run unfinished jobs until none are left. Returns bookings cancelled."""
+        cancelled = 0
+        while not should_stop():
+            job_id = CancellationService.claim(db, worker)
+            if job_id is None:
+                break
+            cancelled += CancellationService.run(db, job_id, worker, should_stop)
+        return cancelled
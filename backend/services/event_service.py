@@ -1,8 +1,20 @@
+from typing import Optional
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
+from core.pagination import decode_cursor, keyset_after, next_cursor
 from models.event import Event, EventStatus
 from schemas.event import EventCreate, EventUpdate
 from models.user import User
+from services.seat_inventory import seat_inventory
+from services.keyword_index import KeywordIndex
+from services.recommendation_matrix import recommendation_matrix
+from services.search_service import search_backend
+from services.organizer_stats_service import OrganizerStatsService
+from services.media_service import MediaService
+from services.cancellation_service import CancellationService
+from services.outbox_service import EVENT_CANCELLED, OutboxService
+from services.waitlist_service import WaitlistService
+from core.response_cache import response_cache
 
 class EventService:
     @staticmethod
@@ -13,21 +25,9 @@ class EventService:
         image_file = None, 
         image_url: str = None
     ) -> Event:
-        import uuid
-        import shutil
-        import os
-        from pathlib import Path
-
         image_id = None
-        MEDIA_DIR = Path("media")
-        MEDIA_DIR.mkdir(exist_ok=True)
-
         if image_file and image_file.filename:
-            file_extension = os.path.splitext(image_file.filename)[1]
-            image_id = f"{uuid.uuid4()}{file_extension}"
-            file_path = MEDIA_DIR / image_id
-            with open(file_path, "wb") as buffer:
-                shutil.copyfileobj(image_file.file, buffer)
+            image_id = MediaService.ingest(image_file)
         
         elif image_url:
             # Simply store the URL directly. Be resilient to ephemeral filesystems.
@@ -40,55 +40,149 @@ class EventService:
             organizer_id=organizer_id
         )
         db.add(event)
+        db.flush()
+        KeywordIndex.index_event(db, event)
+        OrganizerStatsService.record(
+            db, organizer_id, total_events=1, active_events=int(event.status == EventStatus.PUBLISHED)
+        )
         db.commit()
+        MediaService.process_variants(image_id, image_file)
+        recommendation_matrix.mark_dirty()
+        response_cache.invalidate_lists()
         db.refresh(event)
+        search_backend.index_event(event)
         return event
 
     @staticmethod
-    def update_ended_events(db: Session):
+    def end_boundary():
+        """When an event is over: its end_date, or its start date if end_date is missing."""
+        from sqlalchemy import func
+        return func.coalesce(Event.end_date, Event.date)
+
+    @staticmethod
+    def ended_condition(now=None):
+        """SQL predicate for events whose end boundary has passed."""
         from datetime import datetime
         # Compare in UTC for consistency with frontend timestamps
-        now = datetime.utcnow()
-        
+        now = now or datetime.utcnow()
+        return EventService.end_boundary() < now
+
+    @staticmethod
+    def status_condition(status: EventStatus, now=None):
+        """
+        SQL predicate matching events by their *effective* status.
+        A PUBLISHED event that is past its end counts as ENDED even if the
+        background sweeper has not persisted the transition yet.
+        """
+        from datetime import datetime
+        from sqlalchemy import and_, or_
+        now = now or datetime.utcnow()
+        if status == EventStatus.PUBLISHED:
+            boundary = EventService.end_boundary()
+            return and_(Event.status == EventStatus.PUBLISHED, or_(boundary >= now, boundary == None))
+        if status == EventStatus.ENDED:
+            return or_(
+                Event.status == EventStatus.ENDED,
+                and_(Event.status == EventStatus.PUBLISHED, EventService.ended_condition(now))
+            )
+        return Event.status == status
+
+    @staticmethod
+    def apply_effective_status(events, now=None):
+        """
+        Report PUBLISHED events that are past their end as ENDED in the response
+        without writing. The change is never committed; the sweeper persists it.
+        """
+        from datetime import datetime
+        now = now or datetime.utcnow()
+        for event in events:
+            end = event.end_date or event.date
+            if event.status == EventStatus.PUBLISHED and end and end < now:
+                event.status = EventStatus.ENDED
+        return events
+
+    @staticmethod
+    def update_ended_events(db: Session) -> int:
         # Mark as ENDED if end_date has passed (or date has passed if end_date doesn't exist/logic fallback)
-        # Using a slightly complex condition:
-        # If end_date is present, check end_date < now
-        # If end_date is null (legacy?), check date < now
-        from sqlalchemy import or_
-        
-        db.query(Event).filter(
+        # Runs from the background sweeper (services/event_status_scheduler.py), never on the read path.
+        ended = EventService.ended_condition()
+        OrganizerStatsService.record_ended(db, ended)
+        ending = [event_id for (event_id,) in db.query(Event.id).filter(Event.status == EventStatus.PUBLISHED, ended)]
+        updated = db.query(Event).filter(
             Event.status == EventStatus.PUBLISHED,
-            or_(
-                Event.end_date < now,
-                (Event.end_date == None) & (Event.date < now)
-            )
+            ended
         ).update({Event.status: EventStatus.ENDED}, synchronize_session=False)
         db.commit()
+        if updated:
+            response_cache.invalidate_lists()
+            for event_id in ending:
+                response_cache.invalidate_event(event_id)
+        return updated
 
     @staticmethod
-    def get_organizer_events(db: Session, organizer_id: int, skip: int = 0, limit: int = 100, sort_by: str = "date", sort_desc: bool = False):
+    def get_next_end_boundary(db: Session):
+        """Earliest future moment at which a PUBLISHED event will become ENDED."""
+        from datetime import datetime
+        from sqlalchemy import func
+        now = datetime.utcnow()
+        boundary = EventService.end_boundary()
+        return db.query(func.min(boundary)).filter(
+            Event.status == EventStatus.PUBLISHED,
+            boundary >= now
+        ).scalar()
 
-        EventService.update_ended_events(db)
-        
-        query = db.query(Event).filter(Event.organizer_id == organizer_id)
-        
+    # Why: MySQL orders ENUMs by definition position but compares them as strings,
+    # so status sorting goes through an explicit rank that behaves the same in
+    # ORDER BY and in keyset comparisons (and on every database).
+    STATUS_RANK = {
+        EventStatus.DRAFT: 0,
+        EventStatus.PUBLISHED: 1,
+        EventStatus.CANCELLED: 2,
+        EventStatus.ENDED: 3,
+    }
+
+    @staticmethod
+    def _organizer_sort(sort_by: str):
+        """SQL sort expression and the matching Python key for a `sort_by` mode."""
+        from sqlalchemy import case
         if sort_by == "price":
-            sort_attr = Event.price
-        elif sort_by == "sold":
+            return Event.price, lambda e: e.price
+        if sort_by == "sold":
             # Sort by calculated sold seats (total - available)
-            sort_attr = Event.total_seats - Event.available_seats
-        elif sort_by == "status":
-            sort_attr = Event.status
-        else:
+            return Event.total_seats - Event.available_seats, lambda e: e.total_seats - e.available_seats
+        if sort_by == "status":
+            return case(EventService.STATUS_RANK, value=Event.status), lambda e: EventService.STATUS_RANK[e.status]
+        return Event.date, lambda e: e.date
 
-            sort_attr = Event.date
-            
+    @staticmethod
+    def get_organizer_events_page(
+        db: Session,
+        organizer_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        sort_by: str = "date",
+        sort_desc: bool = False,
+        cursor: Optional[str] = None,
+    ) -> tuple[list[Event], Optional[str]]:
+        """One page of an organizer's events plus the cursor for the next page."""
+        query = db.query(Event).filter(Event.organizer_id == organizer_id)
+        sort_attr, sort_key = EventService._organizer_sort(sort_by)
+
+        # Event.id breaks ties so every row has a unique position for the cursor
         if sort_desc:
-            query = query.order_by(sort_attr.desc())
+            query = query.order_by(sort_attr.desc(), Event.id.desc())
+        else:
+            query = query.order_by(sort_attr.asc(), Event.id.asc())
+
+        if cursor:
+            query = query.filter(keyset_after([sort_attr, Event.id], decode_cursor(cursor, 2), desc=sort_desc))
         else:
-            query = query.order_by(sort_attr.asc())
-            
-        return query.offset(skip).limit(limit).all()
+            query = query.offset(skip)
+
+        events = query.limit(limit).all()
+        # Take the cursor before apply_effective_status changes any status in memory
+        cursor_out = next_cursor(events, limit, lambda e: [sort_key(e), e.id])
+        return EventService.apply_effective_status(events), cursor_out
 
     @staticmethod
     def update_event(db: Session, event_id: int, event_in: EventUpdate, organizer_id: int) -> Event:
@@ -97,8 +191,9 @@ class EventService:
             raise HTTPException(status_code=404, detail="Event not found or permission denied")
         
         update_data = event_in.model_dump(exclude_unset=True)
-        
+        was_active, old_price, old_image = event.status == EventStatus.PUBLISHED, event.price, event.image_id
 
+        seat_diff = 0
         if "total_seats" in update_data:
             seat_diff = update_data["total_seats"] - event.total_seats
             if event.available_seats + seat_diff < 0:
@@ -108,8 +203,26 @@ class EventService:
         for field, value in update_data.items():
             setattr(event, field, value)
 
+        KeywordIndex.index_event(db, event)
+        # Revenue is sold seats at the current price, so a price change re-prices past sales
+        OrganizerStatsService.record(
+            db, organizer_id,
+            active_events=int(event.status == EventStatus.PUBLISHED) - int(was_active),
+            total_revenue=(event.total_seats - event.available_seats) * (event.price - old_price)
+        )
+        if seat_diff > 0:
+            db.flush()
+            # New seats go to the waitlist before anyone else can book them
+            WaitlistService.allocate(db, event_id)
         db.commit()
+        if event.image_id != old_image:
+            MediaService.release(db, old_image)
+        seat_inventory.evict(event_id)
+        recommendation_matrix.mark_dirty()
+        response_cache.invalidate_lists()
+        response_cache.invalidate_event(event_id)
         db.refresh(event)
+        search_backend.index_event(event)
         return event
     
 
@@ -119,35 +232,45 @@ class EventService:
          if not event:
             raise HTTPException(status_code=404, detail="Event not found")
          
+         if event.status == EventStatus.CANCELLED:
+             # Already cancelled; its bookings are handled by the existing job
+             return event
+         if event.status == EventStatus.PUBLISHED:
+             OrganizerStatsService.record(db, organizer_id, active_events=-1)
          event.status = EventStatus.CANCELLED
-         
 
-         from models.booking import Booking, BookingStatus
-         db.query(Booking).filter(Booking.event_id == event_id).update(
-             {Booking.status: BookingStatus.CANCELLED_BY_ORGANIZER}, synchronize_session=False
-         )
+         # Bookings are cancelled in the background, in chunks; see GET /events/{id}/cancellation
+         CancellationService.enqueue(db, event_id)
+         OutboxService.add(db, EVENT_CANCELLED, {"event_id": event_id, "organizer_id": organizer_id})
+         WaitlistService.cancel_for_event(db, event_id)
+         # Cancelled events are never recommended again.
+         KeywordIndex.remove_event(db, event_id)
          
          db.commit()
+         seat_inventory.evict(event_id)
+         recommendation_matrix.mark_dirty()
+         response_cache.invalidate_lists()
+         response_cache.invalidate_event(event_id)
          db.refresh(event)
          return event
 
     @staticmethod
     def get_organizer_stats(db: Session, organizer_id: int) -> dict:
-        events = db.query(Event).filter(Event.organizer_id == organizer_id).all()
-        
-        total_events = len(events)
-        total_tickets_sold = sum(e.total_seats - e.available_seats for e in events)
-        total_revenue = sum((e.total_seats - e.available_seats) * e.price for e in events)
-        
-
-        active_events = sum(1 for e in events if e.status == EventStatus.PUBLISHED)
+        # O(1) lookup when the organizer_stats table is maintained
+        stats = OrganizerStatsService.get(db, organizer_id)
+        if stats is not None:
+            return stats
 
-        return {
-            "total_events": total_events,
-            "tickets_sold": total_tickets_sold,
-            "total_revenue": total_revenue,
-            "active_events": active_events
-        }
+        # Otherwise one aggregate query; active means PUBLISHED and not yet over
+        computed = OrganizerStatsService.compute(
+            db, EventService.status_condition(EventStatus.PUBLISHED), organizer_id
+        )
+        return computed.get(organizer_id, {
+            "total_events": 0,
+            "active_events": 0,
+            "tickets_sold": 0,
+            "total_revenue": 0.0,
+        })
 
     @staticmethod
     def delete_draft_event(db: Session, event_id: int, organizer_id: int) -> dict:
@@ -166,15 +289,19 @@ class EventService:
                 detail="Only DRAFT events can be permanently deleted. Cancel published events instead."
             )
         
-
-        if event.image_id:
-            from pathlib import Path
-            image_path = Path("media") / event.image_id
-            if image_path.exists():
-                image_path.unlink()
         
-        event_title = event.title
+        event_title, image_id = event.title, event.image_id
+        sold = event.total_seats - event.available_seats
+        OrganizerStatsService.record(db, organizer_id, total_events=-1, tickets_sold=-sold, total_revenue=-sold * event.price)
+        KeywordIndex.remove_event(db, event_id)
+        from models.recommendation import Recommendation
+        db.query(Recommendation).filter(Recommendation.event_id == event_id).delete(synchronize_session=False)
         db.delete(event)
         db.commit()
+        MediaService.release(db, image_id)
+        recommendation_matrix.mark_dirty()
+        response_cache.invalidate_lists()
+        response_cache.invalidate_event(event_id)
+        search_backend.remove_event(event_id)
         
         return {"message": f"Event '{event_title}' has been permanently deleted."}
@@ -0,0 +1,37 @@
+import logging
+from datetime import datetime
+from typing import Optional
+from core.config import settings
+from core.database import SessionLocal
+from core.periodic_task import PeriodicTask
+from services.event_service import EventService
+
+logger = logging.getLogger(__name__)
+
+# Why: Flipping PUBLISHED -> ENDED used to happen inside every GET, turning reads
+# into table-wide UPDATEs. This background task owns that write instead, waking up
+# every interval or at the next known end boundary, whichever comes first.
+class EventStatusScheduler:
+    MIN_DELAY_SECONDS = 1.0
+
+    def __init__(self, interval_seconds: Optional[float] = None):
+        self.interval_seconds = interval_seconds or settings.EVENT_STATUS_SWEEP_INTERVAL_SECONDS
+        self.task = PeriodicTask("Event status sweep", self.sweep, self.interval_seconds, returns_delay=True)
+
+    def sweep(self) -> float:
+        """Run one sweep and return how long to sleep before the next one."""
+        db = SessionLocal()
+        try:
+            updated = EventService.update_ended_events(db)
+            if updated:
+                logger.info(f"Marked {updated} event(s) as ENDED")
+            next_boundary = EventService.get_next_end_boundary(db)
+        finally:
+            db.close()
+
+        delay = self.interval_seconds
+        if next_boundary:
+            until_boundary = (next_boundary - datetime.utcnow()).total_seconds()
+            delay = min(delay, until_boundary)
+        return max(delay, self.MIN_DELAY_SECONDS)
+
@@ -0,0 +1,268 @@
+import csv
+import io
+import json
+import time
+from datetime import datetime
+from typing import IO, Iterator, Optional
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from core.config import settings
+from core.database import SessionLocal
+from models.booking import Booking, BookingStatus
+from models.event import Event, EventStatus
+from models.event_keyword import EventKeyword
+from models.user import User
+from schemas.event import EventImport
+from services.keyword_index import KeywordIndex
+from services.organizer_stats_service import OrganizerStatsService
+from services.recommendation_matrix import recommendation_matrix
+from services.search_service import search_backend
+from core.response_cache import response_cache
+
+FORMATS = ("ndjson", "csv")
+
+# Why: Creating events one multipart request at a time (each committed and
+# refreshed on its own) doesn't scale to organizers with thousands of recurring
+# events. Imports stream the file row by row, validate each with EventImport,
+# and insert EVENT_IMPORT_CHUNK_SIZE rows per transaction with one executemany.
+# A bad row is reported with its line number and skipped; it never aborts the
+# import. Exports page through the rows by id and stream them, so memory stays
+# flat however many rows an organizer has.
+
+IMPORT_COLUMNS = (
+    "title", "description", "date", "end_date", "location", "total_seats", "available_seats", "price",
+    "event_type", "status", "is_high_demand", "image_id", "organizer_id", "keyword_count",
+)
+EXPORT_COLUMNS = {
+    "events": (
+        "id", "title", "description", "date", "end_date", "location", "total_seats", "available_seats",
+        "price", "event_type", "status", "is_high_demand", "image_id", "created_at", "updated_at",
+    ),
+    "bookings": (
+        "id", "event_id", "user_id", "number_of_seats", "status", "created_at", "cancelled_at",
+    ),
+}
+ATTENDEE_COLUMNS = ("booking_id", "status", "number_of_seats", "booked_at", "user_id", "full_name", "email")
+
+def _plain(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return getattr(value, "value", value)  # Enums
+
+class EventTransferService:
+    @staticmethod
+    def resolve_format(format: Optional[str], filename: Optional[str] = None) -> str:
+        """The requested format, or the one implied by the file extension."""
+        if format is None and filename:
+            extension = filename.rsplit(".", 1)[-1].lower()
+            format = "csv" if extension == "csv" else "ndjson" if extension in ("ndjson", "jsonl", "json") else None
+        if format not in FORMATS:
+            raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(FORMATS)}")
+        return format
+
+    @staticmethod
+    def _read_rows(file: IO[bytes], format: str) -> Iterator[tuple[int, dict]]:
+        """(line number, raw row) pairs, read incrementally. Unparseable lines yield a ValueError."""
+        text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+        if format == "csv":
+            reader = csv.DictReader(text)
+            for row in reader:
+                # Empty cells mean "not given", so optional fields fall back to their defaults
+                yield reader.line_num, {k: v for k, v in row.items() if k is not None and v != ""}
+        else:
+            for line_number, line in enumerate(text, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                    if not isinstance(row, dict):
+                        raise ValueError("expected a JSON object")
+                except ValueError as e:
+                    yield line_number, ValueError(f"Invalid JSON: {e}")
+                    continue
+                yield line_number, row
+
+    @staticmethod
+    def _insert(db: Session, rows: list[dict]) -> list[int]:
+        """Insert rows, returning their ids in order. One statement where the dialect can return ids."""
+        # Core table inserts: the ORM bulk path would only re-process the plain dicts
+        table = Event.__table__
+        if db.bind.dialect.insert_executemany_returning_sort_by_parameter_order:
+            return list(db.scalars(insert(table).returning(table.c.id, sort_by_parameter_order=True), rows))
+        # No RETURNING (MySQL): multi-row INSERTs don't reliably report every id,
+        # so insert row by row, still inside the chunk's single transaction
+        return [db.execute(insert(table), row).inserted_primary_key[0] for row in rows]
+
+    @staticmethod
+    def _write_chunk(db: Session, organizer_id: int, chunk: list[tuple[int, Event]]) -> list[Event]:
+        rows, postings = [], []
+        for _, event in chunk:
+            tokens = KeywordIndex.tokens_for(event)
+            event.keyword_count = len(tokens)
+            rows.append({column: getattr(event, column) for column in IMPORT_COLUMNS})
+            postings.append(tokens)
+
+        ids = EventTransferService._insert(db, rows)
+        keywords = [{"token": token, "event_id": event_id} for event_id, tokens in zip(ids, postings) for token in tokens]
+        if keywords:
+            db.execute(insert(EventKeyword.__table__), keywords)
+        events = [event for _, event in chunk]
+        OrganizerStatsService.record(
+            db, organizer_id,
+            total_events=len(events),
+            active_events=sum(event.status == EventStatus.PUBLISHED for event in events),
+        )
+        db.commit()
+        for event, event_id in zip(events, ids):
+            event.id = event_id
+        return events
+
+    @staticmethod
+    def import_events(db: Session, file: IO[bytes], format: str, organizer_id: int, chunk_size: Optional[int] = None) -> dict:
+        """Create an event per valid row of an NDJSON or CSV file. Returns counts and per-row errors."""
+        chunk_size = chunk_size or settings.EVENT_IMPORT_CHUNK_SIZE
+        started = time.perf_counter()
+        imported, failed, errors = 0, 0, []
+
+        def fail(line: int, message: str):
+            nonlocal failed
+            failed += 1
+            if len(errors) < settings.EVENT_IMPORT_MAX_REPORTED_ERRORS:
+                errors.append({"line": line, "error": message})
+
+        def flush(chunk: list[tuple[int, Event]]):
+            nonlocal imported
+            try:
+                events = EventTransferService._write_chunk(db, organizer_id, chunk)
+            except SQLAlchemyError:
+                db.rollback()
+                # Find the offending rows; the rest of the chunk still goes in
+                events = []
+                for line, event in chunk:
+                    try:
+                        events += EventTransferService._write_chunk(db, organizer_id, [(line, event)])
+                    except SQLAlchemyError as e:
+                        db.rollback()
+                        fail(line, f"Database error: {e.orig if hasattr(e, 'orig') else e}")
+            imported += len(events)
+            for event in events:
+                search_backend.index_event(event)
+
+        chunk: list[tuple[int, Event]] = []
+        for line, row in EventTransferService._read_rows(file, format):
+            if isinstance(row, Exception):
+                fail(line, str(row))
+                continue
+            try:
+                data = EventImport.model_validate(row).model_dump()
+            except ValidationError as e:
+                fail(line, "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()))
+                continue
+            image_url = data.pop("image_url")
+            chunk.append((line, Event(
+                **data,
+                image_id=image_url,
+                available_seats=data["total_seats"],
+                organizer_id=organizer_id,
+            )))
+            if len(chunk) >= chunk_size:
+                flush(chunk)
+                chunk = []
+        if chunk:
+            flush(chunk)
+
+        if imported:
+            recommendation_matrix.mark_dirty()
+            response_cache.invalidate_lists()
+        elapsed = time.perf_counter() - started
+        return {
+            "imported": imported,
+            "failed": failed,
+            "errors": errors,
+            "seconds": round(elapsed, 3),
+            "rows_per_sec": round((imported + failed) / elapsed, 1) if elapsed else 0.0,
+        }
+
+    @staticmethod
+    def _export_query(resource: str, organizer_id: int):
+        if resource == "events":
+            return select(*(getattr(Event, c) for c in EXPORT_COLUMNS["events"])).where(Event.organizer_id == organizer_id), Event.id
+        # Bookings of the organizer's events; the join uses ix_events_organizer_id_date
+        return select(*(getattr(Booking, c) for c in EXPORT_COLUMNS["bookings"])).join(Event, Event.id == Booking.event_id)\
+                                                                                    .where(Event.organizer_id == organizer_id), Booking.id
+
+    @staticmethod
+    def _encode(batches: Iterator[list], columns: tuple, format: str) -> Iterator[bytes]:
+        """One encoded chunk per batch of rows: CSV (after a header row) or NDJSON."""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if format == "csv":
+            writer.writerow(columns)
+        for rows in batches:
+            for row in rows:
+                values = [_plain(value) for value in row]
+                if format == "csv":
+                    writer.writerow(values)
+                else:
+                    buffer.write(json.dumps(dict(zip(columns, values))) + "\n")
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode()
+
+    @staticmethod
+    def export(resource: str, format: str, organizer_id: int, batch_size: Optional[int] = None) -> Iterator[bytes]:
+        """
+        Stream an organizer's events or bookings as NDJSON or CSV. Opens its own
+        session (it outlives the request's), and reads one keyset page at a time.
+        """
+        batch_size = batch_size or settings.EXPORT_BATCH_SIZE
+        query, id_column = EventTransferService._export_query(resource, organizer_id)
+
+        def pages():
+            db = SessionLocal()
+            try:
+                last_id = 0
+                while True:
+                    rows = db.execute(query.where(id_column > last_id).order_by(id_column).limit(batch_size)).all()
+                    if not rows:
+                        break
+                    yield rows
+                    last_id = rows[-1][0]
+                    # Don't hold a transaction (and its snapshot) open between pages
+                    db.rollback()
+            finally:
+                db.close()
+
+        return EventTransferService._encode(pages(), EXPORT_COLUMNS[resource], format)
+
+    @staticmethod
+    def attendees(event_id: int, format: str, include_cancelled: bool = False, batch_size: Optional[int] = None) -> Iterator[bytes]:
+        """
+        Stream an event's attendee manifest (bookings joined to users) as NDJSON or
+        CSV, in booking order. Confirmed bookings only unless include_cancelled.
+        """
+        batch_size = batch_size or settings.EXPORT_BATCH_SIZE
+        query = select(
+            Booking.id, Booking.status, Booking.number_of_seats, Booking.created_at,
+            User.id, User.full_name, User.email,
+        ).join(User, User.id == Booking.user_id).where(Booking.event_id == event_id).order_by(Booking.id)
+        if not include_cancelled:
+            query = query.where(Booking.status == BookingStatus.CONFIRMED)
+
+        # Why: One query read through a server-side cursor (yield_per implies
+        # stream_results), so the manifest is a single consistent snapshot and only
+        # batch_size rows are in memory at a time, however large the event.
+        def batches():
+            db = SessionLocal()
+            try:
+                result = db.execute(query.execution_options(yield_per=batch_size))
+                yield from result.partitions()
+            finally:
+                db.close()
+
+        return EventTransferService._encode(batches(), ATTENDEE_COLUMNS, format)
@@ -0,0 +1,53 @@
+import unicodedata
+from typing import Iterable
+from sqlalchemy.orm import Session
+from models.event import Event
+from models.event_keyword import EventKeyword, TOKEN_LENGTH
+
+class KeywordIndex:
+    @staticmethod
+    def normalize(word: str) -> str:
+        """
+        One spelling per keyword: NFC, so composed and decomposed accents match,
+        lower-cased, and cut to fit event_keywords.token.
+        """
+        return unicodedata.normalize("NFC", word).lower()[:TOKEN_LENGTH]
+
+    @staticmethod
+    def tokenize(text: str) -> set[str]:
+        if not text:
+            return set()
+        return set(KeywordIndex.normalize(word) for word in text.split() if len(word) > 3)
+
+    @staticmethod
+    def tokens_for(event: Event) -> set[str]:
+        tokens = KeywordIndex.tokenize(event.title)
+        tokens.update(KeywordIndex.tokenize(event.description))
+        tokens.add(event.event_type.value.lower())
+        return tokens
+
+    @staticmethod
+    def index_event(db: Session, event: Event):
+        """Replace the postings for an event. The caller commits."""
+        KeywordIndex.remove_event(db, event.id)
+        tokens = KeywordIndex.tokens_for(event)
+        db.add_all(EventKeyword(token=token, event_id=event.id) for token in tokens)
+        event.keyword_count = len(tokens)
+
+    @staticmethod
+    def remove_event(db: Session, event_id: int):
+        """Drop the postings for an event. The caller commits."""
+        db.query(EventKeyword).filter(EventKeyword.event_id == event_id).delete(synchronize_session=False)
+
+    @staticmethod
+    def backfill(db: Session, batch_size: int = 1000) -> int:
+        """Index events created before the index existed (keyword_count is NULL)."""
+        indexed = 0
+        while True:
+            events: Iterable[Event] = db.query(Event).filter(Event.keyword_count == None).limit(batch_size).all()
+            if not events:
+                return indexed
+            for event in events:
+                KeywordIndex.index_event(db, event)
+            db.commit()
+            indexed += len(events)
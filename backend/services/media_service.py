@@ -0,0 +1,248 @@
+import fcntl
+import hashlib
+import logging
+import os
+import re
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+from fastapi import HTTPException, UploadFile
+from core.config import settings
+from core.database import SessionLocal
+from models.event import Event
+from models.user import User
+
+try:
+    from PIL import Image
+except ImportError:  # Variants are skipped without Pillow; originals are still served
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+MEDIA_DIR = Path("media")
+CHUNK_SIZE = 64 * 1024
+
+# Why: Uploads used to be copied whole onto the request thread under a random
+# name, with no size cap or type check, and replaced images were never removed.
+# Now an upload is streamed in chunks to a temp file (aborting past the size
+# limit), its type is sniffed from the leading bytes, and it is renamed
+# atomically to <sha256>.<ext>, so the same image uploaded twice is stored once.
+# A background pool then writes <sha256>.display.webp (resized) and
+# <sha256>.thumb.webp, and repoints the rows still showing the original at the
+# display variant. The original is kept as the source for the variants. All of
+# an image's files are deleted once no event or user references any of them.
+
+# Leading bytes -> extension. Only these image types are accepted.
+SIGNATURES = (
+    (b"\xff\xd8\xff", ".jpg"),
+    (b"\x89PNG\r\n\x1a\n", ".png"),
+    (b"GIF87a", ".gif"),
+    (b"GIF89a", ".gif"),
+)
+DISPLAY_SUFFIX = ".display.webp"
+THUMB_SUFFIX = ".thumb.webp"
+_CONTENT_NAME = re.compile(r"^([0-9a-f]{64})\.[a-z.]+$")
+
+def _sniff(head: bytes) -> Optional[str]:
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return ".webp"
+    for signature, extension in SIGNATURES:
+        if head.startswith(signature):
+            return extension
+    return None
+
+def _digest_of(name: Optional[str]) -> Optional[str]:
+    match = _CONTENT_NAME.match(name or "")
+    return match.group(1) if match else None
+
+@contextmanager
+def _key_lock(key: str):
+    """
+    Serialize the file operations on one content hash across threads and
+    worker processes (an flock on one of 256 lock files in MEDIA_DIR).
+    """
+    MEDIA_DIR.mkdir(exist_ok=True)
+    with open(MEDIA_DIR / f".lock-{key[:2]}", "a") as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+class MediaService:
+    _executor: Optional[ThreadPoolExecutor] = None
+
+    @staticmethod
+    def ingest(upload: UploadFile) -> str:
+        """
+        Store an uploaded image and return its media name. Blocking file I/O:
+        sync endpoints call it directly, async ones through the threadpool.
+        Call process_variants(name, upload) once the row referencing it is committed.
+        """
+        key, extension, temp_path = MediaService._receive(upload)
+        try:
+            with _key_lock(key):
+                if (MEDIA_DIR / f"{key}{DISPLAY_SUFFIX}").exists():
+                    # Seen before and already processed
+                    return f"{key}{DISPLAY_SUFFIX}"
+                name = f"{key}{extension}"
+                os.replace(temp_path, MEDIA_DIR / name)
+        finally:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+        return name
+
+    @staticmethod
+    def _receive(upload: UploadFile) -> tuple[str, str, str]:
+        """Stream an upload to a temp file in MEDIA_DIR. Returns (sha256, extension, temp path)."""
+        limit = settings.MEDIA_MAX_UPLOAD_BYTES
+        too_large = HTTPException(status_code=413, detail=f"Image is larger than {limit // (1024 * 1024)} MB")
+        if upload.size is not None and upload.size > limit:
+            raise too_large
+
+        MEDIA_DIR.mkdir(exist_ok=True)
+        # Same directory as the final file, so the rename is atomic
+        fd, temp_path = tempfile.mkstemp(dir=MEDIA_DIR, prefix=".upload-")
+        try:
+            digest = hashlib.sha256()
+            extension, written = None, 0
+            with os.fdopen(fd, "wb") as out:
+                while chunk := upload.file.read(CHUNK_SIZE):
+                    if extension is None:
+                        extension = _sniff(chunk)
+                        if extension is None:
+                            raise HTTPException(status_code=415, detail="Unsupported image type (expected JPEG, PNG, GIF or WebP)")
+                    written += len(chunk)
+                    if written > limit:
+                        raise too_large
+                    digest.update(chunk)
+                    out.write(chunk)
+            if extension is None:
+                raise HTTPException(status_code=400, detail="Empty image upload")
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        return digest.hexdigest(), extension, temp_path
+
+    @staticmethod
+    def digest_of(name: Optional[str]) -> Optional[str]:
+        """The content hash in a content-addressed media name, else None."""
+        return _digest_of(name)
+
+    @staticmethod
+    def thumbnail_for(image_id: Optional[str]) -> Optional[str]:
+        """Thumbnail variant of a processed image, if it has one."""
+        if image_id and image_id.endswith(DISPLAY_SUFFIX) and _digest_of(image_id):
+            return image_id[:-len(DISPLAY_SUFFIX)] + THUMB_SUFFIX
+        return None
+
+    @staticmethod
+    def release(db, image_id: Optional[str]):
+        """
+        Delete an image's files if no event or user refers to it any more.
+        Call after the commit that dropped the reference. External URLs are ignored.
+        """
+        if not image_id or "/" in image_id or image_id.startswith("."):
+            return
+        key = _digest_of(image_id)
+        if key:
+            pattern = f"{key}.%"
+            # Checked and deleted under the key's lock, so process_variants can
+            # tell afterwards whether the files went before its reference was seen
+            with _key_lock(key):
+                referenced = db.query(Event.id).filter(Event.image_id.like(pattern)).first() or \
+                             db.query(User.id).filter(User.profile_image_id.like(pattern)).first()
+                if not referenced:
+                    for path in MEDIA_DIR.glob(f"{key}.*"):
+                        path.unlink(missing_ok=True)
+            return
+        # Named before content addressing
+        referenced = db.query(Event.id).filter(Event.image_id == image_id).first() or \
+                     db.query(User.id).filter(User.profile_image_id == image_id).first()
+        if not referenced:
+            (MEDIA_DIR / image_id).unlink(missing_ok=True)
+
+    @staticmethod
+    def process_variants(name: Optional[str], upload: Optional[UploadFile] = None):
+        """
+        Queue the WebP variants of a freshly ingested original (no-op for anything
+        else). Call once the row referencing name is committed, with the upload it
+        came from: a release() of the same image that ran before that commit saw
+        no reference and may have deleted the files, which are then stored again.
+        """
+        if upload is not None and _digest_of(name):
+            name = MediaService._restore(name, upload)
+        if Image is None or not _digest_of(name) or name.endswith(DISPLAY_SUFFIX):
+            return
+        if MediaService._executor is None:
+            MediaService._executor = ThreadPoolExecutor(
+                max_workers=settings.MEDIA_VARIANT_WORKERS,
+                thread_name_prefix="media-variants"
+            )
+        MediaService._executor.submit(MediaService._make_variants, name)
+
+    @staticmethod
+    def _restore(name: str, upload: UploadFile) -> str:
+        """Store the upload again if name's file is gone. Returns the name to build variants from."""
+        key = _digest_of(name)
+        with _key_lock(key):
+            if (MEDIA_DIR / name).exists():
+                return name
+        upload.file.seek(0)
+        _, extension, temp_path = MediaService._receive(upload)
+        original = f"{key}{extension}"
+        try:
+            with _key_lock(key):
+                if (MEDIA_DIR / name).exists():
+                    return name
+                logger.info(f"Restoring {original}, deleted while its upload was being saved")
+                os.replace(temp_path, MEDIA_DIR / original)
+        finally:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+        # A display name is rebuilt from the original by _make_variants
+        return original
+
+    @staticmethod
+    def _make_variants(name: str):
+        key = _digest_of(name)
+        display = f"{key}{DISPLAY_SUFFIX}"
+        try:
+            with Image.open(MEDIA_DIR / name) as image:
+                image.load()
+                if image.mode not in ("RGB", "RGBA"):
+                    image = image.convert("RGBA")
+                for variant, size in (
+                    (display, settings.MEDIA_DISPLAY_MAX_SIZE),
+                    (f"{key}{THUMB_SUFFIX}", settings.MEDIA_THUMBNAIL_SIZE),
+                ):
+                    resized = image.copy()
+                    resized.thumbnail((size, size))
+                    fd, temp_path = tempfile.mkstemp(dir=MEDIA_DIR, prefix=".variant-")
+                    with os.fdopen(fd, "wb") as out:
+                        resized.save(out, format="WEBP", quality=settings.MEDIA_WEBP_QUALITY)
+                    os.replace(temp_path, MEDIA_DIR / variant)
+        except Exception as e:
+            logger.error(f"Could not create variants for {name}: {e}")
+            return
+
+        from core.response_cache import response_cache
+        db = SessionLocal()
+        try:
+            # Only rows still showing this upload; a newer image set meanwhile wins
+            event_ids = [event_id for (event_id,) in db.query(Event.id).filter(Event.image_id == name)]
+            db.query(Event).filter(Event.image_id == name).update({Event.image_id: display}, synchronize_session=False)
+            db.query(User).filter(User.profile_image_id == name).update({User.profile_image_id: display}, synchronize_session=False)
+            db.commit()
+            for event_id in event_ids:
+                response_cache.invalidate_event(event_id)
+        finally:
+            db.close()
+
+    @staticmethod
+    def shutdown():
+        if MediaService._executor is not None:
+            MediaService._executor.shutdown(wait=True)
+            MediaService._executor = None
@@ -0,0 +1,135 @@
+import math
+from typing import Optional
+from sqlalchemy import case, func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from core.config import settings
+from models.event import Event, EventStatus
+from models.organizer_stats import OrganizerStats
+
+COUNTERS = ("total_events", "active_events", "tickets_sold", "total_revenue")
+
+class OrganizerStatsService:
+    @staticmethod
+    def compute(db: Session, active_condition=None, organizer_id: Optional[int] = None) -> dict[int, dict]:
+        """Dashboard totals per organizer, aggregated in SQL from the events table."""
+        if active_condition is None:
+            active_condition = Event.status == EventStatus.PUBLISHED
+        sold = Event.total_seats - Event.available_seats
+        query = db.query(
+            Event.organizer_id,
+            func.count(Event.id),
+            func.coalesce(func.sum(case((active_condition, 1), else_=0)), 0),
+            func.coalesce(func.sum(sold), 0),
+            func.coalesce(func.sum(sold * Event.price), 0.0),
+        ).group_by(Event.organizer_id)
+        if organizer_id is not None:
+            query = query.filter(Event.organizer_id == organizer_id)
+
+        return {
+            organizer: {
+                "total_events": int(total_events),
+                "active_events": int(active_events),
+                "tickets_sold": int(tickets_sold),
+                "total_revenue": float(total_revenue),
+            }
+            for organizer, total_events, active_events, tickets_sold, total_revenue in query
+        }
+
+    @staticmethod
+    def get(db: Session, organizer_id: int) -> Optional[dict]:
+        """Stored counters for an organizer, or None when the table is off or has no row."""
+        if not settings.ORGANIZER_STATS_TABLE_ENABLED:
+            return None
+        row = db.query(OrganizerStats).filter(OrganizerStats.organizer_id == organizer_id).first()
+        if row is None:
+            return None
+        return {counter: getattr(row, counter) for counter in COUNTERS}
+
+    @staticmethod
+    def record(db: Session, organizer_id: int, **deltas):
+        """Add deltas to an organizer's counters in the caller's transaction. The caller commits."""
+        if not settings.ORGANIZER_STATS_TABLE_ENABLED or not any(deltas.values()):
+            return
+        increment = {getattr(OrganizerStats, counter): getattr(OrganizerStats, counter) + delta for counter, delta in deltas.items()}
+        updated = db.query(OrganizerStats).filter(OrganizerStats.organizer_id == organizer_id).update(
+            increment, synchronize_session=False
+        )
+        if not updated:
+            # First event of a new organizer (existing organizers get a row at startup)
+            values = {counter: 0 for counter in COUNTERS}
+            values.update(deltas)
+            try:
+                with db.begin_nested():
+                    db.add(OrganizerStats(organizer_id=organizer_id, **values))
+            except IntegrityError:
+                # A concurrent first write created the row; add to it instead
+                db.query(OrganizerStats).filter(OrganizerStats.organizer_id == organizer_id).update(
+                    increment, synchronize_session=False
+                )
+
+    @staticmethod
+    def record_seats(db: Session, event_id: int, seats: int):
+        """Seats booked (positive) or released (negative) for an event. The caller commits."""
+        if not settings.ORGANIZER_STATS_TABLE_ENABLED or not seats:
+            return
+        # Organizer and price are read in the same statement, so no extra round trip
+        organizer = select(Event.organizer_id).where(Event.id == event_id).scalar_subquery()
+        price = select(Event.price).where(Event.id == event_id).scalar_subquery()
+        db.query(OrganizerStats).filter(OrganizerStats.organizer_id == organizer).update({
+            OrganizerStats.tickets_sold: OrganizerStats.tickets_sold + seats,
+            OrganizerStats.total_revenue: OrganizerStats.total_revenue + seats * price,
+        }, synchronize_session=False)
+
+    @staticmethod
+    def record_ended(db: Session, ended_condition):
+        """
+        Move PUBLISHED events matching `ended_condition` out of the active counts.
+        Call before the sweep rewrites their status, in the same transaction.
+        """
+        if not settings.ORGANIZER_STATS_TABLE_ENABLED:
+            return
+        ending = [Event.status == EventStatus.PUBLISHED, ended_condition]
+        ended = select(func.count(Event.id)).where(Event.organizer_id == OrganizerStats.organizer_id, *ending)\
+                                            .scalar_subquery()
+        db.query(OrganizerStats).filter(
+            OrganizerStats.organizer_id.in_(select(Event.organizer_id).where(*ending))
+        ).update({OrganizerStats.active_events: OrganizerStats.active_events - ended}, synchronize_session=False)
+
+    @staticmethod
+    def check(db: Session, fix: bool = False) -> list[dict]:
+        """
+        Recompute every organizer's counters from the events table and report the
+        rows that disagree with organizer_stats. With fix=True, rewrite them.
+        """
+        stored_rows = db.query(OrganizerStats)
+        if fix:
+            # Lock the counters before reading events: a writer that already bumped
+            # one commits first and is counted, the rest add their delta after we
+            # commit, so live updates are never overwritten.
+            stored_rows = stored_rows.with_for_update()
+        stored = {row.organizer_id: row for row in stored_rows}
+        expected = OrganizerStatsService.compute(db)
+        zero = {counter: 0 for counter in COUNTERS}
+
+        drift = []
+        for organizer_id in sorted(expected.keys() | stored.keys()):
+            want = expected.get(organizer_id, zero)
+            row = stored.get(organizer_id)
+            have = {counter: getattr(row, counter) for counter in COUNTERS} if row else None
+            if have is not None and all(math.isclose(have[c], want[c], abs_tol=0.005) for c in COUNTERS):
+                continue
+            drift.append({"organizer_id": organizer_id, "stored": have, "expected": want})
+            if fix:
+                if row is None:
+                    try:
+                        with db.begin_nested():
+                            db.add(OrganizerStats(organizer_id=organizer_id, **want))
+                    except IntegrityError:
+                        pass  # Created by a concurrent first write; the next check corrects it
+                else:
+                    for counter, value in want.items():
+                        setattr(row, counter, value)
+        if fix:
+            db.commit()
+        return drift
@@ -0,0 +1,136 @@
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Optional
+from core.config import settings
+from core.database import SessionLocal
+from core.periodic_task import PeriodicTask
+from models.event import Event
+from models.user import User
+from services.outbox_service import OutboxService
+from services.outbox_sinks import OutboxSink, create_sinks
+
+logger = logging.getLogger(__name__)
+
+METRICS_WINDOW_SECONDS = 60
+
+# Why: Delivers outbox messages off the request path. Each batch is claimed in
+# one short transaction, enriched with two lookups (users, events) instead of
+# one per message, handed to every sink, and its outcome recorded in a second
+# transaction. A message is sent once every sink that accepts its topic took it;
+# otherwise it is retried with exponential backoff, and after OUTBOX_MAX_ATTEMPTS
+# it is marked FAILED for inspection.
+class OutboxDispatcher:
+    def __init__(self, sinks: Optional[list[OutboxSink]] = None, batch_size: Optional[int] = None):
+        self._sinks = sinks
+        self.batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+        self.task = PeriodicTask("Outbox dispatch", self.run_once, settings.OUTBOX_POLL_INTERVAL_SECONDS)
+        self._metrics_lock = threading.Lock()
+        # (finished at, sent, summed seconds from creation to delivery) per batch
+        self._window: deque = deque()
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+        self.batches = 0
+        self.last_batch_ms = 0.0
+
+    @property
+    def sinks(self) -> list[OutboxSink]:
+        if self._sinks is None:
+            self._sinks = create_sinks()
+        return self._sinks
+
+    @staticmethod
+    def _enrich(db, messages: list[dict]):
+        user_ids = {m["payload"]["user_id"] for m in messages if "user_id" in m["payload"]}
+        event_ids = {m["payload"]["event_id"] for m in messages if "event_id" in m["payload"]}
+        users = {row.id: {"email": row.email, "full_name": row.full_name} for row in
+                 db.query(User.id, User.email, User.full_name).filter(User.id.in_(user_ids))} if user_ids else {}
+        events = {row.id: {"title": row.title, "date": row.date.isoformat()} for row in
+                  db.query(Event.id, Event.title, Event.date).filter(Event.id.in_(event_ids))} if event_ids else {}
+        db.rollback()
+        for message in messages:
+            message["user"] = users.get(message["payload"].get("user_id"))
+            message["event"] = events.get(message["payload"].get("event_id"))
+
+    def dispatch_batch(self, db) -> int:
+        """Deliver one batch. Returns the number of messages claimed (0 when idle)."""
+        started = time.perf_counter()
+        messages = OutboxService.claim(db, self.batch_size)
+        if not messages:
+            return 0
+        self._enrich(db, messages)
+
+        failures: dict[int, str] = {}
+        for sink in self.sinks:
+            pending = [m for m in messages if sink.accepts(m["topic"]) and m["id"] not in failures]
+            if not pending:
+                continue
+            try:
+                failures.update(sink.send(pending))
+            except Exception as e:
+                error = f"{sink.name}: {e}"
+                failures.update({m["id"]: error for m in pending})
+        sent = [m for m in messages if m["id"] not in failures]
+        abandoned = OutboxService.complete(db, [m["id"] for m in sent], failures)
+        if failures:
+            logger.warning(f"Outbox: {len(failures)} of {len(messages)} message(s) failed, {abandoned} given up")
+
+        now = datetime.utcnow()
+        finished = time.monotonic()
+        with self._metrics_lock:
+            self.sent += len(sent)
+            self.retried += len(failures) - abandoned
+            self.failed += abandoned
+            self.batches += 1
+            self.last_batch_ms = (time.perf_counter() - started) * 1000
+            self._window.append((finished, len(sent), sum((now - m["created_at"]).total_seconds() for m in sent)))
+            while self._window and self._window[0][0] < finished - METRICS_WINDOW_SECONDS:
+                self._window.popleft()
+        return len(messages)
+
+    def run_once(self) -> int:
+        db = SessionLocal()
+        try:
+            delivered = 0
+            while not self.task.stopping.is_set():
+                claimed = self.dispatch_batch(db)
+                delivered += claimed
+                if claimed < self.batch_size:
+                    break
+            OutboxService.purge(db)
+            return delivered
+        finally:
+            db.close()
+
+    def close(self):
+        for sink in self._sinks or ():
+            sink.close()
+
+    def stats(self) -> dict:
+        """Counters, throughput and lag (age of the oldest undelivered message)."""
+        db = SessionLocal()
+        try:
+            oldest = OutboxService.oldest_pending(db)
+        finally:
+            db.close()
+        now = time.monotonic()
+        with self._metrics_lock:
+            recent = [entry for entry in self._window if entry[0] >= now - METRICS_WINDOW_SECONDS]
+            recent_sent = sum(count for _, count, _ in recent)
+            return {
+                "running": self.task.running,
+                "sinks": [sink.name for sink in self._sinks] if self._sinks is not None else settings.OUTBOX_SINKS.split(","),
+                "sent": self.sent,
+                "retried": self.retried,
+                "failed": self.failed,
+                "batches": self.batches,
+                "last_batch_ms": round(self.last_batch_ms, 2),
+                "throughput_per_sec": round(recent_sent / METRICS_WINDOW_SECONDS, 2),
+                "avg_delivery_latency_s": round(sum(total for _, _, total in recent) / recent_sent, 3) if recent_sent else 0.0,
+                "lag_seconds": round((datetime.utcnow() - oldest).total_seconds(), 3) if oldest else 0.0,
+            }
+
+outbox_dispatcher = OutboxDispatcher()
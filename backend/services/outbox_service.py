@@ -0,0 +1,112 @@
+import json
+import random
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+from sqlalchemy import func, insert, or_
+from sqlalchemy.orm import Session
+from core.config import settings
+from models.outbox import OutboxMessage, OutboxStatus
+
+# Topics. Payloads carry ids only; the dispatcher looks up names and emails at delivery.
+BOOKING_CONFIRMED = "booking.confirmed"
+BOOKING_CANCELLED = "booking.cancelled"
+EVENT_CANCELLED = "event.cancelled"
+# One per attendee of a cancelled event, written by the cancellation job
+EVENT_CANCELLED_ATTENDEE = "event.cancelled.attendee"
+# Seats freed up and held for someone on the waitlist
+WAITLIST_OFFERED = "waitlist.offered"
+
+class OutboxService:
+    @staticmethod
+    def add(db: Session, topic: str, payload: dict):
+        """Queue a message in the caller's transaction. The caller commits."""
+        db.add(OutboxMessage(topic=topic, payload=json.dumps(payload)))
+
+    @staticmethod
+    def add_many(db: Session, topic: str, payloads: Iterable[dict]):
+        """Queue several messages with one INSERT, in the caller's transaction."""
+        now = datetime.utcnow()
+        rows = [
+            {"topic": topic, "payload": json.dumps(payload), "status": OutboxStatus.PENDING,
+             "attempts": 0, "next_attempt_at": now, "created_at": now}
+            for payload in payloads
+        ]
+        if rows:
+            db.execute(insert(OutboxMessage.__table__), rows)
+
+    @staticmethod
+    def claim(db: Session, limit: int) -> list[dict]:
+        """
+        Lock up to `limit` due messages for delivery, oldest first, and return them.
+        The lock is a lease (locked_until), so nothing is held open while sending.
+        """
+        now = datetime.utcnow()
+        messages = db.query(OutboxMessage).filter(
+            OutboxMessage.status == OutboxStatus.PENDING,
+            OutboxMessage.next_attempt_at <= now,
+            or_(OutboxMessage.locked_until.is_(None), OutboxMessage.locked_until < now)
+        ).order_by(OutboxMessage.id).limit(limit).with_for_update(skip_locked=True).all()
+        claimed = []
+        for message in messages:
+            message.locked_until = now + timedelta(seconds=settings.OUTBOX_LOCK_SECONDS)
+            claimed.append({
+                "id": message.id,
+                "topic": message.topic,
+                "payload": json.loads(message.payload),
+                "attempts": message.attempts,
+                "created_at": message.created_at,
+            })
+        db.commit()
+        return claimed
+
+    @staticmethod
+    def retry_delay(attempts: int) -> float:
+        """Seconds before the next try after `attempts` failures: exponential, capped, jittered."""
+        delay = min(settings.OUTBOX_RETRY_BASE_SECONDS * 2 ** (attempts - 1), settings.OUTBOX_RETRY_MAX_SECONDS)
+        return delay * random.uniform(0.5, 1.0)
+
+    @staticmethod
+    def complete(db: Session, sent_ids: list[int], failures: dict[int, str]) -> int:
+        """Record a batch's outcome. Returns how many failed messages were given up on."""
+        now = datetime.utcnow()
+        if sent_ids:
+            db.query(OutboxMessage).filter(OutboxMessage.id.in_(sent_ids)).update({
+                OutboxMessage.status: OutboxStatus.SENT,
+                OutboxMessage.attempts: OutboxMessage.attempts + 1,
+                OutboxMessage.sent_at: now,
+                OutboxMessage.locked_until: None,
+            }, synchronize_session=False)
+        abandoned = 0
+        if failures:
+            for message in db.query(OutboxMessage).filter(OutboxMessage.id.in_(failures)):
+                message.attempts += 1
+                message.last_error = failures[message.id][:500]
+                message.locked_until = None
+                if message.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+                    message.status = OutboxStatus.FAILED
+                    abandoned += 1
+                else:
+                    message.next_attempt_at = now + timedelta(seconds=OutboxService.retry_delay(message.attempts))
+        db.commit()
+        return abandoned
+
+    @staticmethod
+    def oldest_pending(db: Session) -> Optional[datetime]:
+        """created_at of the oldest undelivered message, for the dispatcher lag."""
+        oldest = db.query(func.min(OutboxMessage.id)).filter(OutboxMessage.status == OutboxStatus.PENDING).scalar()
+        if oldest is None:
+            return None
+        return db.query(OutboxMessage.created_at).filter(OutboxMessage.id == oldest).scalar()
+
+    @staticmethod
+    def purge(db: Session, limit: int = 1000) -> int:
+        """Delete up to `limit` delivered messages older than OUTBOX_RETENTION_HOURS."""
+        cutoff = datetime.utcnow() - timedelta(hours=settings.OUTBOX_RETENTION_HOURS)
+        ids = [message_id for (message_id,) in db.query(OutboxMessage.id).filter(
+            OutboxMessage.status == OutboxStatus.SENT,
+            OutboxMessage.sent_at < cutoff
+        ).order_by(OutboxMessage.id).limit(limit)]
+        if ids:
+            db.query(OutboxMessage).filter(OutboxMessage.id.in_(ids)).delete(synchronize_session=False)
+        db.commit()
+        return len(ids)
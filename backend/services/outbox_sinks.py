@@ -0,0 +1,117 @@
+import json
+import logging
+import smtplib
+from email.message import EmailMessage
+from typing import Optional
+import requests
+from core.config import settings
+from services.outbox_service import BOOKING_CANCELLED, BOOKING_CONFIRMED, EVENT_CANCELLED_ATTENDEE, WAITLIST_OFFERED
+
+logger = logging.getLogger(__name__)
+
+# Why: Delivery targets are plugins. A sink receives a batch of messages (each
+# with its id, topic, payload and the looked-up "user"/"event" details) and
+# returns {message id: error} for the ones it could not deliver; raising fails
+# the whole batch. Failed messages are retried by the dispatcher, so a sink may
+# see a message again and should send its id along for deduplication.
+
+class OutboxSink:
+    name = "base"
+    topics: Optional[tuple] = None  # None: every topic
+
+    def accepts(self, topic: str) -> bool:
+        return self.topics is None or topic in self.topics
+
+    def send(self, messages: list[dict]) -> dict[int, str]:
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+class LogSink(OutboxSink):
+    """Writes each message to the application log (development)."""
+    name = "log"
+
+    def send(self, messages: list[dict]) -> dict[int, str]:
+        for message in messages:
+            logger.info(f"Outbox {message['id']} {message['topic']}: {json.dumps(message['payload'])}")
+        return {}
+
+EMAILS = {
+    BOOKING_CONFIRMED: ("Booking confirmed: {title}", "Hi {name},\n\nYour booking of {seats} seat(s) for {title} on {date} is confirmed.\n"),
+    BOOKING_CANCELLED: ("Booking cancelled: {title}", "Hi {name},\n\nYour booking of {seats} seat(s) for {title} has been cancelled.\n"),
+    EVENT_CANCELLED_ATTENDEE: ("Event cancelled: {title}", "Hi {name},\n\n{title} on {date} has been cancelled by the organizer. Your booking will be refunded.\n"),
+    WAITLIST_OFFERED: ("Seats available: {title}", "Hi {name},\n\n{seats} seat(s) for {title} on {date} are being held for you. Claim them before the hold expires or they go to the next person on the waitlist.\n"),
+}
+
+class SmtpSink(OutboxSink):
+    """Emails attendees through an SMTP server, one connection per batch."""
+    name = "smtp"
+    topics = tuple(EMAILS)
+
+    def send(self, messages: list[dict]) -> dict[int, str]:
+        failures = {}
+        with smtplib.SMTP(settings.OUTBOX_SMTP_HOST, settings.OUTBOX_SMTP_PORT, timeout=10) as smtp:
+            for message in messages:
+                user, event = message.get("user"), message.get("event")
+                if not user or not event:
+                    continue  # User or event deleted since; nothing to send
+                subject, body = EMAILS[message["topic"]]
+                fields = {
+                    "name": user["full_name"] or user["email"],
+                    "title": event["title"],
+                    "date": event["date"],
+                    "seats": message["payload"].get("seats", 0),
+                }
+                email = EmailMessage()
+                email["From"] = settings.OUTBOX_SMTP_SENDER
+                email["To"] = user["email"]
+                email["Subject"] = subject.format(**fields)
+                email["Message-ID"] = f"<outbox-{message['id']}@event-booking>"
+                email.set_content(body.format(**fields))
+                try:
+                    smtp.send_message(email)
+                except smtplib.SMTPRecipientsRefused as e:
+                    failures[message["id"]] = f"Recipient refused: {e}"
+        return failures
+
+class WebhookSink(OutboxSink):
+    """POSTs each batch as one JSON document to OUTBOX_WEBHOOK_URL."""
+    name = "webhook"
+
+    def __init__(self):
+        self.session = requests.Session()
+
+    def send(self, messages: list[dict]) -> dict[int, str]:
+        body = {"messages": [
+            {key: message[key] for key in ("id", "topic", "payload", "user", "event") if key in message}
+            for message in messages
+        ]}
+        response = self.session.post(
+            settings.OUTBOX_WEBHOOK_URL,
+            data=json.dumps(body, default=str),
+            headers={"Content-Type": "application/json"},
+            timeout=settings.OUTBOX_WEBHOOK_TIMEOUT_SECONDS,
+        )
+        response.raise_for_status()
+        return {}
+
+    def close(self):
+        self.session.close()
+
+SINKS = {sink.name: sink for sink in (LogSink, SmtpSink, WebhookSink)}
+
+def register_sink(sink: type):
+    """Make a custom OutboxSink subclass available to OUTBOX_SINKS by its name."""
+    SINKS[sink.name] = sink
+
+def create_sinks(names: Optional[str] = None) -> list[OutboxSink]:
+    sinks = []
+    for name in (names if names is not None else settings.OUTBOX_SINKS).split(","):
+        name = name.strip()
+        if not name:
+            continue
+        if name not in SINKS:
+            raise RuntimeError(f"Unknown outbox sink '{name}' (expected one of: {', '.join(SINKS)})")
+        sinks.append(SINKS[name]())
+    return sinks
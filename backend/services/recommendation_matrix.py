@@ -0,0 +1,145 @@
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Optional
+from sqlalchemy.orm import Session
+from core.config import settings
+from core.database import SessionLocal
+from models.event import Event, EventStatus
+from models.event_keyword import EventKeyword
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:  # Only needed when RECOMMENDATION_ENGINE == "matrix"
+    np = None
+    sparse = None
+
+logger = logging.getLogger(__name__)
+
+# Why: Vectorized alternative to the SQL scoring path. Published events are kept
+# as a CSR binary event x token matrix, so the intersection sizes for a profile
+# are one sparse mat-vec and the unions come from precomputed row sizes.
+# Rankings match the index path: score descending, then event id ascending.
+class _Snapshot:
+    def __init__(self, vocabulary: dict, event_ids, event_dates, matrix, row_sizes):
+        self.vocabulary = vocabulary
+        self.event_ids = event_ids
+        self.event_dates = event_dates
+        self.matrix = matrix
+        self.row_sizes = row_sizes
+        self.built_at = time.monotonic()
+
+class RecommendationMatrix:
+    def __init__(self, max_age_seconds: Optional[int] = None):
+        self.max_age_seconds = max_age_seconds or settings.RECOMMENDATION_MATRIX_MAX_AGE_SECONDS
+        self._snapshot: Optional[_Snapshot] = None
+        self._dirty = True
+        self._building = False
+        self._lock = threading.Lock()
+
+    def mark_dirty(self):
+        """Rebuild on next use. Called by EventService whenever an event changes."""
+        self._dirty = True
+
+    def _build(self, db: Session) -> _Snapshot:
+        if np is None:
+            raise RuntimeError("RECOMMENDATION_ENGINE=matrix requires numpy and scipy")
+
+        events = db.query(Event.id, Event.date).filter(Event.status == EventStatus.PUBLISHED)\
+                   .order_by(Event.id.asc()).all()
+        postings = db.query(EventKeyword.event_id, EventKeyword.token)\
+                     .join(Event, Event.id == EventKeyword.event_id)\
+                     .filter(Event.status == EventStatus.PUBLISHED).all()
+
+        event_ids = np.fromiter((e.id for e in events), dtype=np.int64, count=len(events))
+        event_dates = np.array([e.date for e in events], dtype="datetime64[us]")
+        row_of = {event_id: row for row, event_id in enumerate(event_ids.tolist())}
+
+        vocabulary: dict[str, int] = {}
+        rows, cols = [], []
+        for event_id, token in postings:
+            rows.append(row_of[event_id])
+            cols.append(vocabulary.setdefault(token, len(vocabulary)))
+
+        matrix = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.int32), (rows, cols)),
+            shape=(len(event_ids), len(vocabulary)),
+        )
+        row_sizes = np.diff(matrix.indptr)
+        return _Snapshot(vocabulary, event_ids, event_dates, matrix, row_sizes)
+
+    def refresh(self):
+        """Build a snapshot now, on the calling thread (startup warm-up, CLI and tests)."""
+        with self._lock:
+            self._dirty = False
+        db = SessionLocal()
+        try:
+            snapshot = self._build(db)
+        except Exception:
+            self._dirty = True
+            raise
+        finally:
+            db.close()
+        with self._lock:
+            self._snapshot = snapshot
+
+    def _rebuild_in_background(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            logger.error(f"Recommendation matrix rebuild failed: {e}")
+        finally:
+            with self._lock:
+                self._building = False
+
+    def _get_snapshot(self) -> Optional[_Snapshot]:
+        # Why: A rebuild scans every published event and its keywords. Callers
+        # run on the event loop thread (through run_sync), so the rebuild runs
+        # on a background thread instead, one at a time, and callers keep using
+        # the previous snapshot until it is swapped in.
+        with self._lock:
+            snapshot = self._snapshot
+            stale = self._dirty or snapshot is None or time.monotonic() - snapshot.built_at > self.max_age_seconds
+            if stale and not self._building:
+                self._building = True
+                threading.Thread(target=self._rebuild_in_background, name="recommendation-matrix", daemon=True).start()
+        return snapshot
+
+    def top_event_ids(self, user_keywords: set[str], excluded_ids: set[int], limit: int, now: datetime) -> Optional[list[int]]:
+        """
+        Best-scoring event ids from the current snapshot, or None while the
+        first snapshot is still being built. The snapshot may lag behind recent
+        writes, so callers re-check status and date.
+        """
+        if np is None:
+            raise RuntimeError("RECOMMENDATION_ENGINE=matrix requires numpy and scipy")
+        snapshot = self._get_snapshot()
+        if snapshot is None:
+            return None
+        if limit <= 0 or not len(snapshot.event_ids):
+            return []
+
+        cols = [snapshot.vocabulary[k] for k in user_keywords if k in snapshot.vocabulary]
+        profile = np.zeros(len(snapshot.vocabulary), dtype=np.int32)
+        profile[cols] = 1
+
+        shared = snapshot.matrix @ profile
+        union = snapshot.row_sizes + len(user_keywords) - shared
+        scores = np.divide(shared, union, out=np.zeros(len(shared)), where=union > 0)
+
+        candidate_mask = snapshot.event_dates > np.datetime64(now, "us")
+        if excluded_ids:
+            candidate_mask &= ~np.isin(snapshot.event_ids, list(excluded_ids))
+        candidates = np.flatnonzero(candidate_mask)
+        if len(candidates) > limit:
+            # Keep everything tied with the k-th best score so the id tie-break is exact.
+            kth_best = -np.partition(-scores[candidates], limit - 1)[limit - 1]
+            candidates = candidates[scores[candidates] >= kth_best]
+
+        # Rows are in id order, so the row index doubles as the id tie-break.
+        order = np.lexsort((candidates, -scores[candidates]))
+        return snapshot.event_ids[candidates[order][:limit]].tolist()
+
+recommendation_matrix = RecommendationMatrix()
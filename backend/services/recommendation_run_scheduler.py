@@ -0,0 +1,27 @@
+import logging
+import multiprocessing
+from typing import Optional
+from core.config import settings
+from core.database import SessionLocal
+from core.periodic_task import PeriodicTask
+from services.batch_recommendation_service import BatchRecommendationService
+
+logger = logging.getLogger(__name__)
+
+# Why: Runs the batch recommendation precompute queued over HTTP, so the request
+# returns at once. Worker processes are spawned rather than forked: forking a
+# server process with live threads and pooled connections is not safe.
+class RecommendationRunScheduler:
+    def __init__(self, interval_seconds: Optional[float] = None):
+        self.interval_seconds = interval_seconds or settings.BATCH_RECOMMENDATION_POLL_INTERVAL_SECONDS
+        self.task = PeriodicTask("Recommendation run", self.run_once, self.interval_seconds)
+
+    def run_once(self) -> Optional[int]:
+        db = SessionLocal()
+        try:
+            run_id = BatchRecommendationService.run_pending(db, multiprocessing.get_context("spawn"))
+            if run_id:
+                logger.info(f"Finished recommendation run {run_id}")
+            return run_id
+        finally:
+            db.close()
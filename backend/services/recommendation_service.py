@@ -1,18 +1,17 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy import func
 from models.event import Event, EventStatus
-from models.booking import Booking
-from models.user import User
-from collections import Counter
-import json
-import math
+from models.event_keyword import EventKeyword
+from services.keyword_index import KeywordIndex
+from services.user_profile_service import UserProfileService
+from services.recommendation_matrix import recommendation_matrix
+from services.batch_recommendation_service import BatchRecommendationService
+from core.config import settings
 
 class RecommendationService:
     @staticmethod
     def _tokenize(text: str) -> set[str]:
-        if not text:
-            return set()
-        return set(word.lower() for word in text.split() if len(word) > 3)
+        return KeywordIndex.tokenize(text)
 
     @staticmethod
     def _calculate_jaccard_similarity(user_keywords: set[str], event_keywords: set[str]) -> float:
@@ -24,80 +23,68 @@ class RecommendationService:
 
     @staticmethod
     def get_keyword_recommendations(db: Session, user_id: int, limit: int = 5):
-        user = db.query(User).filter(User.id == user_id).first()
-        if not user:
-            return []
-
-
-        user_keywords = set()
-        
-
-        if user.interests:
-            try:
-                interests_list = json.loads(user.interests)
-                if isinstance(interests_list, list):
-                    for interest in interests_list:
-                        user_keywords.add(interest.lower())
-            except:
-                pass
-        
-
-        # Limit to last 50 bookings for efficiency & recency relevance
-        past_bookings = db.query(Booking).filter(Booking.user_id == user_id)\
-                          .order_by(Booking.id.desc())\
-                          .limit(50).all()
-        
-        type_counter = Counter()
-        keyword_counter = Counter()
-
-        for booking in past_bookings:
-            event = booking.event
-            # Weight event type heavily
-            type_counter[event.event_type.value.lower()] += 1
-            
-            # Extract keywords from title/desc
-            words = RecommendationService._tokenize(event.title)
-            # Give title words more weight than description (add them twice)
-            keyword_counter.update(words)
-            keyword_counter.update(words) 
-            
-            desc_words = RecommendationService._tokenize(event.description)
-            keyword_counter.update(desc_words)
-
-        # Build optimized profile: Top 3 favorite categories + Top 20 keywords
-        # This keeps the set small even if user has 1000 bookings
-        top_types = {t for t, _ in type_counter.most_common(3)}
-        top_keywords = {k for k, _ in keyword_counter.most_common(20)}
-        
-        user_keywords.update(top_types)
-        user_keywords.update(top_keywords)
-
-
         from datetime import datetime
-        from services.event_service import EventService
-        EventService.update_ended_events(db)
-        
         now = datetime.now()
-        candidate_events = db.query(Event).filter(
-            Event.status == EventStatus.PUBLISHED,
-            Event.date > now
-        ).all()
-
-
-        booked_event_ids = {b.event_id for b in past_bookings}
-        candidate_events = [e for e in candidate_events if e.id not in booked_event_ids]
 
+        if settings.SERVE_PRECOMPUTED_RECOMMENDATIONS:
+            precomputed = BatchRecommendationService.get_precomputed(db, user_id, limit, now)
+            if precomputed is not None:
+                return precomputed
 
-        scored_events = []
-        for event in candidate_events:
-            event_keywords = RecommendationService._tokenize(event.title)
-            event_keywords.update(RecommendationService._tokenize(event.description))
-            event_keywords.add(event.event_type.value.lower())
-            
-            score = RecommendationService._calculate_jaccard_similarity(user_keywords, event_keywords)
-            scored_events.append((event, score))
+        profile = UserProfileService.get_profile(db, user_id)
+        if not profile:
+            return []
 
+        if settings.RECOMMENDATION_ENGINE == "matrix":
+            return RecommendationService._recommend_from_matrix(db, profile.keywords, profile.booked_event_ids, limit, now)
+        return RecommendationService._recommend_from_index(db, profile.keywords, profile.booked_event_ids, limit, now)
 
-        scored_events.sort(key=lambda x: x[1], reverse=True)
+    @staticmethod
+    def _recommend_from_matrix(db: Session, user_keywords: set[str], booked_event_ids: set[int], limit: int, now):
+        # A few spare candidates, for events cancelled or moved since the snapshot was built
+        event_ids = recommendation_matrix.top_event_ids(user_keywords, booked_event_ids, 2 * limit, now)
+        if event_ids is None:
+            # No snapshot yet (it is being built in the background)
+            return RecommendationService._recommend_from_index(db, user_keywords, booked_event_ids, limit, now)
+        events = {e.id: e for e in db.query(Event).filter(
+            Event.id.in_(event_ids),
+            Event.status == EventStatus.PUBLISHED,
+            Event.date > now
+        ).all()}
+        recommended = [events[event_id] for event_id in event_ids if event_id in events][:limit]
+        if len(recommended) < limit:
+            # Too many went stale, or events were added since the snapshot
+            return RecommendationService._recommend_from_index(db, user_keywords, booked_event_ids, limit, now)
+        return recommended
 
-        return [e for e, s in scored_events[:limit]]
+    @staticmethod
+    def _recommend_from_index(db: Session, user_keywords: set[str], booked_event_ids: set[int], limit: int, now):
+        candidate_filter = [
+            Event.status == EventStatus.PUBLISHED,
+            Event.date > now,
+            Event.id.notin_(booked_event_ids),
+        ]
+
+        # Why: Score only events sharing at least one keyword with the profile, using
+        # the inverted index. |event ∪ user| = |event| + |user| - |event ∩ user|.
+        recommended = []
+        if user_keywords:
+            matches = db.query(
+                EventKeyword.event_id.label("event_id"),
+                func.count(EventKeyword.token).label("shared")
+            ).filter(EventKeyword.token.in_(user_keywords)).group_by(EventKeyword.event_id).subquery()
+
+            score = matches.c.shared * 1.0 / (len(user_keywords) + Event.keyword_count - matches.c.shared)
+            recommended = db.query(Event).join(matches, matches.c.event_id == Event.id)\
+                            .filter(*candidate_filter)\
+                            .order_by(score.desc(), Event.id.asc())\
+                            .limit(limit).all()
+
+        # Fill remaining slots with zero-score candidates, as the full scan used to.
+        if len(recommended) < limit:
+            recommended_ids = [e.id for e in recommended]
+            recommended += db.query(Event).filter(*candidate_filter, Event.id.notin_(recommended_ids))\
+                             .order_by(Event.id.asc())\
+                             .limit(limit - len(recommended)).all()
+
+        return recommended
@@ -0,0 +1,26 @@
+import logging
+from typing import Optional
+from core.config import settings
+from core.database import SessionLocal
+from core.periodic_task import PeriodicTask
+from services.sales_rollup_service import SalesRollupService
+
+logger = logging.getLogger(__name__)
+
+# Why: Keeps the sales rollups at most one interval (plus the settle window)
+# behind the bookings table, without any work on the booking path itself.
+class SalesRollupScheduler:
+    def __init__(self, interval_seconds: Optional[float] = None):
+        self.interval_seconds = interval_seconds or settings.SALES_ROLLUP_INTERVAL_SECONDS
+        self.task = PeriodicTask("Sales rollup", self.run_once, self.interval_seconds)
+
+    def run_once(self) -> dict:
+        db = SessionLocal()
+        try:
+            stats = SalesRollupService.run(db)
+            if stats["sales"] or stats["cancellations"]:
+                logger.info(f"Rolled up {stats['sales']} booking(s) and {stats['cancellations']} cancellation(s)")
+            return stats
+        finally:
+            db.close()
+
@@ -0,0 +1,214 @@
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from fastapi import HTTPException
+from sqlalchemy import and_, func, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from core.config import settings
+from models.booking import Booking
+from models.event import Event
+from models.sales_rollup import DailySalesRollup, HourlySalesRollup, RollupWatermark
+
+GRANULARITIES = {
+    "hour": (HourlySalesRollup, timedelta(hours=1)),
+    "day": (DailySalesRollup, timedelta(days=1)),
+}
+MAX_POINTS = 2000
+
+# Each feed walks bookings in (timestamp, id) order from its watermark:
+# "sales" by created_at, "cancellations" by cancelled_at.
+FEEDS = {
+    "sales": Booking.created_at,
+    "cancellations": Booking.cancelled_at,
+}
+
+def _naive_utc(moment: Optional[datetime]) -> Optional[datetime]:
+    # Stored timestamps are naive UTC
+    if moment is not None and moment.tzinfo is not None:
+        return moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+def _truncate(moment: datetime, granularity: str) -> datetime:
+    moment = moment.replace(minute=0, second=0, microsecond=0)
+    if granularity == "day":
+        moment = moment.replace(hour=0)
+    return moment
+
+class SalesRollupService:
+    @staticmethod
+    def _watermark(db: Session, feed: str) -> RollupWatermark:
+        # Why: FOR UPDATE serializes concurrent runs (one per worker process), so
+        # no range of bookings is folded into the rollups twice. Migrations seed the
+        # rows; a database created from the models gets them on the first run.
+        watermark = db.query(RollupWatermark).filter(RollupWatermark.name == feed).with_for_update().first()
+        if watermark is None:
+            try:
+                with db.begin_nested():
+                    db.add(RollupWatermark(name=feed, position_at=None, position_id=0))
+            except IntegrityError:
+                pass  # Another worker's first run created it
+            watermark = db.query(RollupWatermark).filter(RollupWatermark.name == feed).with_for_update().one()
+        return watermark
+
+    @staticmethod
+    def _apply(db: Session, model, totals: dict[tuple, dict]):
+        """
+        Add per-(bucket, event) deltas to a rollup table with one read, one bulk
+        update and one bulk insert. Safe as read-modify-write because only the
+        job holding the watermark lock writes rollups.
+        """
+        event_ids = {event_id for _, event_id in totals}
+        buckets = [bucket for bucket, _ in totals]
+        existing = {
+            (row.bucket, row.event_id): row
+            for row in db.query(model.bucket, model.event_id, model.seats_sold, model.seats_cancelled, model.revenue)
+                         .filter(model.event_id.in_(event_ids), model.bucket >= min(buckets), model.bucket <= max(buckets))
+        }
+
+        updates, inserts = [], []
+        for (bucket, event_id), deltas in totals.items():
+            row = existing.get((bucket, event_id))
+            if row is None:
+                inserts.append({"bucket": bucket, "event_id": event_id, **deltas})
+            else:
+                updates.append({
+                    "bucket": bucket,
+                    "event_id": event_id,
+                    "seats_sold": row.seats_sold + deltas["seats_sold"],
+                    "seats_cancelled": row.seats_cancelled + deltas["seats_cancelled"],
+                    "revenue": row.revenue + deltas["revenue"],
+                })
+        if updates:
+            db.bulk_update_mappings(model, updates)
+        if inserts:
+            db.bulk_insert_mappings(model, inserts)
+
+    @staticmethod
+    def _run_feed(db: Session, feed: str, cutoff: datetime, batch_size: int) -> int:
+        """Fold one batch of a feed into the rollups and advance its watermark. Returns rows read."""
+        moment = FEEDS[feed]
+        watermark = SalesRollupService._watermark(db, feed)
+
+        query = db.query(Booking.id, moment, Booking.event_id, Booking.number_of_seats, Event.organizer_id, Event.price)\
+                  .join(Event, Event.id == Booking.event_id)\
+                  .filter(moment != None, moment <= cutoff)
+        if watermark.position_at is not None:
+            query = query.filter(or_(
+                moment > watermark.position_at,
+                and_(moment == watermark.position_at, Booking.id > watermark.position_id)
+            ))
+        rows = query.order_by(moment.asc(), Booking.id.asc()).limit(batch_size).all()
+        if len(rows) < batch_size:
+            watermark.covered_until = cutoff
+        if not rows:
+            db.commit()
+            return 0
+
+        # Aggregate the batch in memory, then write each touched bucket once
+        sign = 1 if feed == "sales" else -1
+        counter = "seats_sold" if feed == "sales" else "seats_cancelled"
+        for granularity, (model, _) in GRANULARITIES.items():
+            totals: dict[tuple, dict] = {}
+            for _, at, event_id, seats, organizer_id, price in rows:
+                entry = totals.setdefault((_truncate(at, granularity), event_id), {
+                    "organizer_id": organizer_id, "seats_sold": 0, "seats_cancelled": 0, "revenue": 0.0
+                })
+                entry[counter] += seats
+                entry["revenue"] += sign * seats * price
+            SalesRollupService._apply(db, model, totals)
+
+        watermark.position_id, watermark.position_at = rows[-1][0], rows[-1][1]
+        db.commit()
+        return len(rows)
+
+    @staticmethod
+    def run(db: Session, batch_size: Optional[int] = None) -> dict:
+        """
+        Fold every booking and cancellation since the watermarks into the rollups.
+        Stops SALES_ROLLUP_SETTLE_SECONDS short of now, so rows from transactions
+        that are still committing are picked up by the next run rather than skipped.
+        """
+        batch_size = batch_size or settings.SALES_ROLLUP_BATCH_SIZE
+        cutoff = datetime.utcnow() - timedelta(seconds=settings.SALES_ROLLUP_SETTLE_SECONDS)
+        started = time.perf_counter()
+
+        processed = {}
+        for feed in FEEDS:
+            processed[feed] = 0
+            while True:
+                rows = SalesRollupService._run_feed(db, feed, cutoff, batch_size)
+                processed[feed] += rows
+                if rows < batch_size:
+                    break
+
+        elapsed = time.perf_counter() - started
+        total = sum(processed.values())
+        return {
+            **processed,
+            "seconds": round(elapsed, 3),
+            "rows_per_sec": round(total / elapsed, 1) if elapsed else 0.0,
+        }
+
+    @staticmethod
+    def rebuild(db: Session) -> dict:
+        """Drop every rollup, rewind the watermarks and fold all bookings again."""
+        for model, _ in GRANULARITIES.values():
+            db.query(model).delete(synchronize_session=False)
+        db.query(RollupWatermark).filter(RollupWatermark.name.in_(FEEDS)).update(
+            {RollupWatermark.position_at: None, RollupWatermark.position_id: 0, RollupWatermark.covered_until: None},
+            synchronize_session=False
+        )
+        db.commit()
+        return SalesRollupService.run(db)
+
+    @staticmethod
+    def get_timeseries(
+        db: Session,
+        organizer_id: int,
+        granularity: str = "day",
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        event_id: Optional[int] = None,
+    ) -> dict:
+        """Sales per bucket in [start, end), every bucket present (zero-filled)."""
+        if granularity not in GRANULARITIES:
+            raise HTTPException(status_code=400, detail=f"granularity must be one of: {', '.join(GRANULARITIES)}")
+        model, step = GRANULARITIES[granularity]
+
+        end = _naive_utc(end) or datetime.utcnow()
+        start = _naive_utc(start) or end - timedelta(days=30)
+        first, last = _truncate(start, granularity), _truncate(end, granularity)
+        if last < end:
+            last += step
+        if first >= last:
+            raise HTTPException(status_code=400, detail="start must be before end")
+        if (last - first) / step > MAX_POINTS:
+            raise HTTPException(status_code=400, detail=f"Range too large: at most {MAX_POINTS} {granularity} buckets")
+
+        query = db.query(
+            model.bucket,
+            func.sum(model.seats_sold),
+            func.sum(model.seats_cancelled),
+            func.sum(model.revenue),
+        ).filter(model.organizer_id == organizer_id, model.bucket >= first, model.bucket < last)
+        if event_id is not None:
+            query = query.filter(model.event_id == event_id)
+        found = {bucket: (sold, cancelled, revenue) for bucket, sold, cancelled, revenue in query.group_by(model.bucket)}
+
+        points = []
+        bucket = first
+        while bucket < last:
+            sold, cancelled, revenue = found.get(bucket, (0, 0, 0.0))
+            points.append({
+                "bucket": bucket,
+                "seats_sold": int(sold),
+                "seats_cancelled": int(cancelled),
+                "revenue": round(float(revenue), 2),
+            })
+            bucket += step
+
+        # Rollups are complete up to the feed that is furthest behind
+        covered = [w.covered_until for w in db.query(RollupWatermark).filter(RollupWatermark.name.in_(FEEDS))]
+        as_of = min(covered) if len(covered) == len(FEEDS) and None not in covered else None
+        return {"granularity": granularity, "start": first, "end": last, "as_of": as_of, "points": points}
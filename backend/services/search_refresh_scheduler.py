@@ -0,0 +1,23 @@
+import logging
+from typing import Optional
+from core.config import settings
+from core.periodic_task import PeriodicTask
+from services.search_service import search_backend
+
+logger = logging.getLogger(__name__)
+
+# Why: The trigram index lives in each worker's memory and only sees that
+# worker's own writes. Refreshing it from the events table picks up events
+# created, renamed or deleted through the other workers.
+class SearchRefreshScheduler:
+    def __init__(self, interval_seconds: Optional[float] = None):
+        self.interval_seconds = interval_seconds or settings.SEARCH_TRIGRAM_REFRESH_SECONDS
+        # The index was just built by prepare(), so the first refresh waits an interval
+        self.task = PeriodicTask("Search index refresh", self.run_once, self.interval_seconds, delay_first=True)
+
+    def run_once(self) -> int:
+        indexed = search_backend.refresh()
+        if indexed:
+            logger.debug(f"Refreshed {indexed} event(s) in the search index")
+        return indexed
+
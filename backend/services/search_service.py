@@ -0,0 +1,218 @@
+import logging
+import re
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Optional, Sequence
+from sqlalchemy import case, false, func, literal_column, or_, select, table
+from sqlalchemy.dialects.mysql import match as mysql_match
+from core.config import settings
+from core.database import SessionLocal, engine
+from core.search_indexes import FTS_TABLE, search_indexes_exist
+from models.event import Event
+
+logger = logging.getLogger(__name__)
+
+# Why: `ILIKE '%term%'` cannot use the title index, so every search scans the
+# whole events table. Search is pluggable so the catalogue can use a real index:
+#   like     - the original ILIKE filters (default, no setup)
+#   fulltext - MySQL FULLTEXT indexes, or an FTS5 table on SQLite
+#   trigram  - an in-process trigram index kept in sync by EventService writes
+# Every backend turns a term into a WHERE condition that combines with the other
+# filters, plus (when it can rank) a relevance expression to order by.
+
+SEARCH_FIELDS = ("title", "location")
+
+def _words(term: str) -> list[str]:
+    return re.findall(r"\w+", term.lower())
+
+class LikeSearchBackend:
+    name = "like"
+
+    def prepare(self):
+        pass
+
+    def index_event(self, event: Event):
+        pass
+
+    def remove_event(self, event_id: int):
+        pass
+
+    def apply(self, query, term: str, fields: Sequence[str] = SEARCH_FIELDS) -> tuple[Any, Optional[Any]]:
+        pattern = f"%{term}%"
+        return query.where(or_(*(getattr(Event, f).ilike(pattern) for f in fields))), None
+
+class FullTextSearchBackend:
+    """MySQL FULLTEXT (boolean mode) or SQLite FTS5, with prefix matching on every word."""
+    name = "fulltext"
+
+    FTS_TABLE = FTS_TABLE
+
+    def __init__(self):
+        self.dialect = engine.dialect.name
+
+    def prepare(self):
+        if self.dialect not in ("mysql", "sqlite"):
+            raise RuntimeError(f"SEARCH_BACKEND=fulltext is not supported on {self.dialect}")
+        # The indexes come from migration 0009; building them here would lock
+        # the events table while every worker starts up.
+        with engine.connect() as conn:
+            if not search_indexes_exist(conn):
+                raise RuntimeError(
+                    "SEARCH_BACKEND=fulltext needs the full-text search indexes; run the database migrations first"
+                )
+
+    def index_event(self, event: Event):
+        pass  # The database maintains its own full-text index
+
+    def remove_event(self, event_id: int):
+        pass
+
+    def apply(self, query, term: str, fields: Sequence[str] = SEARCH_FIELDS) -> tuple[Any, Optional[Any]]:
+        words = _words(term)
+        if not words:
+            return query, None
+
+        if self.dialect == "mysql":
+            relevance = mysql_match(
+                *(getattr(Event, f) for f in fields), against=" ".join(f"+{w}*" for w in words)
+            ).in_boolean_mode()
+            return query.where(relevance > 0), relevance
+
+        match_query = "{" + " ".join(fields) + "} : (" + " AND ".join(f'"{w}"*' for w in words) + ")"
+        fts = table(self.FTS_TABLE)
+        fts_match = literal_column(self.FTS_TABLE).op("MATCH")
+        matching = select(literal_column(f"{self.FTS_TABLE}.rowid")).select_from(fts).where(fts_match(match_query))
+        # bm25() is lower-is-better, so negate it into a relevance score
+        relevance = select(-func.bm25(literal_column(self.FTS_TABLE))).select_from(fts).where(
+            fts_match(match_query),
+            literal_column(f"{self.FTS_TABLE}.rowid") == Event.id
+        ).scalar_subquery()
+        return query.where(Event.id.in_(matching)), relevance
+
+class TrigramSearchBackend:
+    """
+    In-process trigram index over title and location. Words are padded like
+    pg_trgm ("  word "), so prefixes share the leading trigrams and rank higher.
+    Returns at most SEARCH_MAX_CANDIDATES matches, best first.
+
+    Every process keeps its own copy. Writes made by this process are indexed
+    at once; writes made by other workers show up after the next refresh()
+    (every SEARCH_TRIGRAM_REFRESH_SECONDS, see SearchRefreshScheduler).
+    """
+    name = "trigram"
+    REFRESH_OVERLAP = timedelta(minutes=1)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._postings: dict[str, dict[str, set[int]]] = {f: {} for f in SEARCH_FIELDS}
+        self._grams: dict[str, dict[int, set[str]]] = {f: {} for f in SEARCH_FIELDS}
+        self._refresh_lock = threading.Lock()
+        # Latest updated_at folded into the index (None = nothing loaded yet)
+        self._synced_until: Optional[datetime] = None
+
+    @staticmethod
+    def trigrams(value: Optional[str]) -> set[str]:
+        grams = set()
+        for word in _words(value or ""):
+            padded = f"  {word} "
+            grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+        return grams
+
+    def prepare(self):
+        self.refresh()
+        logger.info(f"Trigram search index built for {len(self._grams['title'])} event(s)")
+
+    def refresh(self) -> int:
+        """
+        Fold in events written since the last refresh, including by other
+        workers, and drop deleted ones. Returns how many events were re-indexed.
+        """
+        with self._refresh_lock:
+            db = SessionLocal()
+            try:
+                query = db.query(Event.id, Event.title, Event.location, Event.updated_at)
+                if self._synced_until is not None:
+                    # Rows committed late can carry an older updated_at, so re-read a margin
+                    query = query.filter(Event.updated_at >= self._synced_until - self.REFRESH_OVERLAP)
+                synced_until = self._synced_until
+                indexed = 0
+                for event_id, title, location, updated_at in query.yield_per(10000):
+                    self._index(event_id, {"title": title, "location": location})
+                    indexed += 1
+                    if updated_at is not None and (synced_until is None or updated_at > synced_until):
+                        synced_until = updated_at
+                if self._synced_until is not None:
+                    # Ids indexed before reading the live ones, so events created meanwhile are kept
+                    with self._lock:
+                        known = set(self._grams["title"])
+                    live = set(db.scalars(select(Event.id)))
+                    for event_id in known - live:
+                        self.remove_event(event_id)
+                self._synced_until = synced_until or datetime.utcnow()
+                return indexed
+            finally:
+                db.close()
+
+    def _index(self, event_id: int, values: dict):
+        with self._lock:
+            for field in SEARCH_FIELDS:
+                self._unindex_field(field, event_id)
+                grams = self.trigrams(values.get(field))
+                self._grams[field][event_id] = grams
+                for gram in grams:
+                    self._postings[field].setdefault(gram, set()).add(event_id)
+
+    def _unindex_field(self, field: str, event_id: int):
+        for gram in self._grams[field].pop(event_id, ()):
+            ids = self._postings[field].get(gram)
+            if ids is not None:
+                ids.discard(event_id)
+                if not ids:
+                    del self._postings[field][gram]
+
+    def index_event(self, event: Event):
+        self._index(event.id, {"title": event.title, "location": event.location})
+
+    def remove_event(self, event_id: int):
+        with self._lock:
+            for field in SEARCH_FIELDS:
+                self._unindex_field(field, event_id)
+
+    def search(self, term: str, fields: Sequence[str] = SEARCH_FIELDS) -> list[tuple[int, float]]:
+        query_grams = self.trigrams(term)
+        if not query_grams:
+            return []
+        best: dict[int, float] = {}
+        with self._lock:
+            for field in fields:
+                shared: dict[int, int] = {}
+                for gram in query_grams:
+                    for event_id in self._postings[field].get(gram, ()):
+                        shared[event_id] = shared.get(event_id, 0) + 1
+                for event_id, count in shared.items():
+                    score = count / len(query_grams)
+                    if score >= settings.SEARCH_TRIGRAM_THRESHOLD and score > best.get(event_id, 0.0):
+                        best[event_id] = score
+        ranked = sorted(best.items(), key=lambda x: (-x[1], x[0]))
+        return ranked[:settings.SEARCH_MAX_CANDIDATES]
+
+    def apply(self, query, term: str, fields: Sequence[str] = SEARCH_FIELDS) -> tuple[Any, Optional[Any]]:
+        ranked = self.search(term, fields)
+        if not ranked:
+            return query.where(false()), None
+        relevance = case(dict(ranked), value=Event.id, else_=0.0)
+        return query.where(Event.id.in_([event_id for event_id, _ in ranked])), relevance
+
+_BACKENDS = {
+    LikeSearchBackend.name: LikeSearchBackend,
+    FullTextSearchBackend.name: FullTextSearchBackend,
+    TrigramSearchBackend.name: TrigramSearchBackend,
+}
+
+def _create_backend():
+    try:
+        return _BACKENDS[settings.SEARCH_BACKEND]()
+    except KeyError:
+        raise RuntimeError(f"Unknown SEARCH_BACKEND '{settings.SEARCH_BACKEND}' (expected one of {', '.join(_BACKENDS)})")
+
+search_backend = _create_backend()
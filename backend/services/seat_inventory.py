@@ -0,0 +1,336 @@
+import logging
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from datetime import datetime
+from typing import Optional
+from fastapi import HTTPException
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from core.config import settings
+from core.database import SessionLocal
+from core.response_cache import response_cache
+from models.booking import Booking, BookingStatus
+from models.event import Event, EventStatus
+from models.waitlist import WaitlistEntry, WaitlistStatus
+from services.organizer_stats_service import OrganizerStatsService
+from services.outbox_service import BOOKING_CONFIRMED, OutboxService
+
+logger = logging.getLogger(__name__)
+
+# Why: During a flash sale every booking for a high-demand event hits the same
+# `events` row. The inventory admits or rejects bookings against an in-memory
+# counter in microseconds and persists the admitted ones in batched write-behind
+# flushes (group commit), so the database sees one UPDATE per event per flush
+# instead of one per booking. The database remains the arbiter: each flush uses a
+# guarded UPDATE, so several workers with their own counters can never oversell,
+# and re-checks the per-user cap against the bookings table under that UPDATE's
+# lock, since the in-memory per-user counts only see this worker's bookings.
+
+class _EventSlot:
+    def __init__(self, event_id: int, available: int, starts_at: datetime, user_seats: dict):
+        self.event_id = event_id
+        self.available = available
+        self.starts_at = starts_at
+        self.user_seats = user_seats
+
+class _PendingBooking:
+    def __init__(self, slot: _EventSlot, user_id: int, seats: int, max_seats_per_user: int):
+        self.slot = slot
+        self.user_id = user_id
+        self.seats = seats
+        self.max_seats_per_user = max_seats_per_user
+        self.future = Future()
+
+class SeatInventory:
+    def __init__(
+        self,
+        stripes: Optional[int] = None,
+        flush_interval_ms: Optional[int] = None,
+        flush_batch_size: Optional[int] = None,
+    ):
+        self._locks = [threading.Lock() for _ in range(stripes or settings.SEAT_INVENTORY_STRIPES)]
+        self.flush_interval = (flush_interval_ms or settings.SEAT_INVENTORY_FLUSH_INTERVAL_MS) / 1000
+        self.flush_batch_size = flush_batch_size or settings.SEAT_INVENTORY_FLUSH_BATCH_SIZE
+
+        self._slots: dict[int, _EventSlot] = {}
+        # Events known not to be high-demand, so regular bookings skip the lookup.
+        self._regular: set[int] = set()
+
+        self._pending: list[_PendingBooking] = []
+        self._pending_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _lock_for(self, event_id: int) -> threading.Lock:
+        return self._locks[event_id % len(self._locks)]
+
+    def get_slot(self, db: Session, event_id: int) -> Optional[_EventSlot]:
+        """Return the in-memory slot for a bookable high-demand event, loading it on first use."""
+        if event_id in self._regular:
+            return None
+        slot = self._slots.get(event_id)
+        if slot is not None:
+            return slot
+
+        with self._lock_for(event_id):
+            slot = self._slots.get(event_id)
+            if slot is not None:
+                return slot
+
+            event = db.query(Event).filter(Event.id == event_id).first()
+            if event and not event.is_high_demand:
+                self._regular.add(event_id)
+            if not event or not event.is_high_demand or event.status != EventStatus.PUBLISHED:
+                # Let the regular booking path produce the usual errors.
+                return None
+
+            user_seats = dict(
+                db.query(Booking.user_id, func.sum(Booking.number_of_seats)).filter(
+                    Booking.event_id == event_id,
+                    Booking.status == BookingStatus.CONFIRMED
+                ).group_by(Booking.user_id).all()
+            )
+            slot = _EventSlot(event.id, event.available_seats, event.date, user_seats)
+            self._slots[event_id] = slot
+            return slot
+
+    def evict(self, event_id: int):
+        """Forget cached state for an event after it was edited, cancelled or re-flagged."""
+        with self._lock_for(event_id):
+            self._slots.pop(event_id, None)
+            self._regular.discard(event_id)
+
+    def release(self, event_id: int, user_id: int, seats: int):
+        """Return seats to the in-memory counter after a committed cancellation."""
+        slot = self._slots.get(event_id)
+        if slot is not None:
+            self._release_slot(slot, user_id, seats)
+
+    def _release_slot(self, slot: _EventSlot, user_id: int, seats: int):
+        with self._lock_for(slot.event_id):
+            if self._slots.get(slot.event_id) is not slot:
+                return
+            slot.available += seats
+            slot.user_seats[user_id] = max(slot.user_seats.get(user_id, 0) - seats, 0)
+
+    def _admit(self, slot: _EventSlot, user_id: int, seats: int, max_seats_per_user: int):
+        with self._lock_for(slot.event_id):
+            if slot.starts_at < datetime.utcnow():
+                raise HTTPException(status_code=400, detail="This event has already ended and cannot be booked")
+
+            already = slot.user_seats.get(user_id, 0)
+            if already + seats > max_seats_per_user:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"You can only book a maximum of {max_seats_per_user} seats for this event. You already have {already}."
+                )
+            if slot.available < seats:
+                raise HTTPException(status_code=400, detail="Not enough seats available")
+
+            slot.available -= seats
+            slot.user_seats[user_id] = already + seats
+
+    def book(self, db: Session, slot: _EventSlot, user_id: int, seats: int, max_seats_per_user: int) -> Booking:
+        """Admit a booking in memory and wait for the flush that persists it."""
+        self._admit(slot, user_id, seats, max_seats_per_user)
+        self.start()
+
+        pending = _PendingBooking(slot, user_id, seats, max_seats_per_user)
+        with self._pending_lock:
+            self._pending.append(pending)
+            queued = len(self._pending)
+        if queued >= self.flush_batch_size:
+            self._wakeup.set()
+
+        # get_slot's reads opened a transaction on the request session; under
+        # REPEATABLE READ its snapshot predates the flush and would not see the
+        # booking it commits. End it before waiting.
+        db.rollback()
+        try:
+            booking_id = pending.future.result(timeout=settings.SEAT_INVENTORY_BOOK_TIMEOUT_SECONDS)
+        except FutureTimeoutError:
+            # Never picked up by a flush: withdraw it so it can't be booked behind the user's back
+            with self._pending_lock:
+                withdrawn = pending in self._pending
+                if withdrawn:
+                    self._pending.remove(pending)
+            if withdrawn:
+                self._release_slot(slot, user_id, seats)
+                raise HTTPException(status_code=503, detail="Bookings are backed up, please try again")
+            raise HTTPException(status_code=503, detail="Your booking is still being processed; check your bookings before retrying")
+        return db.get(Booking, booking_id)
+
+    def flush(self) -> int:
+        """Persist queued bookings, one transaction per event. Returns the number persisted."""
+        with self._pending_lock:
+            batch, self._pending = self._pending, []
+        if not batch:
+            return 0
+
+        by_event: dict[int, list[_PendingBooking]] = {}
+        for pending in batch:
+            by_event.setdefault(pending.slot.event_id, []).append(pending)
+        return sum(self._flush_event(event_id, items) for event_id, items in by_event.items())
+
+    def _flush_event(self, event_id: int, items: list[_PendingBooking]) -> int:
+        over_cap: dict[_PendingBooking, int] = {}
+        rejected: list[_PendingBooking] = []
+        db = SessionLocal()
+        try:
+            total = sum(p.seats for p in items)
+            if self._claim(db, event_id, total):
+                claimed_items = items
+            else:
+                # The database disagrees with our counter (another worker or an
+                # organizer edit). Fall back to claiming booking by booking.
+                claimed_items = [p for p in items if self._claim(db, event_id, p.seats)]
+                rejected = [p for p in items if p not in claimed_items]
+
+            # The claim holds the event row's lock, so these sums include every
+            # worker's committed bookings, not just the ones this worker admitted.
+            over_cap = self._over_cap(db, event_id, claimed_items)
+            if over_cap:
+                returned = sum(p.seats for p in over_cap)
+                db.query(Event).filter(Event.id == event_id).update(
+                    {Event.available_seats: Event.available_seats + returned}, synchronize_session=False
+                )
+                OrganizerStatsService.record_seats(db, event_id, -returned)
+                claimed_items = [p for p in claimed_items if p not in over_cap]
+
+            accepted = []
+            for pending in claimed_items:
+                booking = Booking(
+                    user_id=pending.user_id,
+                    event_id=event_id,
+                    status=BookingStatus.CONFIRMED,
+                    number_of_seats=pending.seats
+                )
+                db.add(booking)
+                accepted.append((pending, booking))
+
+            db.flush()
+            booking_ids = [booking.id for _, booking in accepted]
+            OutboxService.add_many(db, BOOKING_CONFIRMED, (
+                {"booking_id": booking.id, "event_id": booking.event_id, "user_id": booking.user_id, "seats": booking.number_of_seats}
+                for _, booking in accepted
+            ))
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Seat inventory flush failed for event {event_id}: {e}")
+            for pending in items:
+                self._release_slot(pending.slot, pending.user_id, pending.seats)
+                pending.future.set_exception(HTTPException(status_code=500, detail=str(e)))
+            return 0
+        finally:
+            db.close()
+
+        if accepted:
+            response_cache.invalidate_event(event_id)
+        for (pending, _), booking_id in zip(accepted, booking_ids):
+            pending.future.set_result(booking_id)
+        if rejected or over_cap:
+            # Our counters were wrong; reload them from the database
+            self.evict(event_id)
+        for pending in rejected:
+            pending.future.set_exception(HTTPException(status_code=400, detail="Not enough seats available"))
+        for pending, already in over_cap.items():
+            pending.future.set_exception(HTTPException(
+                status_code=400,
+                detail=f"You can only book a maximum of {pending.max_seats_per_user} seats for this event. You already have {already}."
+            ))
+        return len(accepted)
+
+    @staticmethod
+    def _over_cap(db: Session, event_id: int, items: list[_PendingBooking]) -> dict:
+        """Pending bookings that would take their user over the cap, with the seats that user already has."""
+        users = {p.user_id for p in items}
+        if not users:
+            return {}
+        held = dict(db.query(Booking.user_id, func.sum(Booking.number_of_seats)).filter(
+            Booking.event_id == event_id,
+            Booking.status == BookingStatus.CONFIRMED,
+            Booking.user_id.in_(users)
+        ).group_by(Booking.user_id).all())
+        for user_id, seats in db.query(WaitlistEntry.user_id, func.sum(WaitlistEntry.number_of_seats)).filter(
+            WaitlistEntry.event_id == event_id,
+            WaitlistEntry.status.in_((WaitlistStatus.WAITING, WaitlistStatus.OFFERED)),
+            WaitlistEntry.user_id.in_(users)
+        ).group_by(WaitlistEntry.user_id):
+            held[user_id] = held.get(user_id, 0) + seats
+        over = {}
+        for pending in items:
+            already = held.get(pending.user_id, 0)
+            if already + pending.seats > pending.max_seats_per_user:
+                over[pending] = already
+            else:
+                held[pending.user_id] = already + pending.seats
+        return over
+
+    @staticmethod
+    def _claim(db: Session, event_id: int, seats: int) -> bool:
+        claimed = bool(db.query(Event).filter(
+            Event.id == event_id,
+            Event.status == EventStatus.PUBLISHED,
+            Event.available_seats >= seats
+        ).update(
+            {Event.available_seats: Event.available_seats - seats},
+            synchronize_session=False
+        ))
+        if claimed:
+            OrganizerStatsService.record_seats(db, event_id, seats)
+        return claimed
+
+    @staticmethod
+    def reconcile(db: Session) -> int:
+        """
+        Recompute available_seats for high-demand events from the bookings table
+        and the seats held for waitlist offers. Run on startup so a crash between
+        admission and flush can't leave the counters out of step with the bookings
+        that were actually persisted.
+        """
+        booked = select(func.coalesce(func.sum(Booking.number_of_seats), 0)).where(
+            Booking.event_id == Event.id,
+            Booking.status == BookingStatus.CONFIRMED
+        ).scalar_subquery()
+        held = select(func.coalesce(func.sum(WaitlistEntry.number_of_seats), 0)).where(
+            WaitlistEntry.event_id == Event.id,
+            WaitlistEntry.status == WaitlistStatus.OFFERED
+        ).scalar_subquery()
+        updated = db.query(Event).filter(Event.is_high_demand == True).update(
+            {Event.available_seats: Event.total_seats - booked - held},
+            synchronize_session=False
+        )
+        db.commit()
+        return updated
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Seat inventory flush loop error: {e}")
+        self.flush()
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._pending_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="seat-inventory-flusher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._wakeup.set()
+        self._thread.join()
+        self._thread = None
+
+seat_inventory = SeatInventory()
@@ -0,0 +1,163 @@
+import json
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from core.cache import TTLCache
+from core.config import settings
+from models.booking import Booking
+from models.event import Event
+from models.user import User
+from services.keyword_index import KeywordIndex
+
+# Limit to last 50 bookings for efficiency & recency relevance
+RECENT_BOOKINGS = 50
+TOP_TYPES = 3
+TOP_KEYWORDS = 20
+
+class UserProfile:
+    """
+    Materialized interest profile for recommendations: explicit interests plus
+    the event types and keywords of the user's most recent bookings.
+    """
+
+    def __init__(self, user_id: int, interests: set[str], recent: list[tuple]):
+        self.user_id = user_id
+        self.interests = interests
+        # Newest first: (event_id, event_type, title_words, description_words)
+        self.recent = recent
+        self.built_at = datetime.utcnow()
+        self._lock = threading.Lock()
+        self._recompute()
+
+    def _recompute(self):
+        type_counter = Counter()
+        keyword_counter = Counter()
+        for _, event_type, title_words, desc_words in self.recent:
+            # Weight event type heavily
+            type_counter[event_type] += 1
+            # Give title words more weight than description (add them twice)
+            keyword_counter.update(title_words)
+            keyword_counter.update(title_words)
+            keyword_counter.update(desc_words)
+
+        # Top 3 favorite categories + Top 20 keywords keeps the set small
+        # even if the user has 1000 bookings
+        self.top_types = dict(type_counter.most_common(TOP_TYPES))
+        self.top_keywords = dict(keyword_counter.most_common(TOP_KEYWORDS))
+        self.keywords = set(self.interests) | set(self.top_types) | set(self.top_keywords)
+        self.booked_event_ids = {event_id for event_id, _, _, _ in self.recent}
+
+    def add_booking(self, event: Event):
+        """Slide the recent-bookings window forward by one booking."""
+        with self._lock:
+            self.recent = [UserProfileService._entry_for(event.id, event.event_type, event.title, event.description)]\
+                + self.recent[:RECENT_BOOKINGS - 1]
+            self._recompute()
+
+    def to_dict(self) -> dict:
+        return {
+            "user_id": self.user_id,
+            "interests": sorted(self.interests),
+            "top_types": self.top_types,
+            "top_keywords": self.top_keywords,
+            "recent_event_ids": [event_id for event_id, _, _, _ in self.recent],
+            "built_at": self.built_at,
+        }
+
+_profile_cache = TTLCache(
+    maxsize=settings.USER_PROFILE_CACHE_SIZE,
+    ttl_seconds=settings.USER_PROFILE_CACHE_TTL_SECONDS,
+)
+
+class UserProfileService:
+    @staticmethod
+    def _entry_for(event_id, event_type, title, description) -> tuple:
+        return (
+            event_id,
+            event_type.value.lower(),
+            frozenset(KeywordIndex.tokenize(title)),
+            frozenset(KeywordIndex.tokenize(description)),
+        )
+
+    @staticmethod
+    def _parse_interests(raw: Optional[str]) -> set[str]:
+        interests = set()
+        if raw:
+            try:
+                interests_list = json.loads(raw)
+                if isinstance(interests_list, list):
+                    for interest in interests_list:
+                        interests.add(KeywordIndex.normalize(interest))
+            except:
+                pass
+        return interests
+
+    @staticmethod
+    def build_profile(db: Session, user_id: int) -> Optional[UserProfile]:
+        user = db.query(User).filter(User.id == user_id).first()
+        if not user:
+            return None
+
+        # One joined query instead of a lazy `booking.event` load per booking
+        recent = db.query(Booking.event_id, Event.event_type, Event.title, Event.description)\
+                   .join(Event, Event.id == Booking.event_id)\
+                   .filter(Booking.user_id == user_id)\
+                   .order_by(Booking.id.desc())\
+                   .limit(RECENT_BOOKINGS).all()
+
+        return UserProfile(
+            user_id,
+            UserProfileService._parse_interests(user.interests),
+            [UserProfileService._entry_for(*row) for row in recent],
+        )
+
+    @staticmethod
+    def build_profiles(db: Session, user_ids: list[int]) -> list[UserProfile]:
+        """Build profiles for many users with two queries, for batch jobs."""
+        users = db.query(User.id, User.interests).filter(User.id.in_(user_ids)).all()
+
+        # Rank each user's bookings newest first and keep the most recent ones
+        position = func.row_number().over(partition_by=Booking.user_id, order_by=Booking.id.desc()).label("position")
+        ranked = db.query(
+            Booking.user_id, Booking.event_id, Event.event_type, Event.title, Event.description, position
+        ).join(Event, Event.id == Booking.event_id).filter(Booking.user_id.in_(user_ids)).subquery()
+        rows = db.query(ranked).filter(ranked.c.position <= RECENT_BOOKINGS)\
+                 .order_by(ranked.c.user_id, ranked.c.position).all()
+
+        recent_by_user: dict[int, list[tuple]] = {}
+        for row in rows:
+            recent_by_user.setdefault(row.user_id, []).append(
+                UserProfileService._entry_for(row.event_id, row.event_type, row.title, row.description)
+            )
+
+        return [
+            UserProfile(user_id, UserProfileService._parse_interests(interests), recent_by_user.get(user_id, []))
+            for user_id, interests in users
+        ]
+
+    @staticmethod
+    def get_profile(db: Session, user_id: int) -> Optional[UserProfile]:
+        profile = _profile_cache.get(user_id)
+        if profile is None:
+            profile = UserProfileService.build_profile(db, user_id)
+            if profile is not None:
+                _profile_cache.set(user_id, profile)
+        return profile
+
+    @staticmethod
+    def record_booking(user_id: int, event: Event):
+        """Fold a committed booking into the cached profile, if there is one."""
+        profile = _profile_cache.get(user_id)
+        if profile is not None:
+            profile.add_booking(event)
+
+    @staticmethod
+    def invalidate(user_id: int):
+        _profile_cache.invalidate(user_id)
+
+    @staticmethod
+    def cache_stats() -> dict:
+        return _profile_cache.stats()
@@ -0,0 +1,27 @@
+import logging
+from typing import Optional
+from core.config import settings
+from core.database import SessionLocal
+from core.periodic_task import PeriodicTask
+from services.waitlist_service import WaitlistService
+
+logger = logging.getLogger(__name__)
+
+# Why: A hold nobody claims must not keep its seats off sale. The sweep hands
+# expired holds to the next people in line. Every app process may run one: each
+# event is re-checked under its row lock, so two sweeps never expire a hold twice.
+class WaitlistScheduler:
+    def __init__(self, interval_seconds: Optional[float] = None):
+        self.interval_seconds = interval_seconds or settings.WAITLIST_SWEEP_INTERVAL_SECONDS
+        self.task = PeriodicTask("Waitlist sweep", self.run_once, self.interval_seconds)
+
+    def run_once(self) -> int:
+        db = SessionLocal()
+        try:
+            expired = WaitlistService.expire_holds(db)
+            if expired:
+                logger.info(f"Expired {expired} waitlist hold(s)")
+            return expired
+        finally:
+            db.close()
+
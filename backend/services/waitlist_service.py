@@ -0,0 +1,334 @@
+from datetime import datetime, timedelta
+from typing import Optional
+from fastapi import HTTPException
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, aliased
+from core.config import settings
+from core.response_cache import response_cache
+from models.booking import Booking, BookingStatus
+from models.event import Event, EventStatus
+from models.waitlist import WaitlistEntry, WaitlistStatus
+from schemas.waitlist import WaitlistJoin
+from services.organizer_stats_service import OrganizerStatsService
+from services.outbox_service import BOOKING_CONFIRMED, WAITLIST_OFFERED, OutboxService
+from services.seat_inventory import seat_inventory
+from services.user_profile_service import UserProfileService
+
+ACTIVE = (WaitlistStatus.WAITING, WaitlistStatus.OFFERED)
+
+# Why: Freed seats go to the queue, not to whoever retries the booking endpoint
+# fastest. allocate() runs in the transaction that frees them, after locking the
+# event row, so concurrent cancellations for one event allocate one at a time
+# and a seat can only be offered once. Offered seats stay out of available_seats
+# (and count as sold) while held. Lock order is always event row, then waitlist
+# entries, so cancellations, claims and the expiry sweep can't deadlock.
+
+class WaitlistService:
+    @staticmethod
+    def _lock_event(db: Session, event_id: int):
+        return db.query(Event.id, Event.status, Event.date, Event.available_seats)\
+                 .filter(Event.id == event_id).with_for_update().first()
+
+    @staticmethod
+    def allocate(db: Session, event_id: int, now: Optional[datetime] = None) -> list[int]:
+        """
+        Offer the event's free seats to its waitlist, first come first served, in
+        the caller's transaction. Returns the ids of the entries offered seats.
+        The caller commits and evicts the event from the seat inventory.
+        """
+        now = now or datetime.utcnow()
+        event = WaitlistService._lock_event(db, event_id)
+        if not event or event.status != EventStatus.PUBLISHED or event.date < now or event.available_seats <= 0:
+            return []
+
+        waiting = db.query(WaitlistEntry.id, WaitlistEntry.user_id, WaitlistEntry.number_of_seats).filter(
+            WaitlistEntry.event_id == event_id,
+            WaitlistEntry.status == WaitlistStatus.WAITING
+        ).order_by(WaitlistEntry.id).limit(settings.WAITLIST_ALLOCATION_SCAN).with_for_update().all()
+        available, offers = event.available_seats, []
+        for entry in waiting:
+            # An entry that doesn't fit keeps its place; smaller requests behind it may
+            if entry.number_of_seats <= available:
+                offers.append(entry)
+                available -= entry.number_of_seats
+                if not available:
+                    break
+        if not offers:
+            return []
+
+        taken = event.available_seats - available
+        hold_expires_at = now + timedelta(seconds=settings.WAITLIST_HOLD_SECONDS)
+        db.query(Event).filter(Event.id == event_id).update(
+            {Event.available_seats: Event.available_seats - taken}, synchronize_session=False
+        )
+        db.query(WaitlistEntry).filter(
+            WaitlistEntry.id.in_([entry.id for entry in offers]),
+            WaitlistEntry.status == WaitlistStatus.WAITING
+        ).update({
+            WaitlistEntry.status: WaitlistStatus.OFFERED,
+            WaitlistEntry.offered_at: now,
+            WaitlistEntry.hold_expires_at: hold_expires_at,
+        }, synchronize_session=False)
+        OrganizerStatsService.record_seats(db, event_id, taken)
+        OutboxService.add_many(db, WAITLIST_OFFERED, (
+            {"entry_id": entry.id, "event_id": event_id, "user_id": entry.user_id,
+             "seats": entry.number_of_seats, "hold_expires_at": hold_expires_at.isoformat()}
+            for entry in offers
+        ))
+        return [entry.id for entry in offers]
+
+    @staticmethod
+    def _booked_seats(db: Session, user_id: int, event_id: int) -> int:
+        return db.query(func.coalesce(func.sum(Booking.number_of_seats), 0)).filter(
+            Booking.user_id == user_id,
+            Booking.event_id == event_id,
+            Booking.status == BookingStatus.CONFIRMED
+        ).scalar()
+
+    @staticmethod
+    def waitlisted_seats(db: Session, user_id: int, event_id: int) -> int:
+        """Seats a user is waiting for or has on hold for an event; they count toward the per-user cap."""
+        return db.query(func.coalesce(func.sum(WaitlistEntry.number_of_seats), 0)).filter(
+            WaitlistEntry.user_id == user_id,
+            WaitlistEntry.event_id == event_id,
+            WaitlistEntry.status.in_(ACTIVE)
+        ).scalar()
+
+    @staticmethod
+    def _transition(db: Session, entry_id: int, status: WaitlistStatus, values: dict, *guards) -> bool:
+        # Guard on the current status, so a hold is claimed, declined or expired only once
+        return bool(db.query(WaitlistEntry).filter(
+            WaitlistEntry.id == entry_id, WaitlistEntry.status == status, *guards
+        ).update(values, synchronize_session=False))
+
+    @staticmethod
+    def _release_hold(db: Session, event_id: int, seats: int):
+        """Put held seats back and offer them on. The caller holds the event lock and commits."""
+        db.query(Event).filter(Event.id == event_id).update(
+            {Event.available_seats: Event.available_seats + seats}, synchronize_session=False
+        )
+        OrganizerStatsService.record_seats(db, event_id, -seats)
+        WaitlistService.allocate(db, event_id)
+
+    @staticmethod
+    def _finish(db: Session, event_id: int):
+        db.commit()
+        seat_inventory.evict(event_id)
+        response_cache.invalidate_event(event_id)
+
+    @staticmethod
+    def join(db: Session, waitlist_in: WaitlistJoin, user_id: int) -> WaitlistEntry:
+        now = datetime.utcnow()
+        try:
+            event = WaitlistService._lock_event(db, waitlist_in.event_id)
+            if not event:
+                raise HTTPException(status_code=404, detail="Event not found")
+            if event.status != EventStatus.PUBLISHED or event.date < now:
+                raise HTTPException(status_code=400, detail="Event is not published or has already ended")
+
+            booked = WaitlistService._booked_seats(db, user_id, waitlist_in.event_id)
+            if booked + waitlist_in.number_of_seats > settings.MAX_SEATS_PER_USER:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"You can only book a maximum of {settings.MAX_SEATS_PER_USER} seats for this event. You already have {booked}."
+                )
+            active = db.query(WaitlistEntry.id).filter(
+                WaitlistEntry.event_id == waitlist_in.event_id,
+                WaitlistEntry.user_id == user_id,
+                WaitlistEntry.status.in_(ACTIVE)
+            ).first()
+            if active:
+                raise HTTPException(status_code=400, detail="You are already on the waitlist for this event")
+
+            queued = db.query(WaitlistEntry.id).filter(
+                WaitlistEntry.event_id == waitlist_in.event_id,
+                WaitlistEntry.status == WaitlistStatus.WAITING
+            ).first()
+            if not queued and event.available_seats >= waitlist_in.number_of_seats:
+                raise HTTPException(status_code=400, detail="Seats are available, book them directly")
+
+            entry = WaitlistEntry(
+                event_id=waitlist_in.event_id,
+                user_id=user_id,
+                number_of_seats=waitlist_in.number_of_seats,
+                created_at=now
+            )
+            db.add(entry)
+            db.flush()
+            # Free seats the queue ahead couldn't use may fit this request
+            offered = WaitlistService.allocate(db, waitlist_in.event_id, now)
+            db.commit()
+        except HTTPException:
+            db.rollback()
+            raise
+        if offered:
+            seat_inventory.evict(waitlist_in.event_id)
+            response_cache.invalidate_event(waitlist_in.event_id)
+        db.refresh(entry)
+        entry.position = WaitlistService.position(db, entry)
+        return entry
+
+    @staticmethod
+    def position(db: Session, entry: WaitlistEntry) -> Optional[int]:
+        if entry.status != WaitlistStatus.WAITING:
+            return None
+        return db.query(func.count(WaitlistEntry.id)).filter(
+            WaitlistEntry.event_id == entry.event_id,
+            WaitlistEntry.status == WaitlistStatus.WAITING,
+            WaitlistEntry.id <= entry.id
+        ).scalar()
+
+    @staticmethod
+    def get_user_entries(db: Session, user_id: int, include_inactive: bool = False) -> list[WaitlistEntry]:
+        # Queue positions in the same query, not one count per entry
+        ahead = aliased(WaitlistEntry)
+        position = select(func.count(ahead.id)).where(
+            ahead.event_id == WaitlistEntry.event_id,
+            ahead.status == WaitlistStatus.WAITING,
+            ahead.id <= WaitlistEntry.id
+        ).correlate(WaitlistEntry).scalar_subquery()
+        query = db.query(WaitlistEntry, position).filter(WaitlistEntry.user_id == user_id)
+        if not include_inactive:
+            query = query.filter(WaitlistEntry.status.in_(ACTIVE))
+        entries = []
+        for entry, place in query.order_by(WaitlistEntry.id.desc()):
+            entry.position = place if entry.status == WaitlistStatus.WAITING else None
+            entries.append(entry)
+        return entries
+
+    @staticmethod
+    def _get_own_entry(db: Session, entry_id: int, user_id: int) -> WaitlistEntry:
+        entry = db.query(WaitlistEntry).filter(WaitlistEntry.id == entry_id).first()
+        if not entry:
+            raise HTTPException(status_code=404, detail="Waitlist entry not found")
+        if entry.user_id != user_id:
+            raise HTTPException(status_code=403, detail="Not authorized")
+        return entry
+
+    @staticmethod
+    def claim(db: Session, entry_id: int, user_id: int) -> Booking:
+        """Turn the seats held for an entry into a confirmed booking."""
+        now = datetime.utcnow()
+        try:
+            entry = WaitlistService._get_own_entry(db, entry_id, user_id)
+            event = WaitlistService._lock_event(db, entry.event_id)
+            if event.status != EventStatus.PUBLISHED or event.date < now:
+                raise HTTPException(status_code=400, detail="Event is not published or has already ended")
+            claimed = WaitlistService._transition(
+                db, entry_id, WaitlistStatus.OFFERED, {WaitlistEntry.status: WaitlistStatus.CLAIMED},
+                WaitlistEntry.hold_expires_at >= now
+            )
+            if not claimed:
+                db.refresh(entry)
+                if entry.status == WaitlistStatus.OFFERED:
+                    raise HTTPException(status_code=400, detail="The hold on these seats has expired")
+                raise HTTPException(status_code=400, detail="No seats are being held for this waitlist entry")
+            # Seats booked directly since joining count too; checked under the event lock
+            booked = WaitlistService._booked_seats(db, user_id, entry.event_id)
+            if booked + entry.number_of_seats > settings.MAX_SEATS_PER_USER:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"You can only book a maximum of {settings.MAX_SEATS_PER_USER} seats for this event. You already have {booked}."
+                )
+
+            # The seats already left available_seats when they were offered
+            booking = Booking(
+                user_id=user_id,
+                event_id=entry.event_id,
+                status=BookingStatus.CONFIRMED,
+                number_of_seats=entry.number_of_seats
+            )
+            db.add(booking)
+            db.flush()
+            db.query(WaitlistEntry).filter(WaitlistEntry.id == entry_id).update(
+                {WaitlistEntry.booking_id: booking.id}, synchronize_session=False
+            )
+            OutboxService.add(db, BOOKING_CONFIRMED, {
+                "booking_id": booking.id, "event_id": booking.event_id, "user_id": user_id, "seats": booking.number_of_seats,
+            })
+            db.commit()
+        except HTTPException:
+            db.rollback()
+            raise
+        # The inventory's per-user seat count for this event is now stale
+        seat_inventory.evict(booking.event_id)
+        db.refresh(booking)
+        UserProfileService.record_booking(user_id, booking.event)
+        return booking
+
+    @staticmethod
+    def leave(db: Session, entry_id: int, user_id: int) -> WaitlistEntry:
+        """Leave the queue, or decline held seats so they go to the next in line."""
+        try:
+            entry = WaitlistService._get_own_entry(db, entry_id, user_id)
+            WaitlistService._lock_event(db, entry.event_id)
+            held = entry.status == WaitlistStatus.OFFERED
+            left = entry.status in ACTIVE and WaitlistService._transition(
+                db, entry_id, entry.status, {WaitlistEntry.status: WaitlistStatus.LEFT, WaitlistEntry.hold_expires_at: None}
+            )
+            if not left:
+                raise HTTPException(status_code=400, detail="This waitlist entry is no longer active")
+            if held:
+                WaitlistService._release_hold(db, entry.event_id, entry.number_of_seats)
+        except HTTPException:
+            db.rollback()
+            raise
+        if held:
+            WaitlistService._finish(db, entry.event_id)
+        else:
+            db.commit()
+        db.refresh(entry)
+        return entry
+
+    @staticmethod
+    def expire_holds(db: Session, now: Optional[datetime] = None, limit: int = 500) -> int:
+        """Pass unclaimed holds on to the next in line, one short transaction per event. Returns holds expired."""
+        now = now or datetime.utcnow()
+        due = db.query(WaitlistEntry.event_id).filter(
+            WaitlistEntry.status == WaitlistStatus.OFFERED,
+            WaitlistEntry.hold_expires_at < now
+        ).order_by(WaitlistEntry.hold_expires_at).limit(limit).all()
+        db.rollback()
+        expired = 0
+        for event_id in dict.fromkeys(event_id for (event_id,) in due):
+            WaitlistService._lock_event(db, event_id)
+            # Re-read under the lock: some of these may have been claimed meanwhile
+            entries = db.query(WaitlistEntry.id, WaitlistEntry.number_of_seats).filter(
+                WaitlistEntry.event_id == event_id,
+                WaitlistEntry.status == WaitlistStatus.OFFERED,
+                WaitlistEntry.hold_expires_at < now
+            ).with_for_update().all()
+            released = [seats for entry_id, seats in entries if WaitlistService._transition(
+                db, entry_id, WaitlistStatus.OFFERED, {WaitlistEntry.status: WaitlistStatus.EXPIRED},
+                WaitlistEntry.hold_expires_at < now
+            )]
+            if not released:
+                db.rollback()
+                continue
+            WaitlistService._release_hold(db, event_id, sum(released))
+            WaitlistService._finish(db, event_id)
+            expired += len(released)
+        return expired
+
+    @staticmethod
+    def cancel_for_event(db: Session, event_id: int) -> int:
+        """
+        Close an event's queue when it is cancelled, in the caller's transaction.
+        Seats held for open offers go back to available_seats, as they would on expiry.
+        """
+        WaitlistService._lock_event(db, event_id)
+        held = db.query(func.coalesce(func.sum(WaitlistEntry.number_of_seats), 0)).filter(
+            WaitlistEntry.event_id == event_id,
+            WaitlistEntry.status == WaitlistStatus.OFFERED
+        ).scalar()
+        closed = db.query(WaitlistEntry).filter(
+            WaitlistEntry.event_id == event_id,
+            WaitlistEntry.status.in_(ACTIVE)
+        ).update({WaitlistEntry.status: WaitlistStatus.CANCELLED, WaitlistEntry.hold_expires_at: None},
+                 synchronize_session=False)
+        if held:
+            db.query(Event).filter(Event.id == event_id).update(
+                {Event.available_seats: Event.available_seats + held}, synchronize_session=False
+            )
+            OrganizerStatsService.record_seats(db, event_id, -held)
+        return closed
@@ -0,0 +1,93 @@
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+# Settings are read at import time, so point them at a throwaway SQLite database first
+_DB_DIR = tempfile.mkdtemp(prefix="event-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_DB_DIR}/test.db"
+os.environ.setdefault("SECRET_KEY", "test-secret")
+# The N+1 tests read the per-request SELECT count
+os.environ["QUERY_COUNT_HEADER_ENABLED"] = "true"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from sqlalchemy import select
+from core.database import Base, SessionLocal, async_engine, engine
+from core.migrations import upgrade_database
+from core.response_cache import response_cache
+from models.event import Event, EventStatus
+from models.user import User, UserRole
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    upgrade_database()
+    yield
+    asyncio.run(async_engine.dispose())
+    engine.dispose()
+    shutil.rmtree(_DB_DIR, ignore_errors=True)
+
+@pytest.fixture(autouse=True)
+def clean_tables(database):
+    yield
+    with engine.begin() as conn:
+        # Ids are reused once the tables are emptied, so cached responses must go too
+        for (event_id,) in conn.execute(select(Event.id)):
+            response_cache.invalidate_event(event_id)
+        for table in reversed(Base.metadata.sorted_tables):
+            conn.execute(table.delete())
+    response_cache.invalidate_lists()
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    yield session
+    session.close()
+
+@pytest.fixture
+def make_user(db):
+    count = iter(range(1, 1_000_000))
+
+    def make(role: UserRole = UserRole.ATTENDEE) -> User:
+        user = User(email=f"user{next(count)}@example.com", hashed_password="x", full_name="Test", role=role)
+        db.add(user)
+        db.commit()
+        return user
+    return make
+
+@pytest.fixture
+def make_event(db, make_user):
+    def make(total_seats: int = 20, **values) -> Event:
+        values.setdefault("organizer_id", make_user(UserRole.ORGANIZER).id)
+        event = Event(
+            title=values.pop("title", "Test event"),
+            date=values.pop("date", datetime.utcnow() + timedelta(days=1)),
+            location=values.pop("location", "Hall"),
+            total_seats=total_seats,
+            available_seats=values.pop("available_seats", total_seats),
+            price=values.pop("price", 10.0),
+            status=values.pop("status", EventStatus.PUBLISHED),
+            **values
+        )
+        db.add(event)
+        db.commit()
+        return event
+    return make
+
+@pytest.fixture
+def client():
+    from fastapi.testclient import TestClient
+    from main import app
+    # Not entered as a context manager, so the lifespan's background jobs stay off
+    return TestClient(app)
+
+@pytest.fixture
+def auth_headers():
+    from core.security import create_access_token
+
+    def headers(user: User) -> dict:
+        token = create_access_token(user.email, claims={"role": user.role.value, "uid": user.id, "active": user.is_active})
+        return {"Authorization": f"Bearer {token}"}
+    return headers
@@ -0,0 +1,84 @@
+import csv
+import io
+import json
+import tracemalloc
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import insert
+from models.booking import Booking, BookingStatus
+from models.user import User, UserRole
+from services.event_transfer_service import ATTENDEE_COLUMNS, EventTransferService
+
+BOOKINGS = 8000
+
+def export_peak(event_id: int, batch_size: int) -> tuple[int, int]:
+    """(chunks streamed, peak traced memory) for one export, consumed chunk by chunk."""
+    def export():
+        return EventTransferService.attendees(event_id, "csv", include_cancelled=True, batch_size=batch_size)
+    # Warm the compiled-statement cache so only the export itself is measured
+    for _ in export():
+        pass
+    tracemalloc.start()
+    try:
+        chunks = sum(1 for _ in export())
+        return chunks, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+@pytest.fixture
+def organizer(make_user):
+    return make_user(UserRole.ORGANIZER)
+
+@pytest.fixture
+def manifest(db, organizer, make_event):
+    """An event with BOOKINGS bookings from 50 attendees; every fifth booking is cancelled."""
+    event = make_event(organizer_id=organizer.id, total_seats=BOOKINGS * 2)
+    db.execute(insert(User), [
+        {"email": f"guest{i}@example.com", "full_name": f"Guest {i}", "hashed_password": "x", "role": UserRole.ATTENDEE}
+        for i in range(50)
+    ])
+    user_ids = [u.id for u in db.query(User.id).filter(User.email.like("guest%")).order_by(User.id)]
+    created = datetime(2026, 3, 1)
+    db.execute(insert(Booking), [
+        {
+            "user_id": user_ids[i % len(user_ids)], "event_id": event.id, "number_of_seats": 1 + i % 3,
+            "status": BookingStatus.CANCELLED_BY_USER if i % 5 == 0 else BookingStatus.CONFIRMED,
+            "created_at": created + timedelta(seconds=i),
+        }
+        for i in range(BOOKINGS)
+    ])
+    db.commit()
+    return event
+
+@pytest.mark.parametrize("include_cancelled", [False, True])
+def test_attendee_export_lists_every_booking_once(client, auth_headers, organizer, manifest, include_cancelled):
+    params = {"include_cancelled": str(include_cancelled).lower()}
+    csv_response = client.get(f"/api/events/{manifest.id}/attendees", params=params, headers=auth_headers(organizer))
+    assert csv_response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(csv_response.text)))
+    assert tuple(rows[0]) == ATTENDEE_COLUMNS
+
+    expected = BOOKINGS if include_cancelled else BOOKINGS - BOOKINGS // 5
+    booking_ids = [int(row["booking_id"]) for row in rows]
+    assert len(booking_ids) == expected
+    assert booking_ids == sorted(set(booking_ids))
+    assert include_cancelled or all(row["status"] == BookingStatus.CONFIRMED.value for row in rows)
+
+    ndjson_response = client.get(
+        f"/api/events/{manifest.id}/attendees", params={**params, "format": "ndjson"}, headers=auth_headers(organizer)
+    )
+    records = [json.loads(line) for line in ndjson_response.text.splitlines()]
+    assert [r["booking_id"] for r in records] == booking_ids
+    assert records[0]["email"] == rows[0]["email"]
+
+def test_attendee_export_is_only_for_the_events_organizer(client, auth_headers, make_user, manifest):
+    other = make_user(UserRole.ORGANIZER)
+    assert client.get(f"/api/events/{manifest.id}/attendees", headers=auth_headers(other)).status_code == 404
+
+def test_attendee_export_memory_is_bounded_by_the_batch(manifest):
+    chunks, peak = export_peak(manifest.id, batch_size=200)
+    # One chunk per batch (the header rides on the first)
+    assert chunks == BOOKINGS // 200
+    # Holding the whole manifest at once costs an order of magnitude more
+    _, whole = export_peak(manifest.id, batch_size=BOOKINGS)
+    assert peak * 10 < whole
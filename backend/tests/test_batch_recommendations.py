@@ -0,0 +1,41 @@
+from datetime import datetime, timedelta
+from core.config import settings
+from models.recommendation import Recommendation, RecommendationRun, RecommendationRunStatus
+from models.user import UserRole
+from services.batch_recommendation_service import BatchRecommendationService
+from services.keyword_index import KeywordIndex
+
+def test_queued_run_is_shared_until_it_finishes(db, make_user, make_event, monkeypatch):
+    monkeypatch.setattr(settings, "BATCH_RECOMMENDATION_WORKERS", 1)
+    organizer = make_user(UserRole.ORGANIZER)
+    for title in ("jazz night", "rock night"):
+        KeywordIndex.index_event(db, make_event(title=title))
+    db.commit()
+    users = [make_user() for _ in range(3)]
+
+    queued = BatchRecommendationService.enqueue(db, organizer.id)
+    assert queued["status"] == "PENDING"
+    # Asking again while it is queued hands back the same run instead of starting another
+    assert BatchRecommendationService.enqueue(db, organizer.id)["run_id"] == queued["run_id"]
+
+    assert BatchRecommendationService.run_pending(db) == queued["run_id"]
+    assert BatchRecommendationService.run_pending(db) is None
+    done = BatchRecommendationService.get_run_status(db, queued["run_id"])
+    assert done["status"] == "COMPLETED" and done["events"] == 2
+    assert done["users"] == len(users) + 3  # attendees plus the three organizers
+    assert db.query(Recommendation).filter(Recommendation.user_id == users[0].id).count() == 2
+
+    assert BatchRecommendationService.enqueue(db, organizer.id)["run_id"] != queued["run_id"]
+
+def test_abandoned_run_stops_blocking_new_ones(db, make_user):
+    organizer = make_user(UserRole.ORGANIZER)
+    stuck = RecommendationRun(
+        status=RecommendationRunStatus.RUNNING,
+        started_at=datetime.utcnow() - timedelta(seconds=settings.BATCH_RECOMMENDATION_RUN_TIMEOUT_SECONDS + 1)
+    )
+    db.add(stuck)
+    db.commit()
+
+    queued = BatchRecommendationService.enqueue(db, organizer.id)
+    assert queued["run_id"] != stuck.id
+    assert BatchRecommendationService.get_run_status(db, stuck.id)["status"] == "FAILED"
@@ -0,0 +1,54 @@
+import threading
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import func
+from core.config import settings
+from core.database import SessionLocal
+from models.booking import Booking, BookingStatus
+from models.event import Event
+from schemas.booking import BookingCreate
+from services.booking_service import BookingService
+
+def confirmed_seats(db, event_id: int, user_id: int) -> int:
+    return db.query(func.coalesce(func.sum(Booking.number_of_seats), 0)).filter(
+        Booking.event_id == event_id,
+        Booking.user_id == user_id,
+        Booking.status == BookingStatus.CONFIRMED
+    ).scalar()
+
+def test_booking_over_the_cap_is_rejected(db, make_user, make_event):
+    user, event = make_user(), make_event(total_seats=50)
+    BookingService.create_booking(db, BookingCreate(event_id=event.id, number_of_seats=8), user.id)
+
+    with pytest.raises(HTTPException) as error:
+        BookingService.create_booking(db, BookingCreate(event_id=event.id, number_of_seats=3), user.id)
+    assert error.value.status_code == 400
+
+    db.expire_all()
+    # The rejected booking's seat claim was rolled back
+    assert db.get(Event, event.id).available_seats == 42
+    assert confirmed_seats(db, event.id, user.id) == 8
+
+def test_concurrent_bookings_by_one_user_stay_under_the_cap(db, make_user, make_event):
+    user_id, event_id = make_user().id, make_event(total_seats=500).id
+
+    def book():
+        session = SessionLocal()
+        try:
+            BookingService.create_booking(session, BookingCreate(event_id=event_id, number_of_seats=3), user_id)
+        except HTTPException:
+            pass
+        finally:
+            session.close()
+
+    threads = [threading.Thread(target=book) for _ in range(40)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    db.expire_all()
+    booked = confirmed_seats(db, event_id, user_id)
+    assert booked <= settings.MAX_SEATS_PER_USER
+    assert booked == 3 * (settings.MAX_SEATS_PER_USER // 3)
+    assert db.get(Event, event_id).available_seats == 500 - booked
@@ -0,0 +1,35 @@
+from datetime import datetime, timedelta
+from models.event import Event, EventStatus
+from services.event_service import EventService
+from services.event_status_scheduler import EventStatusScheduler
+
+def test_reads_report_ended_events_without_writing(db, client, make_event):
+    past = make_event(date=datetime.utcnow() - timedelta(days=2), end_date=datetime.utcnow() - timedelta(days=1))
+    upcoming = make_event()
+
+    assert client.get(f"/api/events/{past.id}").json()["status"] == "ENDED"
+    assert [e["id"] for e in client.get("/api/events/").json()] == [upcoming.id]
+    assert [e["id"] for e in client.get("/api/events/", params={"status": "ENDED"}).json()] == [past.id]
+    db.expire_all()
+    # Only the sweeper persists the transition
+    assert db.get(Event, past.id).status == EventStatus.PUBLISHED
+
+def test_sweep_ends_past_events_and_wakes_for_the_next_one(db, make_event):
+    now = datetime.utcnow()
+    past = make_event(date=now - timedelta(hours=3), end_date=now - timedelta(hours=1))
+    started = make_event(date=now - timedelta(hours=1))  # no end_date: over once it starts
+    running = make_event(date=now - timedelta(hours=1), end_date=now + timedelta(seconds=30))
+    draft = make_event(date=now - timedelta(days=1), status=EventStatus.DRAFT)
+
+    scheduler = EventStatusScheduler(interval_seconds=600)
+    delay = scheduler.sweep()
+    db.expire_all()
+    assert [db.get(Event, e.id).status for e in (past, started, running, draft)] == \
+        [EventStatus.ENDED, EventStatus.ENDED, EventStatus.PUBLISHED, EventStatus.DRAFT]
+    # Sleeps until the running event ends rather than the full interval
+    assert 0 < delay <= 30
+    assert EventService.update_ended_events(db) == 0
+
+def test_sweep_waits_the_interval_when_nothing_is_due(db, make_event):
+    make_event(date=datetime.utcnow() + timedelta(days=3))
+    assert EventStatusScheduler(interval_seconds=600).sweep() == 600
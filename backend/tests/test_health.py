@@ -0,0 +1,19 @@
+from sqlalchemy.exc import OperationalError
+from services.outbox_dispatcher import outbox_dispatcher
+
+def test_health_reports_the_outbox(client):
+    body = client.get("/health").json()
+    assert body["status"] == "ok"
+    assert body["outbox"]["lag_seconds"] == 0.0
+
+def test_health_answers_when_outbox_stats_fail(client, monkeypatch):
+    def unavailable():
+        raise OperationalError("SELECT", {}, Exception("database is down"))
+    monkeypatch.setattr(outbox_dispatcher, "stats", unavailable)
+
+    response = client.get("/health")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "degraded"
+    assert body["outbox"]["status"] == "unavailable"
+    assert "database is down" in body["outbox"]["error"]
@@ -0,0 +1,38 @@
+from models.event import EventStatus
+from models.event_keyword import EventKeyword, TOKEN_LENGTH
+from services.keyword_index import KeywordIndex
+from services.user_profile_service import UserProfileService
+
+def test_tokens_are_normalized_and_fit_the_column():
+    composed, decomposed = "Caf\u00e9s", "cafe\u0301s"
+    assert KeywordIndex.tokenize(f"{composed} {decomposed} CAF\u00c9S") == {"caf\u00e9s"}
+    # Short words are not keywords
+    assert KeywordIndex.tokenize("a jazz gig") == {"jazz"}
+    assert KeywordIndex.tokenize("x" * 300) == {"x" * TOKEN_LENGTH}
+    # Explicit interests go through the same normalization, so they match event tokens
+    assert UserProfileService._parse_interests(f'["{decomposed}", "Jazz"]') == {"caf\u00e9s", "jazz"}
+
+def test_index_event_replaces_its_postings(db, make_event):
+    event = make_event(title=f"Résumé resume RESUME {'y' * 300} {'y' * 301}", description="workshop")
+    KeywordIndex.index_event(db, event)
+    db.commit()
+    tokens = {token for (token,) in db.query(EventKeyword.token).filter(EventKeyword.event_id == event.id)}
+    assert tokens == {"résumé", "resume", "y" * TOKEN_LENGTH, "workshop", event.event_type.value.lower()}
+    assert event.keyword_count == len(tokens)
+
+    event.title = "Opera"
+    KeywordIndex.index_event(db, event)
+    db.commit()
+    tokens = {token for (token,) in db.query(EventKeyword.token).filter(EventKeyword.event_id == event.id)}
+    assert tokens == {"opera", "workshop", event.event_type.value.lower()}
+
+    KeywordIndex.remove_event(db, event.id)
+    db.commit()
+    assert db.query(EventKeyword).filter(EventKeyword.event_id == event.id).count() == 0
+
+def test_backfill_indexes_events_without_postings(db, make_event):
+    events = [make_event(title=f"Concert number{i}", status=EventStatus.PUBLISHED) for i in range(5)]
+    assert all(event.keyword_count is None for event in events)
+    assert KeywordIndex.backfill(db, batch_size=2) == 5
+    assert db.query(EventKeyword).filter(EventKeyword.token == "concert").count() == 5
+    assert KeywordIndex.backfill(db) == 0
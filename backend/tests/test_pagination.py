@@ -0,0 +1,62 @@
+import random
+from datetime import datetime, timedelta
+import pytest
+from models.booking import Booking, BookingStatus
+from models.user import UserRole
+
+def walk(client, path: str, headers: dict, params: dict) -> list[int]:
+    """Follow X-Next-Cursor to the end, returning every id in order."""
+    ids, cursor = [], None
+    for _ in range(50):
+        response = client.get(path, headers=headers, params={**params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200, response.text
+        ids += [item["id"] for item in response.json()]
+        cursor = response.headers["X-Next-Cursor"]
+        if not cursor:
+            return ids
+    raise AssertionError("pagination did not terminate")
+
+@pytest.fixture
+def catalogue(make_user, make_event):
+    organizer = make_user(UserRole.ORGANIZER)
+    rng = random.Random(3)
+    start = datetime.utcnow() + timedelta(days=1)
+    # Few distinct dates, prices and sold counts, so pages split inside runs of ties
+    events = [
+        make_event(organizer_id=organizer.id, date=start + timedelta(hours=rng.randint(0, 3)),
+                   price=rng.choice([5.0, 10.0]), available_seats=rng.choice([20, 15]))
+        for _ in range(23)
+    ]
+    return organizer, events
+
+def test_event_listing_cursor_walks_every_event_once(client, catalogue):
+    _, events = catalogue
+    assert walk(client, "/api/events/", {}, {"limit": 5}) == walk(client, "/api/events/", {}, {"limit": 100})
+    assert sorted(walk(client, "/api/events/", {}, {"limit": 5})) == sorted(e.id for e in events)
+
+@pytest.mark.parametrize("sort_by", ["date", "price", "sold", "status"])
+@pytest.mark.parametrize("sort_desc", [False, True])
+def test_organizer_cursor_matches_one_big_page(client, auth_headers, catalogue, sort_by, sort_desc):
+    organizer, events = catalogue
+    headers = auth_headers(organizer)
+    params = {"sort_by": sort_by, "sort_desc": sort_desc}
+    paged = walk(client, "/api/events/my-events", headers, {**params, "limit": 4})
+    assert paged == walk(client, "/api/events/my-events", headers, {**params, "limit": 100})
+    assert sorted(paged) == sorted(e.id for e in events)
+
+def test_booking_cursor_walks_newest_first(db, client, auth_headers, make_user, catalogue):
+    _, events = catalogue
+    attendee = make_user()
+    for event in events[:11]:
+        db.add(Booking(user_id=attendee.id, event_id=event.id, number_of_seats=1, status=BookingStatus.CONFIRMED))
+    db.commit()
+    ids = walk(client, "/api/bookings/my-bookings", auth_headers(attendee), {"limit": 3})
+    assert len(ids) == 11 and ids == sorted(ids, reverse=True)
+
+def test_malformed_or_foreign_cursor_is_rejected(client, auth_headers, catalogue):
+    organizer, _ = catalogue
+    assert client.get("/api/events/", params={"cursor": "not-a-cursor"}).status_code == 400
+    # The catalogue's one-value cursor doesn't fit the two-value organizer listing
+    booking_cursor = client.get("/api/events/", params={"limit": 1}).headers["X-Next-Cursor"]
+    response = client.get("/api/events/my-events", headers=auth_headers(organizer), params={"cursor": booking_cursor})
+    assert response.status_code == 400
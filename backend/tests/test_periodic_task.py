@@ -0,0 +1,69 @@
+import asyncio
+import threading
+import time
+from core.periodic_task import PeriodicTask
+
+def test_runs_until_stopped_and_survives_failures():
+    calls = []
+
+    def fn():
+        calls.append(time.monotonic())
+        if len(calls) == 1:
+            raise RuntimeError("boom")
+
+    async def main():
+        task = PeriodicTask("test", fn, 0.01)
+        task.start()
+        assert task.running
+        await asyncio.sleep(0.2)
+        await task.stop()
+        assert not task.running
+
+    asyncio.run(main())
+    count = len(calls)
+    assert count >= 3
+    time.sleep(0.05)
+    assert len(calls) == count
+
+def test_stop_wakes_a_sleeping_task_and_waits_for_a_running_one():
+    entered = threading.Event()
+    finished = []
+
+    def fn():
+        entered.set()
+        time.sleep(0.3)
+        finished.append(True)
+
+    async def main():
+        # A sleeping task stops without waiting out its interval
+        idle = PeriodicTask("idle", lambda: None, 60, delay_first=True)
+        idle.start()
+        started = time.monotonic()
+        await idle.stop()
+        assert time.monotonic() - started < 1
+
+        busy = PeriodicTask("busy", fn, 60)
+        busy.start()
+        while not entered.is_set():
+            await asyncio.sleep(0.01)
+        await busy.stop()
+        assert finished == [True]
+        assert busy.stopping.is_set()
+
+    asyncio.run(main())
+
+def test_returned_delay_sets_the_next_interval():
+    calls = []
+
+    def fn():
+        calls.append(time.monotonic())
+        return 0.01
+
+    async def main():
+        task = PeriodicTask("test", fn, 60, returns_delay=True)
+        task.start()
+        await asyncio.sleep(0.2)
+        await task.stop()
+
+    asyncio.run(main())
+    assert len(calls) >= 3
@@ -0,0 +1,73 @@
+import threading
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import QueuePool
+from core.pool_metrics import PoolMetrics
+
+POOL_SIZE, MAX_OVERFLOW = 4, 2
+THREADS, QUERIES = 16, 25
+
+@pytest.fixture
+def pooled(tmp_path):
+    metrics = PoolMetrics("test", MAX_OVERFLOW)
+    engine = create_engine(
+        f"sqlite:///{tmp_path}/pool.db",
+        poolclass=metrics.pool_class(QueuePool),
+        pool_size=POOL_SIZE, max_overflow=MAX_OVERFLOW, pool_timeout=10, pool_pre_ping=True,
+        connect_args={"check_same_thread": False},
+    )
+    metrics.attach(engine)
+    yield engine, metrics
+    engine.dispose()
+
+def test_pre_ping_replaces_connections_closed_under_the_pool(pooled):
+    """Scaled-down stand-in for the server dropping idle connections mid-burst."""
+    engine, metrics = pooled
+    # Fill the pool, then close every idle connection behind its back
+    held = [engine.connect() for _ in range(POOL_SIZE)]
+    raw = [conn.connection.dbapi_connection for conn in held]
+    for conn in held:
+        conn.close()
+    for dbapi_connection in raw:
+        dbapi_connection.close()
+
+    errors, peak = [], []
+
+    def worker():
+        try:
+            for _ in range(QUERIES):
+                with engine.connect() as conn:
+                    assert conn.execute(text("SELECT 1")).scalar() == 1
+                    peak.append(metrics.snapshot()["checked_out"])
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    stats = metrics.snapshot()
+    # The first dead connection found invalidates the pool; the rest are replaced on checkout
+    assert stats["invalidated"] >= 1
+    assert stats["checked_out"] == 0
+    assert stats["checkouts"] == POOL_SIZE + THREADS * QUERIES
+    assert max(peak) <= POOL_SIZE + MAX_OVERFLOW
+    assert stats["connections_opened"] >= 2 * POOL_SIZE
+
+def test_snapshot_reports_saturation_and_lifetimes(pooled):
+    engine, metrics = pooled
+    held = [engine.connect() for _ in range(POOL_SIZE + 1)]
+    stats = metrics.snapshot()
+    assert stats["checked_out"] == POOL_SIZE + 1 and stats["overflow"] == 1
+    assert stats["saturation"] == round((POOL_SIZE + 1) / (POOL_SIZE + MAX_OVERFLOW), 3)
+    for conn in held:
+        conn.close()
+    engine.dispose()
+    stats = metrics.snapshot()
+    # The overflow connection closed on return, the rest on dispose; the
+    # metrics follow the engine to its new pool
+    assert stats["connections_closed"] == POOL_SIZE + 1
+    assert stats["checked_out"] == 0 and stats["saturation"] == 0.0
@@ -0,0 +1,49 @@
+from fastapi.testclient import TestClient
+from core.query_counter import QUERY_COUNT_HEADER
+from core.response_cache import response_cache
+from models.booking import Booking, BookingStatus
+from models.user import User, UserRole
+
+# Each endpoint must issue the same number of SELECTs for one row as for many:
+# a count that grows with the page is an N+1 lazy load.
+ROWS = 12
+
+def selects(client: TestClient, path: str, headers: dict, rows: int) -> int:
+    response_cache.invalidate_lists()
+    response = client.get(path, headers=headers)
+    assert response.status_code == 200, response.text
+    assert len(response.json()) == rows
+    return int(response.headers[QUERY_COUNT_HEADER])
+
+def add_bookings(db, user: User, make_event, count: int):
+    for _ in range(count):
+        event = make_event()
+        db.add(Booking(user_id=user.id, event_id=event.id, number_of_seats=1, status=BookingStatus.CONFIRMED))
+    db.commit()
+
+def test_event_list_queries_do_not_grow_with_the_page(db, client, make_user, make_event):
+    organizer = make_user(UserRole.ORGANIZER)
+    make_event(organizer_id=organizer.id)
+    one = selects(client, "/api/events/", {}, 1)
+    for _ in range(ROWS - 1):
+        make_event(organizer_id=organizer.id)
+    assert selects(client, "/api/events/", {}, ROWS) == one
+
+def test_organizer_event_list_queries_do_not_grow_with_the_page(db, client, auth_headers, make_user, make_event):
+    organizer = make_user(UserRole.ORGANIZER)
+    headers = auth_headers(organizer)
+    make_event(organizer_id=organizer.id)
+    selects(client, "/api/events/my-events", headers, 1)  # caches the principal
+    one = selects(client, "/api/events/my-events", headers, 1)
+    for _ in range(ROWS - 1):
+        make_event(organizer_id=organizer.id)
+    assert selects(client, "/api/events/my-events", headers, ROWS) == one
+
+def test_booking_list_queries_do_not_grow_with_the_page(db, client, auth_headers, make_user, make_event):
+    attendee = make_user()
+    headers = auth_headers(attendee)
+    add_bookings(db, attendee, make_event, 1)
+    selects(client, "/api/bookings/my-bookings", headers, 1)  # caches the principal
+    one = selects(client, "/api/bookings/my-bookings", headers, 1)
+    add_bookings(db, attendee, make_event, ROWS - 1)
+    assert selects(client, "/api/bookings/my-bookings", headers, ROWS) == one
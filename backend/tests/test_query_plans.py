@@ -0,0 +1,65 @@
+from datetime import datetime
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+from core.database import engine
+from models.booking import Booking, BookingStatus
+from models.event import Event, EventStatus
+from services.event_service import EventService
+
+# An index nobody's query can use is just write overhead. These check, with the
+# database's own planner, that each hot query shape in EventService,
+# BookingService and RecommendationService is served by the index meant for it.
+
+class explain(Executable, ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+@compiles(explain)
+def _compile_explain(element, compiler, **kw):
+    prefix = "EXPLAIN QUERY PLAN " if compiler.dialect.name == "sqlite" else "EXPLAIN "
+    return prefix + compiler.process(element.statement, **kw)
+
+NOW = datetime.utcnow()
+PUBLISHED = EventStatus.PUBLISHED
+
+# (name, statement, indexes any one of which the plan should use)
+HOT_QUERIES = [
+    ("events listing (effective PUBLISHED)",
+     select(Event).where(EventService.status_condition(PUBLISHED, NOW)).order_by(Event.id).limit(100),
+     ("ix_events_status_end_date_date", "ix_events_status_date")),
+    # The rows update_ended_events rewrites
+    ("ended-event sweep",
+     select(Event.id).where(Event.status == PUBLISHED, EventService.ended_condition(NOW)),
+     ("ix_events_status_end_date_date",)),
+    ("next end boundary",
+     select(func.min(EventService.end_boundary())).where(Event.status == PUBLISHED, EventService.end_boundary() >= NOW),
+     ("ix_events_status_end_date_date",)),
+    ("recommendation candidates",
+     select(Event.id).where(Event.status == PUBLISHED, Event.date > NOW),
+     ("ix_events_status_date",)),
+    ("organizer events by date",
+     select(Event).where(Event.organizer_id == 1).order_by(Event.date, Event.id).limit(100),
+     ("ix_events_organizer_id_date",)),
+    ("my bookings, newest first",
+     select(Booking).where(Booking.user_id == 1).order_by(Booking.id.desc()).limit(100),
+     ("ix_bookings_user_id_id",)),
+    ("per-user seat cap",
+     select(func.coalesce(func.sum(Booking.number_of_seats), 0)).where(
+         Booking.user_id == 1, Booking.event_id == 1, Booking.status == BookingStatus.CONFIRMED),
+     ("ix_bookings_user_id_event_id_status",)),
+    ("confirmed seats per event",
+     select(func.coalesce(func.sum(Booking.number_of_seats), 0)).where(
+         Booking.event_id == 1, Booking.status == BookingStatus.CONFIRMED),
+     ("ix_bookings_event_id_status",)),
+]
+
+@pytest.mark.parametrize("name, statement, indexes", HOT_QUERIES, ids=[name for name, _, _ in HOT_QUERIES])
+def test_hot_query_uses_its_index(name, statement, indexes):
+    with engine.connect() as conn:
+        plan = [" ".join(str(value) for value in row) for row in conn.execute(explain(statement))]
+    assert any(index in line for index in indexes for line in plan), \
+        f"{name}: expected {' or '.join(indexes)}, got:\n" + "\n".join(plan)
@@ -0,0 +1,126 @@
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta
+import pytest
+from core.database import AsyncSessionLocal
+from models.event import Event, EventStatus, EventType
+from services.keyword_index import KeywordIndex
+from services.recommendation_matrix import RecommendationMatrix
+from services import recommendation_service
+from services.recommendation_service import RecommendationService
+
+WORDS = ["jazz", "rock", "opera", "python", "design", "startup", "poetry", "dance", "cinema", "robotics"]
+
+@pytest.fixture
+def catalogue(db, make_user):
+    """120 events with overlapping keywords, some of them drafts or already over."""
+    organizer_id = make_user().id
+    rng = random.Random(7)
+    now = datetime.utcnow()
+    events = []
+    for i in range(120):
+        event = Event(
+            title=" ".join(rng.sample(WORDS, rng.randint(1, 4))),
+            description=" ".join(rng.sample(WORDS, rng.randint(0, 3))),
+            date=now + timedelta(days=rng.choice([-2, 1, 2, 3])),
+            location="Hall",
+            total_seats=10,
+            available_seats=10,
+            price=1.0,
+            event_type=rng.choice(list(EventType)),
+            status=EventStatus.DRAFT if i % 9 == 0 else EventStatus.PUBLISHED,
+            organizer_id=organizer_id,
+        )
+        db.add(event)
+        db.flush()
+        KeywordIndex.index_event(db, event)
+        events.append(event)
+    db.commit()
+    return events
+
+def naive_top_ids(events, user_keywords: set[str], excluded: set[int], limit: int, now: datetime) -> list[int]:
+    """Jaccard similarity over every candidate, as the original full scan computed it."""
+    scored = [
+        (RecommendationService._calculate_jaccard_similarity(user_keywords, KeywordIndex.tokens_for(e)), e.id)
+        for e in events
+        if e.status == EventStatus.PUBLISHED and e.date > now and e.id not in excluded
+    ]
+    scored.sort(key=lambda item: (-item[0], item[1]))
+    return [event_id for _, event_id in scored[:limit]]
+
+PROFILES = [
+    set(),
+    {"jazz"},
+    {"jazz", "opera", "concert"},
+    {"python", "robotics", "workshop", "startup"},
+    {"unknown", "words"},
+    set(WORDS),
+]
+
+@pytest.mark.parametrize("user_keywords", PROFILES)
+@pytest.mark.parametrize("limit", [1, 5, 20])
+def test_matrix_matches_naive_scan_and_index(db, catalogue, user_keywords, limit):
+    now = datetime.utcnow()
+    excluded = {catalogue[3].id, catalogue[10].id}
+    expected = naive_top_ids(catalogue, user_keywords, excluded, limit, now)
+
+    matrix = RecommendationMatrix()
+    matrix.refresh()
+    assert matrix.top_event_ids(user_keywords, excluded, limit, now) == expected
+    from_index = RecommendationService._recommend_from_index(db, user_keywords, excluded, limit, now)
+    assert [e.id for e in from_index] == expected
+
+def wait_for_rebuild(matrix: RecommendationMatrix):
+    deadline = time.monotonic() + 10
+    while matrix._building and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not matrix._building
+
+def test_stale_snapshot_is_served_while_rebuilding(db, catalogue):
+    now = datetime.utcnow()
+    matrix = RecommendationMatrix()
+    matrix.refresh()
+    before = matrix.top_event_ids({"jazz"}, set(), 200, now)
+
+    catalogue[1].status = EventStatus.CANCELLED
+    db.commit()
+    matrix.mark_dirty()
+    # The caller gets the previous snapshot; the rebuild runs on another thread
+    assert matrix.top_event_ids({"jazz"}, set(), 200, now) == before
+    wait_for_rebuild(matrix)
+    after = matrix.top_event_ids({"jazz"}, set(), 200, now)
+    assert after == [event_id for event_id in before if event_id != catalogue[1].id]
+
+def test_recommendations_recheck_events_the_snapshot_still_has(db, catalogue, monkeypatch):
+    now = datetime.utcnow()
+    matrix = RecommendationMatrix()
+    matrix.refresh()
+    monkeypatch.setattr(recommendation_service, "recommendation_matrix", matrix)
+    top = matrix.top_event_ids({"jazz"}, set(), 5, now)
+
+    # Cancelled through another worker: this process's snapshot wasn't marked dirty
+    db.query(Event).filter(Event.id == top[0]).update({Event.status: EventStatus.CANCELLED})
+    db.commit()
+    recommended = [e.id for e in RecommendationService._recommend_from_matrix(db, {"jazz"}, set(), 5, now)]
+    assert recommended == top[1:] + [matrix.top_event_ids({"jazz"}, set(), 6, now)[5]]
+
+def test_cold_start_answers_from_the_index_without_building_on_the_event_loop(db, catalogue, monkeypatch):
+    matrix = RecommendationMatrix()
+    monkeypatch.setattr(recommendation_service, "recommendation_matrix", matrix)
+    now = datetime.utcnow()
+    expected = [e.id for e in RecommendationService._recommend_from_index(db, {"jazz"}, set(), 3, now)]
+
+    async def recommend():
+        async with AsyncSessionLocal() as session:
+            events = await session.run_sync(
+                lambda s: RecommendationService._recommend_from_matrix(s, {"jazz"}, set(), 3, now)
+            )
+            return [e.id for e in events]
+
+    async def main():
+        return await asyncio.wait_for(asyncio.gather(*(recommend() for _ in range(8))), timeout=10)
+
+    assert asyncio.run(main()) == [expected] * 8
+    wait_for_rebuild(matrix)
+    assert matrix.top_event_ids({"jazz"}, set(), 3, now) == expected
@@ -0,0 +1,19 @@
+import json
+from datetime import datetime
+from types import SimpleNamespace
+from core.response_cache import entry_for
+from models.event import EventStatus
+
+def test_etag_changes_with_the_body_within_one_second():
+    # Two bookings in the same second: same updated_at, different seat counts
+    updated_at = datetime(2026, 10, 17, 12, 0, 0)
+    event = SimpleNamespace(id=1, updated_at=updated_at, status=EventStatus.PUBLISHED)
+    first = entry_for(json.dumps({"id": 1, "available_seats": 9}).encode(), [event])
+    second = entry_for(json.dumps({"id": 1, "available_seats": 8}).encode(), [event])
+    assert first["etag"] != second["etag"]
+    assert first["last_modified"] == second["last_modified"]
+
+def test_etag_is_stable_for_the_same_response():
+    body = json.dumps([{"id": 1}]).encode()
+    assert entry_for(body, [], {"X-Next-Cursor": "abc"})["etag"] == entry_for(body, [], {"X-Next-Cursor": "abc"})["etag"]
+    assert entry_for(body, [], {"X-Next-Cursor": "abc"})["etag"] != entry_for(body, [], {"X-Next-Cursor": ""})["etag"]
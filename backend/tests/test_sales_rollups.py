@@ -0,0 +1,103 @@
+import random
+from datetime import datetime, timedelta
+import pytest
+from fastapi import HTTPException
+from models.booking import Booking, BookingStatus
+from models.user import UserRole
+from services.sales_rollup_service import SalesRollupService
+
+BASE = datetime(2026, 3, 1, 0, 0)
+
+@pytest.fixture
+def organizer(make_user):
+    return make_user(UserRole.ORGANIZER)
+
+@pytest.fixture
+def sales(db, organizer, make_user, make_event):
+    """60 bookings over three days on two events; a third of them cancelled a few hours later."""
+    rng = random.Random(11)
+    buyer = make_user()
+    events = [make_event(organizer_id=organizer.id, price=price, total_seats=500) for price in (10.0, 25.0)]
+    bookings = []
+    for i in range(60):
+        created = BASE + timedelta(minutes=rng.randint(0, 3 * 24 * 60 - 1))
+        cancelled = created + timedelta(hours=rng.randint(1, 30)) if i % 3 == 0 else None
+        booking = Booking(
+            user_id=buyer.id, event_id=rng.choice(events).id, number_of_seats=rng.randint(1, 4),
+            status=BookingStatus.CANCELLED_BY_USER if cancelled else BookingStatus.CONFIRMED,
+            created_at=created, cancelled_at=cancelled,
+        )
+        db.add(booking)
+        bookings.append(booking)
+    db.commit()
+    return events, bookings
+
+def expected(events, bookings, granularity: str, event_id=None) -> dict:
+    prices = {event.id: event.price for event in events}
+    points = {}
+    for b in bookings:
+        if event_id is not None and b.event_id != event_id:
+            continue
+        for at, sold, cancelled, sign in ((b.created_at, b.number_of_seats, 0, 1), (b.cancelled_at, 0, b.number_of_seats, -1)):
+            if at is None:
+                continue
+            bucket = at.replace(minute=0, second=0, microsecond=0)
+            if granularity == "day":
+                bucket = bucket.replace(hour=0)
+            point = points.setdefault(bucket, [0, 0, 0.0])
+            point[0] += sold
+            point[1] += cancelled
+            point[2] += sign * b.number_of_seats * prices[b.event_id]
+    return {bucket: (sold, cancelled, round(revenue, 2)) for bucket, (sold, cancelled, revenue) in points.items()}
+
+def series(db, organizer, granularity: str, event_id=None) -> dict:
+    result = SalesRollupService.get_timeseries(
+        db, organizer.id, granularity, start=BASE, end=BASE + timedelta(days=5), event_id=event_id
+    )
+    return {p["bucket"]: (p["seats_sold"], p["seats_cancelled"], p["revenue"]) for p in result["points"]
+            if p["seats_sold"] or p["seats_cancelled"]}
+
+@pytest.mark.parametrize("granularity", ["hour", "day"])
+def test_rollups_match_the_bookings_across_batches(db, organizer, sales, granularity):
+    events, bookings = sales
+    processed = SalesRollupService.run(db, batch_size=7)
+    assert (processed["sales"], processed["cancellations"]) == (60, 20)
+    assert series(db, organizer, granularity) == expected(events, bookings, granularity)
+    assert series(db, organizer, granularity, events[1].id) == expected(events, bookings, granularity, events[1].id)
+    # Nothing is folded twice
+    assert SalesRollupService.run(db, batch_size=7)["sales"] == 0
+    assert series(db, organizer, granularity) == expected(events, bookings, granularity)
+
+def test_later_writes_are_folded_in_incrementally(db, organizer, sales):
+    events, bookings = sales
+    SalesRollupService.run(db, batch_size=7)
+    late = bookings[1]
+    late.cancelled_at, late.status = BASE + timedelta(days=4), BookingStatus.CANCELLED_BY_USER
+    extra = Booking(user_id=late.user_id, event_id=events[0].id, number_of_seats=2,
+                    status=BookingStatus.CONFIRMED, created_at=BASE + timedelta(days=4, hours=5))
+    db.add(extra)
+    db.commit()
+
+    processed = SalesRollupService.run(db)
+    assert (processed["sales"], processed["cancellations"]) == (1, 1)
+    assert series(db, organizer, "hour") == expected(events, bookings + [extra], "hour")
+    SalesRollupService.rebuild(db)
+    assert series(db, organizer, "hour") == expected(events, bookings + [extra], "hour")
+
+def test_recent_bookings_wait_for_the_settle_window(db, organizer, make_user, make_event):
+    event = make_event(organizer_id=organizer.id)
+    db.add(Booking(user_id=make_user().id, event_id=event.id, number_of_seats=1,
+                   status=BookingStatus.CONFIRMED, created_at=datetime.utcnow()))
+    db.commit()
+    assert SalesRollupService.run(db)["sales"] == 0
+    as_of = SalesRollupService.get_timeseries(db, organizer.id, "hour")["as_of"]
+    assert as_of is not None and as_of < datetime.utcnow()
+
+def test_timeseries_zero_fills_and_bounds_the_range(db, organizer):
+    result = SalesRollupService.get_timeseries(db, organizer.id, "hour", start=BASE, end=BASE + timedelta(hours=5, minutes=1))
+    assert [p["bucket"] for p in result["points"]] == [BASE + timedelta(hours=h) for h in range(6)]
+    assert all(p["seats_sold"] == 0 for p in result["points"])
+    with pytest.raises(HTTPException):
+        SalesRollupService.get_timeseries(db, organizer.id, "hour", start=BASE, end=BASE + timedelta(days=365))
+    with pytest.raises(HTTPException):
+        SalesRollupService.get_timeseries(db, organizer.id, "week")
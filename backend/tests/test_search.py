@@ -0,0 +1,79 @@
+import pytest
+from sqlalchemy import select
+from models.event import Event
+from services.search_service import FullTextSearchBackend, LikeSearchBackend, TrigramSearchBackend
+
+TITLES = ["Jazz night", "Late jazz session", "Rock festival", "Python workshop", "Jazzercise class"]
+
+@pytest.fixture
+def catalogue(make_event):
+    return {title: make_event(title=title, location="Main hall" if "Rock" in title else "Hall").id for title in TITLES}
+
+def matches(db, backend, term: str) -> list[int]:
+    query, relevance = backend.apply(select(Event.id), term)
+    if relevance is not None:
+        query = query.order_by(relevance.desc(), Event.id.desc())
+    else:
+        query = query.order_by(Event.id)
+    return list(db.scalars(query))
+
+def prepared(backend):
+    backend.prepare()
+    return backend
+
+@pytest.mark.parametrize("make_backend", [LikeSearchBackend, FullTextSearchBackend, TrigramSearchBackend])
+def test_backends_agree_on_whole_words(db, catalogue, make_backend):
+    backend = prepared(make_backend())
+    assert set(matches(db, backend, "python")) == {catalogue["Python workshop"]}
+    assert set(matches(db, backend, "main hall")) == {catalogue["Rock festival"]}
+    assert matches(db, backend, "opera") == []
+
+def test_fulltext_matches_word_prefixes_and_follows_writes(db, catalogue):
+    backend = prepared(FullTextSearchBackend())
+    jazz = {catalogue["Jazz night"], catalogue["Late jazz session"], catalogue["Jazzercise class"]}
+    assert set(matches(db, backend, "jaz")) == jazz
+    # Every word is a prefix, and all of them must match
+    assert set(matches(db, backend, "jazz se")) == {catalogue["Late jazz session"]}
+
+    # The FTS table is kept in step by triggers
+    event = db.get(Event, catalogue["Rock festival"])
+    event.title = "Jazz festival"
+    db.commit()
+    assert catalogue["Rock festival"] in matches(db, backend, "jazz")
+    db.delete(db.get(Event, catalogue["Jazz night"]))
+    db.commit()
+    assert catalogue["Jazz night"] not in matches(db, backend, "jazz")
+
+def test_trigram_ranks_close_matches_and_refreshes_from_the_table(db, catalogue):
+    backend = prepared(TrigramSearchBackend())
+    ranked = matches(db, backend, "jazz")
+    assert set(ranked) == {catalogue["Jazz night"], catalogue["Late jazz session"], catalogue["Jazzercise class"]}
+    # Exact words outrank a longer word that merely starts the same
+    assert ranked[-1] == catalogue["Jazzercise class"]
+    assert catalogue["Jazz night"] in matches(db, backend, "jaz")
+
+    # Writes from another worker show up after refresh()
+    event = db.get(Event, catalogue["Python workshop"])
+    event.title = "Jazz workshop"
+    db.commit()
+    db.delete(db.get(Event, catalogue["Jazz night"]))
+    db.commit()
+    backend.refresh()
+    ranked = matches(db, backend, "jazz")
+    assert catalogue["Python workshop"] in ranked and catalogue["Jazz night"] not in ranked
+
+def test_ranked_search_pages_through_the_relevance_cursor(client, catalogue, monkeypatch):
+    from api.endpoints import events
+    monkeypatch.setattr(events, "search_backend", prepared(FullTextSearchBackend()))
+
+    def page(params):
+        response = client.get("/api/events/", params={"search": "jazz", **params})
+        assert response.status_code == 200, response.text
+        return [e["id"] for e in response.json()], response.headers["X-Next-Cursor"]
+
+    everything, _ = page({"limit": 100})
+    walked, cursor = page({"limit": 1})
+    while cursor:
+        ids, cursor = page({"limit": 1, "cursor": cursor})
+        walked += ids
+    assert walked == everything and len(everything) == 3
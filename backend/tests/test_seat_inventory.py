@@ -0,0 +1,121 @@
+import threading
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, event, func
+from sqlalchemy.orm import Session
+from core.config import settings
+from core.database import SessionLocal, engine as app_engine
+from models.booking import Booking, BookingStatus
+from models.event import Event
+from services.seat_inventory import SeatInventory
+
+def seats_by_user(db, event_id: int) -> dict:
+    return dict(db.query(Booking.user_id, func.sum(Booking.number_of_seats)).filter(
+        Booking.event_id == event_id,
+        Booking.status == BookingStatus.CONFIRMED
+    ).group_by(Booking.user_id).all())
+
+def test_per_user_cap_holds_across_workers(db, make_user, make_event):
+    # Four inventories stand in for four app processes, each with its own counters
+    user_ids = [make_user().id for _ in range(5)]
+    event_id = make_event(total_seats=1000, is_high_demand=True).id
+    workers = [SeatInventory(flush_interval_ms=5) for _ in range(4)]
+
+    def book(inventory: SeatInventory, user_id: int):
+        session = SessionLocal()
+        try:
+            slot = inventory.get_slot(session, event_id)
+            inventory.book(session, slot, user_id, 2, settings.MAX_SEATS_PER_USER)
+        except HTTPException:
+            pass
+        finally:
+            session.close()
+
+    threads = [threading.Thread(target=book, args=(workers[i % 4], user_ids[i % 5])) for i in range(200)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for inventory in workers:
+        inventory.stop()
+
+    db.expire_all()
+    booked = seats_by_user(db, event_id)
+    assert booked and all(seats <= settings.MAX_SEATS_PER_USER for seats in booked.values())
+    # Seats the flush turned away went back to the event
+    assert db.get(Event, event_id).available_seats == 1000 - sum(booked.values())
+
+def test_oversell_is_impossible_across_workers(db, make_user, make_event):
+    user_ids = [make_user().id for _ in range(60)]
+    event_id = make_event(total_seats=50, is_high_demand=True).id
+    workers = [SeatInventory(flush_interval_ms=5) for _ in range(4)]
+
+    def book(inventory: SeatInventory, user_id: int):
+        session = SessionLocal()
+        try:
+            slot = inventory.get_slot(session, event_id)
+            inventory.book(session, slot, user_id, 1, settings.MAX_SEATS_PER_USER)
+        except HTTPException:
+            pass
+        finally:
+            session.close()
+
+    threads = [threading.Thread(target=book, args=(workers[i % 4], user_ids[i])) for i in range(60)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for inventory in workers:
+        inventory.stop()
+
+    db.expire_all()
+    booked = sum(seats_by_user(db, event_id).values())
+    assert booked == 50
+    assert db.get(Event, event_id).available_seats == 0
+
+def test_book_gives_up_when_nothing_flushes(db, make_user, make_event, monkeypatch):
+    monkeypatch.setattr(settings, "SEAT_INVENTORY_BOOK_TIMEOUT_SECONDS", 0.2)
+    user_id = make_user().id
+    event_id = make_event(total_seats=10, is_high_demand=True).id
+    inventory = SeatInventory()
+    monkeypatch.setattr(inventory, "start", lambda: None)
+
+    slot = inventory.get_slot(db, event_id)
+    with pytest.raises(HTTPException) as error:
+        inventory.book(db, slot, user_id, 2, settings.MAX_SEATS_PER_USER)
+    assert error.value.status_code == 503
+    # Withdrawn: not queued, and the seats are back in the counter
+    assert not inventory._pending
+    assert slot.available == 10 and slot.user_seats[user_id] == 0
+
+@pytest.fixture
+def snapshot_session():
+    """
+    A request session whose first read starts a transaction that keeps its
+    snapshot, like MySQL's REPEATABLE READ (SQLite in WAL mode with an explicit
+    BEGIN). The flusher commits through its own connection.
+    """
+    with app_engine.connect() as conn:
+        conn.exec_driver_sql("PRAGMA journal_mode=WAL")
+    engine = create_engine(settings.DATABASE_URL, connect_args={"isolation_level": None})
+
+    @event.listens_for(engine, "begin")
+    def begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+    session = Session(bind=engine)
+    yield session
+    session.close()
+    engine.dispose()
+
+def test_booking_is_returned_after_a_flush_on_another_connection(snapshot_session, make_user, make_event):
+    user_id = make_user().id
+    event_id = make_event(total_seats=10, is_high_demand=True).id
+    inventory = SeatInventory(flush_interval_ms=5)
+    try:
+        slot = inventory.get_slot(snapshot_session, event_id)
+        booking = inventory.book(snapshot_session, slot, user_id, 2, settings.MAX_SEATS_PER_USER)
+    finally:
+        inventory.stop()
+    assert booking is not None
+    assert booking.user_id == user_id and booking.number_of_seats == 2
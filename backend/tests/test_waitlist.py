@@ -0,0 +1,242 @@
+import json
+import random
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import func
+from core.config import settings
+from core.database import SessionLocal
+from models.booking import Booking, BookingStatus
+from models.event import Event
+from models.outbox import OutboxMessage
+from models.waitlist import WaitlistEntry, WaitlistStatus
+from schemas.booking import BookingCreate
+from schemas.waitlist import WaitlistJoin
+from services.booking_service import BookingService
+from services.event_service import EventService
+from services.organizer_stats_service import OrganizerStatsService
+from services.waitlist_service import WaitlistService
+
+def book(db, event_id: int, user_id: int, seats: int) -> Booking:
+    return BookingService.create_booking(db, BookingCreate(event_id=event_id, number_of_seats=seats), user_id)
+
+def join(db, event_id: int, user_id: int, seats: int) -> WaitlistEntry:
+    return WaitlistService.join(db, WaitlistJoin(event_id=event_id, number_of_seats=seats), user_id)
+
+def statuses(db, *entries) -> list[WaitlistStatus]:
+    db.expire_all()
+    return [db.get(WaitlistEntry, entry.id).status for entry in entries]
+
+def test_join_is_refused_while_seats_are_available(db, make_user, make_event):
+    event = make_event(total_seats=5)
+    with pytest.raises(HTTPException) as error:
+        join(db, event.id, make_user().id, 2)
+    assert error.value.status_code == 400
+
+def test_freed_seats_go_to_the_queue_in_order(db, make_user, make_event):
+    event = make_event(total_seats=4)
+    holder = make_user()
+    first = book(db, event.id, holder.id, 2)
+    book(db, event.id, make_user().id, 2)
+    large = join(db, event.id, make_user().id, 3)
+    small = join(db, event.id, make_user().id, 1)
+    pair = join(db, event.id, make_user().id, 2)
+
+    BookingService.cancel_booking_by_user(db, first.id, holder.id)
+
+    # The 3-seat request doesn't fit in 2 free seats and keeps its place; the 1-seat one behind it does
+    assert statuses(db, large, small, pair) == [WaitlistStatus.WAITING, WaitlistStatus.OFFERED, WaitlistStatus.WAITING]
+    assert db.get(Event, event.id).available_seats == 1
+
+def test_claim_books_the_held_seats(db, make_user, make_event):
+    event = make_event(total_seats=2)
+    holder, waiter = make_user(), make_user()
+    booking = book(db, event.id, holder.id, 2)
+    entry = join(db, event.id, waiter.id, 2)
+    BookingService.cancel_booking_by_user(db, booking.id, holder.id)
+
+    claimed = WaitlistService.claim(db, entry.id, waiter.id)
+    assert claimed.status == BookingStatus.CONFIRMED and claimed.number_of_seats == 2
+    assert statuses(db, entry) == [WaitlistStatus.CLAIMED]
+    # Offered seats left available_seats already; claiming doesn't take them twice
+    assert db.get(Event, event.id).available_seats == 0
+
+    with pytest.raises(HTTPException):
+        WaitlistService.claim(db, entry.id, waiter.id)
+
+def test_expired_hold_passes_to_the_next_in_line(db, make_user, make_event):
+    event = make_event(total_seats=1)
+    holder, first, second = make_user(), make_user(), make_user()
+    booking = book(db, event.id, holder.id, 1)
+    late = join(db, event.id, first.id, 1)
+    next_up = join(db, event.id, second.id, 1)
+    BookingService.cancel_booking_by_user(db, booking.id, holder.id)
+    assert statuses(db, late, next_up) == [WaitlistStatus.OFFERED, WaitlistStatus.WAITING]
+
+    later = datetime.utcnow() + timedelta(days=1)
+    assert WaitlistService.expire_holds(db, now=later) == 1
+    assert statuses(db, late, next_up) == [WaitlistStatus.EXPIRED, WaitlistStatus.OFFERED]
+
+    db.query(WaitlistEntry).filter(WaitlistEntry.id == late.id).update(
+        {WaitlistEntry.status: WaitlistStatus.OFFERED, WaitlistEntry.hold_expires_at: datetime.utcnow() - timedelta(minutes=1)}
+    )
+    db.commit()
+    with pytest.raises(HTTPException) as error:
+        WaitlistService.claim(db, late.id, first.id)
+    assert "expired" in error.value.detail
+
+def test_cancelling_the_event_releases_held_seats(db, make_user, make_event, monkeypatch):
+    monkeypatch.setattr(settings, "ORGANIZER_STATS_TABLE_ENABLED", True)
+    event = make_event(total_seats=4)
+    OrganizerStatsService.check(db, fix=True)
+    holder = make_user()
+    booking = book(db, event.id, holder.id, 2)
+    book(db, event.id, make_user().id, 2)
+    offered = join(db, event.id, make_user().id, 2)
+    waiting = join(db, event.id, make_user().id, 2)
+    BookingService.cancel_booking_by_user(db, booking.id, holder.id)
+    assert statuses(db, offered, waiting) == [WaitlistStatus.OFFERED, WaitlistStatus.WAITING]
+
+    EventService.cancel_event(db, event.id, event.organizer_id)
+    assert statuses(db, offered, waiting) == [WaitlistStatus.CANCELLED, WaitlistStatus.CANCELLED]
+    # Only the confirmed booking still holds seats, and the stored counters agree
+    assert db.get(Event, event.id).available_seats == 2
+    assert OrganizerStatsService.check(db) == []
+
+def test_waitlisted_seats_count_towards_the_cap(db, make_user, make_event):
+    event = make_event(total_seats=8)
+    user = make_user()
+    book(db, event.id, user.id, 5)
+    book(db, event.id, make_user().id, 3)
+
+    with pytest.raises(HTTPException) as error:
+        join(db, event.id, user.id, 6)
+    assert "maximum" in error.value.detail
+    join(db, event.id, user.id, 4)
+
+    # A direct booking counts the 4 seats the user is queued for
+    db.query(Event).filter(Event.id == event.id).update({Event.total_seats: 20, Event.available_seats: 12})
+    db.commit()
+    with pytest.raises(HTTPException) as error:
+        book(db, event.id, user.id, 2)
+    assert "maximum" in error.value.detail
+    assert book(db, event.id, user.id, 1).number_of_seats == 1
+
+def test_claim_racing_direct_bookings_stays_under_the_cap(db, make_user, make_event):
+    event_id = make_event(total_seats=4).id
+    holder_id, user_id = make_user().id, make_user().id
+    booking = book(db, event_id, holder_id, 4)
+    entry_id = join(db, event_id, user_id, 4).id
+    BookingService.cancel_booking_by_user(db, booking.id, holder_id)
+    db.query(Event).filter(Event.id == event_id).update({Event.total_seats: 50, Event.available_seats: 46})
+    db.commit()
+
+    def direct():
+        session = SessionLocal()
+        try:
+            book(session, event_id, user_id, 2)
+        except HTTPException:
+            pass
+        finally:
+            session.close()
+
+    def claim():
+        session = SessionLocal()
+        try:
+            WaitlistService.claim(session, entry_id, user_id)
+        except HTTPException:
+            pass
+        finally:
+            session.close()
+
+    threads = [threading.Thread(target=direct) for _ in range(10)] + [threading.Thread(target=claim)]
+    random.Random(5).shuffle(threads)
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    db.expire_all()
+    booked = db.query(func.sum(Booking.number_of_seats)).filter(
+        Booking.event_id == event_id, Booking.user_id == user_id, Booking.status == BookingStatus.CONFIRMED
+    ).scalar()
+    held = db.query(func.coalesce(func.sum(WaitlistEntry.number_of_seats), 0)).filter(
+        WaitlistEntry.id == entry_id, WaitlistEntry.status == WaitlistStatus.OFFERED
+    ).scalar()
+    assert booked + held <= settings.MAX_SEATS_PER_USER
+
+def test_seats_are_conserved_under_contention(db, make_user, make_event):
+    seats, waiters = 40, 60
+    event_id = make_event(total_seats=seats).id
+    booking_ids = [book(db, event_id, make_user().id, 1).id for _ in range(seats)]
+    for _ in range(waiters):
+        join(db, event_id, make_user().id, 1)
+    owners = dict(db.query(Booking.id, Booking.user_id))
+    random.Random(3).shuffle(booking_ids)
+    errors = Counter()
+    errors_lock = threading.Lock()
+
+    def cancel(chunk):
+        session = SessionLocal()
+        for booking_id in chunk:
+            try:
+                BookingService.cancel_booking_by_user(session, booking_id, owners[booking_id])
+            except HTTPException as e:
+                with errors_lock:
+                    errors[e.detail] += 1
+        session.close()
+
+    def claim_or_decline(stop: threading.Event):
+        session = SessionLocal()
+        while not stop.is_set():
+            offered = session.query(WaitlistEntry.id, WaitlistEntry.user_id).filter(
+                WaitlistEntry.status == WaitlistStatus.OFFERED
+            ).limit(10).all()
+            session.rollback()
+            for entry_id, user_id in offered:
+                try:
+                    if entry_id % 5 == 0:
+                        WaitlistService.leave(session, entry_id, user_id)
+                    else:
+                        WaitlistService.claim(session, entry_id, user_id)
+                except HTTPException:
+                    pass  # Claimed, declined or expired by another thread first
+        session.close()
+
+    def sweep(stop: threading.Event):
+        session = SessionLocal()
+        while not stop.is_set():
+            # Every hold counts as expired, so seats keep cycling through the queue
+            WaitlistService.expire_holds(session, now=datetime.utcnow() + timedelta(days=1))
+        session.close()
+
+    stop = threading.Event()
+    side = [threading.Thread(target=claim_or_decline, args=(stop,)) for _ in range(2)]
+    side.append(threading.Thread(target=sweep, args=(stop,)))
+    cancellers = [threading.Thread(target=cancel, args=(booking_ids[i::8],)) for i in range(8)]
+    for thread in side + cancellers:
+        thread.start()
+    for thread in cancellers:
+        thread.join()
+    stop.set()
+    for thread in side:
+        thread.join()
+
+    assert not errors
+    db.expire_all()
+    event = db.get(Event, event_id)
+    confirmed = db.query(func.coalesce(func.sum(Booking.number_of_seats), 0)).filter(
+        Booking.event_id == event_id, Booking.status == BookingStatus.CONFIRMED
+    ).scalar()
+    held = db.query(func.coalesce(func.sum(WaitlistEntry.number_of_seats), 0)).filter(
+        WaitlistEntry.event_id == event_id, WaitlistEntry.status == WaitlistStatus.OFFERED
+    ).scalar()
+    assert event.available_seats >= 0
+    assert event.available_seats + confirmed + held == seats
+    # A seat is only ever offered to one entry at a time, and each entry at most once
+    offers = Counter(json.loads(payload)["entry_id"] for (payload,) in db.query(OutboxMessage.payload).filter(
+        OutboxMessage.topic == "waitlist.offered"
+    ))
+    assert offers and max(offers.values()) == 1